@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +48,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ContexteRequeteMiddleware',
+    'core.middleware.RecalculStatutsMiddleware',
 ]
 
 ROOT_URLCONF = 'Backend.urls'
@@ -162,10 +164,54 @@ MUTUELLE_DEFAULTS = {
     'EXERCISE_DURATION_MONTHS': config('DEFAULT_EXERCISE_DURATION_MONTHS', default=12, cast=int),
 }
 
+# Tâches différées (core.taches): 'worker' = laissées au worker
+# `manage.py traiter_taches --boucle` (défaut en production); 'immediate' =
+# exécutées dans le processus web juste après le commit (défaut en DEBUG et
+# donc pour les tests). Voir core.taches pour les réponses qui en dépendent
+TACHES_EXECUTION = config('TACHES_EXECUTION', default='immediate' if DEBUG else 'worker')
+TACHES_MAX_TENTATIVES = config('TACHES_MAX_TENTATIVES', default=5, cast=int)
+# Une tâche EN_COURS depuis plus longtemps (secondes) est reprise par un worker
+TACHES_DELAI_ABANDON = config('TACHES_DELAI_ABANDON', default=600, cast=int)
+
+# Cache: mémoire locale en mode 'immediate'; en mode 'worker', les tâches
+# invalident le cache depuis le processus traiter_taches, il doit donc être
+# partagé: table en base par défaut (`manage.py createcachetable`), ou Redis
+CACHE_PARTAGE = TACHES_EXECUTION == 'worker'
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default=(
+            'django.core.cache.backends.db.DatabaseCache' if CACHE_PARTAGE
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        )),
+        'LOCATION': config('CACHE_LOCATION', default='mutuelle_cache' if CACHE_PARTAGE else 'mutuelle'),
+    }
+}
+
+# Processus utilisés pour hacher les mots de passe d'un import groupé de
+# membres. L'import est une opération d'administration rare: chaque requête
+# démarre son propre pool, à garder petit pour ne pas saturer le serveur web
+IMPORT_HACHAGE_PROCESSUS = config('IMPORT_HACHAGE_PROCESSUS', default=2, cast=int)
+
+# Durée de vie maximale (secondes) des sections du dashboard administrateur en cache
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', default=300, cast=int)
+
 # Logging configuration
+# Niveau des loggers 'mutuelle.*' (WARNING en production: aucun formatage des traces DEBUG)
+LOG_LEVEL = config('LOG_LEVEL', default='DEBUG' if DEBUG else 'WARNING')
+# Niveaux par module, ex: "mutuelle.transactions.views=DEBUG,mutuelle.core.utils=WARNING"
+LOG_LEVELS = config('LOG_LEVELS', default='', cast=Csv())
+# Fraction des traces DEBUG/INFO conservées (1.0 = toutes)
+LOG_SAMPLE_RATE = config('LOG_SAMPLE_RATE', default=1.0, cast=float)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'echantillonnage': {
+            '()': 'core.journalisation.EchantillonnageFilter',
+            'taux': LOG_SAMPLE_RATE,
+        },
+    },
     'formatters': {
         'verbose': {
             'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
@@ -182,11 +228,13 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'filename': BASE_DIR / 'mutuelle.log',
             'formatter': 'verbose',
+            'filters': ['echantillonnage'],
         },
         'console': {
             'level': 'DEBUG',
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
+            'filters': ['echantillonnage'],
         },
     },
     'root': {
@@ -201,8 +249,13 @@ LOGGING = {
         },
         'mutuelle': {
             'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
             'propagate': False,
         },
     },
-}
\ No newline at end of file
+}
+
+for niveau_module in LOG_LEVELS:
+    nom_logger, _, niveau = niveau_module.partition('=')
+    if nom_logger.strip() and niveau.strip():
+        LOGGING['loggers'][nom_logger.strip()] = {'level': niveau.strip().upper()}
\ No newline at end of file
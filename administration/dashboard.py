@@ -1,2 +1,66 @@
 # Logique pour le dashboard administrateur
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 
+
+PREFIXE_CLE = 'dashboard_admin'
+
+# Sections du dashboard mises en cache séparément
+SECTIONS = (
+    'donnees_administrateur',
+    'derniers_paiements',
+    'alertes',
+    'activite_recente',
+    'membres_problematiques',
+    'renflouements',
+)
+
+# Sections à invalider quand un modèle change (nom du modèle en minuscules)
+SECTIONS_PAR_MODELE = {
+    'paiementinscription': ('derniers_paiements', 'activite_recente', 'membres_problematiques'),
+    'paiementsolidarite': ('donnees_administrateur', 'derniers_paiements', 'activite_recente'),
+    'epargnetransaction': ('donnees_administrateur',),
+    'emprunt': ('donnees_administrateur', 'alertes', 'activite_recente'),
+    'remboursement': ('donnees_administrateur', 'derniers_paiements'),
+    'assistanceaccordee': ('donnees_administrateur', 'alertes', 'activite_recente'),
+    'renflouement': ('alertes', 'renflouements'),
+    'paiementrenflouement': ('donnees_administrateur', 'alertes', 'renflouements'),
+    'mouvementfondssocial': ('donnees_administrateur', 'alertes'),
+    'membre': SECTIONS,
+    'configurationmutuelle': ('membres_problematiques',),
+    'session': ('donnees_administrateur', 'renflouements'),
+    'exercice': ('donnees_administrateur', 'alertes'),
+}
+
+
+def cle_section(nom):
+    return f"{PREFIXE_CLE}:{nom}"
+
+
+def section_en_cache(nom, calcul):
+    """
+    Retourne la section du dashboard depuis le cache, ou la calcule
+    et la met en cache pour DASHBOARD_CACHE_TTL secondes (filet de sécurité
+    en plus de l'invalidation par signaux)
+    """
+    donnees = cache.get(cle_section(nom))
+    if donnees is None:
+        donnees = calcul()
+        cache.set(cle_section(nom), donnees, settings.DASHBOARD_CACHE_TTL)
+    return donnees
+
+
+def invalider_sections(*noms):
+    """
+    Supprime les sections du cache après le commit de la transaction
+    courante (pour ne pas remettre en cache un état non encore validé)
+    """
+    cles = [cle_section(nom) for nom in (noms or SECTIONS)]
+    transaction.on_commit(lambda: cache.delete_many(cles))
+
+
+def invalider_pour_modele(model):
+    sections = SECTIONS_PAR_MODELE.get(model._meta.model_name)
+    if sections:
+        invalider_sections(*sections)
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from decimal import Decimal
 
 from authentication.models import Utilisateur
+from transactions.saisie import TYPES_LIGNE
 
 class DashboardAdministrateurSerializer(serializers.Serializer):
     """
@@ -62,6 +63,31 @@ class GestionTransactionSerializer(serializers.Serializer):
         # Utilise le validateur standard DRF
         return super().to_internal_value(normalized)
 
+class LigneSaisieSessionSerializer(serializers.Serializer):
+    """
+    Une ligne de la feuille de séance (voir transactions.saisie)
+    """
+    type = serializers.ChoiceField(choices=TYPES_LIGNE)
+    membre_id = serializers.UUIDField(required=False, allow_null=True)
+    renflouement_id = serializers.UUIDField(required=False, allow_null=True)
+    montant = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    
+    def validate(self, data):
+        if data['type'] == 'RENFLOUEMENT':
+            if not data.get('renflouement_id'):
+                raise serializers.ValidationError({'renflouement_id': "Requis pour un paiement de renflouement"})
+        elif not data.get('membre_id'):
+            raise serializers.ValidationError({'membre_id': "Requis pour ce type de paiement"})
+        return data
+
+class SaisieSessionSerializer(serializers.Serializer):
+    """
+    Feuille de séance: lignes de paiement pour une session (en cours par défaut)
+    """
+    session_id = serializers.UUIDField(required=False, allow_null=True)
+    lignes = LigneSaisieSessionSerializer(many=True, allow_empty=False, max_length=1000)
+
 class RapportFinancierSerializer(serializers.Serializer):
     """
     Serializer pour les rapports financiers
@@ -72,6 +98,15 @@ class RapportFinancierSerializer(serializers.Serializer):
     bilan = serializers.DictField()
     indicateurs = serializers.DictField()
 
+class TendancesSerializer(serializers.Serializer):
+    """
+    Serializer pour les séries temporelles (par session ou par mois)
+    """
+    granularite = serializers.CharField()
+    periode = serializers.DictField()
+    champs = serializers.ListField(child=serializers.CharField())
+    series = serializers.ListField(child=serializers.DictField())
+
 class StatistiquesGlobalesSerializer(serializers.Serializer):
     """
     Serializer pour les statistiques globales
@@ -113,4 +148,39 @@ class CreerMembreCompletSerializer(serializers.Serializer):
         if Utilisateur.objects.filter(username=value).exists():
             print("Un utilisateur avec ce nom d'utilisateur existe déjà")
             raise serializers.ValidationError("Un utilisateur avec ce nom d'utilisateur existe déjà")
-        return value
\ No newline at end of file
+        return value
+
+
+class LigneImportMembreSerializer(serializers.Serializer):
+    """
+    Une ligne d'import groupé de membres (voir core.import_membres).
+    L'unicité email / username est contrôlée en lot, pas ligne par ligne
+    """
+    username = serializers.CharField(max_length=150)
+    email = serializers.EmailField()
+    first_name = serializers.CharField(max_length=30)
+    last_name = serializers.CharField(max_length=50)
+    telephone = serializers.CharField(
+        max_length=15, validators=Utilisateur._meta.get_field('telephone').validators
+    )
+    password = serializers.CharField(required=False, default='0000')
+    date_inscription = serializers.DateField(required=False)
+    montant_inscription_initial = serializers.DecimalField(
+        max_digits=12, decimal_places=2, required=False, min_value=Decimal('0')
+    )
+
+
+class ImportMembresSerializer(serializers.Serializer):
+    """
+    Import groupé: liste JSON `membres` ou fichier CSV `fichier`
+    (en-têtes = noms des champs de LigneImportMembreSerializer)
+    """
+    membres = serializers.ListField(child=serializers.DictField(), required=False, max_length=5000)
+    fichier = serializers.FileField(required=False)
+    ignorer_erreurs = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, data):
+        if not data.get('membres') and not data.get('fichier'):
+            raise serializers.ValidationError("Fournir une liste 'membres' ou un fichier CSV 'fichier'")
+        return data
+
@@ -0,0 +1,25 @@
+# Signaux Django pour l'invalidation du cache du dashboard
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.signals import creations_en_masse, statuts_membres_modifies
+from .dashboard import SECTIONS_PAR_MODELE, invalider_pour_modele, invalider_sections
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalider_cache_dashboard(sender, **kwargs):
+    """Invalide les sections du dashboard dépendant du modèle modifié"""
+    if sender._meta.model_name in SECTIONS_PAR_MODELE and sender._meta.app_label in ('core', 'transactions'):
+        invalider_pour_modele(sender)
+
+
+@receiver(statuts_membres_modifies)
+def invalider_cache_statuts(sender, **kwargs):
+    invalider_sections(*SECTIONS_PAR_MODELE['membre'])
+
+
+@receiver(creations_en_masse)
+def invalider_cache_creations_en_masse(sender, **kwargs):
+    invalider_pour_modele(sender)
@@ -1,3 +1,424 @@
-from django.test import TestCase
+import uuid
+from io import StringIO
+from unittest import mock
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmark import generer_mutuelle, creer_administrateur_benchmark
+from authentication.models import Utilisateur
+from core.models import ConfigurationMutuelle, FondsSocial, Membre, SoldeMembre
+from core.testing import CACHE_PARTAGE, BudgetRequetesMixin, PlanRequetesMixin
+from core.utils import recalculer_soldes_membres
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from administration.dashboard import cle_section
+from administration.views import AdministrationDashboardViewSet
+
+from core.models import Exercice, Session
+from transactions.models import (
+    Emprunt, EpargneTransaction, Remboursement, PaiementInscription, PaiementRenflouement,
+    PaiementSolidarite, Renflouement
+)
+
+
+class BudgetRequetesDashboardTests(BudgetRequetesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(30, nombre_sessions=8, nombre_exercices=2, graine=5)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_budget_dashboard_sans_cache(self):
+        self.verifier_budgets({'/api/administration/dashboard/dashboard_complet/': 22})
+
+    def test_budget_dashboard_en_cache(self):
+        self.client.get('/api/administration/dashboard/dashboard_complet/')
+        # Session + utilisateur uniquement: toutes les sections viennent du cache
+        self.verifier_budgets({'/api/administration/dashboard/dashboard_complet/': 2})
+
+
+@override_settings(TACHES_EXECUTION='worker', CACHES=CACHE_PARTAGE)
+class InvalidationDashboardWorkerTests(TestCase):
+    """Les tâches exécutées par le worker invalident le cache (partagé) du dashboard"""
+    URL = '/api/administration/dashboard/dashboard_complet/'
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, graine=5)
+
+    def setUp(self):
+        call_command('createcachetable')
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_redistribution_des_interets(self):
+        emprunt = Emprunt.objects.filter(statut='EN_COURS').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            Remboursement.objects.create(
+                emprunt=emprunt, montant=emprunt.montant_restant_a_rembourser,
+                session=Session.get_session_en_cours()
+            )
+        # Dashboard remis en cache avant le passage du worker
+        self.client.get(self.URL)
+        self.assertIsNotNone(cache.get(cle_section('donnees_administrateur')))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('traiter_taches', stdout=StringIO())
+
+        self.assertTrue(EpargneTransaction.objects.filter(type_transaction='AJOUT_INTERET').exists())
+        self.assertIsNone(cache.get(cle_section('donnees_administrateur')))
+
+
+class PlanRequetesDashboardTests(PlanRequetesMixin, TestCase):
+    """Sections du tableau de bord: SQL réellement émis servi par un index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, nombre_assistances=2, graine=5)
+
+    def test_alertes(self):
+        # Jointure sur les renflouements non soldés: index partiel, pas de parcours
+        with self.assertRequetesIndexees('core_membre', 'transactions_renflouement', 'transactions_emprunt'):
+            AdministrationDashboardViewSet()._get_alertes()
+
+    def test_derniers_paiements(self):
+        with self.assertRequetesIndexees(
+            'transactions_paiementinscription', 'transactions_paiementsolidarite', tri=True
+        ):
+            AdministrationDashboardViewSet()._get_derniers_paiements()
+
+
+class SaisieSessionTests(BudgetRequetesMixin, TestCase):
+    URL = '/api/administration/gestion-membres/saisie_session/'
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(12, nombre_sessions=4, graine=8)
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+        self.membres = list(Membre.objects.order_by('numero_membre'))
+        self.renflouement = Renflouement.objects.filter(montant_paye=0).first()
+
+    def _soldes(self):
+        return {
+            solde.membre_id: {champ: getattr(solde, champ) for champ in SoldeMembre.CHAMPS_MONTANTS}
+            for solde in SoldeMembre.objects.all()
+        }
+
+    def test_feuille_mixte(self):
+        fonds_avant = FondsSocial.get_fonds_actuel().montant_total
+        lignes = [
+            {'type': 'INSCRIPTION', 'membre_id': str(self.membres[0].id), 'montant': '5000'},
+            {'type': 'SOLIDARITE', 'membre_id': str(self.membres[1].id), 'montant': '2000'},
+            {'type': 'SOLIDARITE', 'membre_id': str(self.membres[1].id), 'montant': '3000'},
+            {'type': 'EPARGNE', 'membre_id': str(self.membres[2].id), 'montant': '25000'},
+            {'type': 'RENFLOUEMENT', 'renflouement_id': str(self.renflouement.id),
+             'montant': str(self.renflouement.montant_du)},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = self.client.post(self.URL, {'lignes': lignes}, content_type='application/json')
+
+        self.assertEqual(reponse.status_code, 201, reponse.content)
+        resultats = reponse.json()['resultats']
+        self.assertEqual([ligne['index'] for ligne in resultats], list(range(5)))
+        self.assertEqual(resultats[1]['id'], resultats[2]['id'])
+
+        self.renflouement.refresh_from_db()
+        self.assertTrue(self.renflouement.is_solde)
+        self.assertEqual(
+            FondsSocial.get_fonds_actuel().montant_total,
+            fonds_avant + Decimal('10000') + self.renflouement.montant_du
+        )
+        # Les deltas groupés doivent donner les mêmes soldes qu'une reconstruction complète
+        soldes = self._soldes()
+        recalculer_soldes_membres()
+        self.assertEqual(soldes, self._soldes())
+
+    def test_ligne_invalide_rien_n_est_ecrit(self):
+        nombre_avant = EpargneTransaction.objects.count()
+        lignes = [
+            {'type': 'EPARGNE', 'membre_id': str(self.membres[0].id), 'montant': '1000'},
+            {'type': 'EPARGNE', 'membre_id': str(uuid.uuid4()), 'montant': '1000'},
+            {'type': 'RENFLOUEMENT', 'renflouement_id': str(self.renflouement.id),
+             'montant': str(self.renflouement.montant_du + 1)},
+        ]
+        reponse = self.client.post(self.URL, {'lignes': lignes}, content_type='application/json')
+
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual([erreur['index'] for erreur in reponse.json()['erreurs']], [1, 2])
+        self.assertEqual(EpargneTransaction.objects.count(), nombre_avant)
+
+    def test_reste_du_relu_dans_la_transaction(self):
+        # Un paiement enregistré entre-temps réduit le reste dû: la feuille
+        # préparée sur l'ancien reste est refusée sans rien écrire
+        PaiementRenflouement.objects.create(
+            renflouement=self.renflouement, montant=Decimal('1'), session=Session.get_session_en_cours()
+        )
+        nombre_avant = PaiementRenflouement.objects.count()
+        lignes = [{'type': 'RENFLOUEMENT', 'renflouement_id': str(self.renflouement.id),
+                   'montant': str(self.renflouement.montant_du)}]
+        reponse = self.client.post(self.URL, {'lignes': lignes}, content_type='application/json')
+
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual([erreur['index'] for erreur in reponse.json()['erreurs']], [0])
+        self.assertEqual(PaiementRenflouement.objects.count(), nombre_avant)
+
+    def _requetes_saisie(self, membres):
+        lignes = [
+            {'type': type_ligne, 'membre_id': str(membre.id), 'montant': '1000'}
+            for membre in membres
+            for type_ligne in ('INSCRIPTION', 'SOLIDARITE', 'EPARGNE')
+        ]
+        with CaptureQueriesContext(connection) as requetes:
+            with self.captureOnCommitCallbacks(execute=True):
+                reponse = self.client.post(self.URL, {'lignes': lignes}, content_type='application/json')
+        self.assertEqual(reponse.status_code, 201, reponse.content)
+        return len(requetes)
+
+    def test_budget_independant_du_nombre_de_lignes(self):
+        petite_feuille = self._requetes_saisie(self.membres[:2])
+        grande_feuille = self._requetes_saisie(self.membres)
+        # Seules des requêtes conditionnelles peuvent s'ajouter (incrément des
+        # solidarités déjà saisies, transitions de statut), jamais une par ligne
+        self.assertLessEqual(grande_feuille - petite_feuille, 3)
+        self.assertLessEqual(grande_feuille, 40)
+
+
+class ImportMembresTests(TestCase):
+    URL = '/api/administration/gestion-membres/importer_membres/'
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(5, nombre_sessions=2, graine=9)
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def _ligne(self, indice, **valeurs):
+        return {
+            'username': f"prof{indice}", 'email': f"prof{indice}@ecole.test",
+            'first_name': f"Prenom{indice}", 'last_name': f"Nom{indice}",
+            'telephone': f"69{indice:07d}", **valeurs
+        }
+
+    def test_import_json_avec_inscription_initiale(self):
+        fonds_avant = FondsSocial.get_fonds_actuel().montant_total
+        montant_inscription = ConfigurationMutuelle.get_configuration().montant_inscription
+        membres = [self._ligne(1, montant_inscription_initial=str(montant_inscription), password='1234'),
+                   self._ligne(2), self._ligne(3, montant_inscription_initial='5000')]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = self.client.post(self.URL, {'membres': membres}, content_type='application/json')
+
+        self.assertEqual(reponse.status_code, 201, reponse.content)
+        resultats = reponse.json()['resultats']
+        self.assertEqual([ligne['numero_membre'] for ligne in resultats], ["ENS-0006", "ENS-0007", "ENS-0008"])
+        self.assertEqual([ligne['statut'] for ligne in resultats], ['EN_REGLE', 'NON_EN_REGLE', 'NON_EN_REGLE'])
+        self.assertTrue(Utilisateur.objects.get(username='prof1').check_password('1234'))
+        self.assertEqual(
+            FondsSocial.get_fonds_actuel().montant_total, fonds_avant + montant_inscription + Decimal('5000')
+        )
+        soldes = self._soldes()
+        recalculer_soldes_membres()
+        self.assertEqual(soldes, self._soldes())
+
+    def _soldes(self):
+        return dict(SoldeMembre.objects.values_list('membre_id', 'inscription_payee'))
+
+    def test_import_csv(self):
+        contenu = "\ufeffusername;email;first_name;last_name;telephone;montant_inscription_initial\n"
+        contenu += "prof1;prof1@ecole.test;Awa;Ndiaye;690000001;\n"
+        contenu += "prof2;prof2@ecole.test;Paul;Mbarga;690000002;1000\n"
+        fichier = SimpleUploadedFile('cohorte.csv', contenu.encode('utf-8'), content_type='text/csv')
+
+        reponse = self.client.post(self.URL, {'fichier': fichier})
+
+        self.assertEqual(reponse.status_code, 201, reponse.content)
+        self.assertEqual(Membre.objects.filter(utilisateur__username__startswith='prof').count(), 2)
+
+    def test_erreurs_par_ligne(self):
+        existant = Utilisateur.objects.filter(role='MEMBRE').first()
+        membres = [self._ligne(1), self._ligne(2, email=existant.email), self._ligne(3, username='prof1'),
+                   self._ligne(4, telephone='abc')]
+
+        reponse = self.client.post(self.URL, {'membres': membres}, content_type='application/json')
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual([erreur['index'] for erreur in reponse.json()['erreurs']], [0, 1, 2, 3])
+        self.assertFalse(Utilisateur.objects.filter(username__startswith='prof').exists())
+
+        membres[2]['username'] = 'prof3'
+        reponse = self.client.post(
+            self.URL, {'membres': membres, 'ignorer_erreurs': True}, content_type='application/json'
+        )
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual([ligne['index'] for ligne in reponse.json()['resultats']], [0, 2])
+        self.assertEqual([erreur['index'] for erreur in reponse.json()['erreurs']], [1, 3])
+
+    def test_conflit_d_unicite_pendant_la_creation(self):
+        # Compte créé par une autre requête après valider_import
+        Utilisateur.objects.create_user(
+            username='prof2', email='autre@ecole.test', password='0000', telephone='690000099'
+        )
+        membres = [self._ligne(1), self._ligne(2)]
+
+        with mock.patch('administration.views.valider_import', return_value=[]):
+            reponse = self.client.post(self.URL, {'membres': membres}, content_type='application/json')
+
+        self.assertEqual(reponse.status_code, 409, reponse.content)
+        self.assertFalse(Utilisateur.objects.filter(username='prof1').exists())
+
+
+class RapportFinancierTests(BudgetRequetesMixin, TestCase):
+    URL = '/api/administration/rapports/rapport_financier_complet/'
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(20, nombre_sessions=6, nombre_exercices=2, graine=9)
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def _rapport(self, **parametres):
+        reponse = self.client.get(self.URL, parametres)
+        self.assertEqual(reponse.status_code, 200, reponse.data)
+        return reponse.data
+
+    def _somme(self, queryset, champ='montant'):
+        return queryset.aggregate(total=Sum(champ))['total'] or Decimal('0')
+
+    def test_filtre_exercice(self):
+        total_entrees = Decimal('0')
+        for exercice in Exercice.objects.all():
+            rapport = self._rapport(exercice_id=str(exercice.id))
+            self.assertEqual(
+                Decimal(str(rapport['entrees']['inscriptions'])),
+                self._somme(PaiementInscription.objects.filter(session__exercice=exercice))
+            )
+            self.assertEqual(
+                Decimal(str(rapport['entrees']['epargnes'])),
+                self._somme(EpargneTransaction.objects.filter(session__exercice=exercice, type_transaction='DEPOT'))
+            )
+            self.assertEqual(
+                Decimal(str(rapport['sorties']['emprunts'])),
+                self._somme(Emprunt.objects.filter(session_emprunt__exercice=exercice), 'montant_emprunte')
+            )
+            self.assertEqual(
+                Decimal(str(rapport['sorties']['collations'])),
+                self._somme(Session.objects.filter(exercice=exercice), 'montant_collation')
+            )
+            total_entrees += Decimal(str(rapport['entrees']['total']))
+
+        self.assertEqual(Decimal(str(self._rapport()['entrees']['total'])), total_entrees)
+
+    def test_filtre_periode_sur_la_date_reelle(self):
+        jour = timezone.localdate() - timedelta(days=400)
+        anciens = list(PaiementInscription.objects.values_list('id', flat=True)[:3])
+        PaiementInscription.objects.filter(id__in=anciens).update(
+            date_paiement=timezone.make_aware(datetime.combine(jour, datetime.min.time())) + timedelta(hours=23)
+        )
+
+        rapport = self._rapport(date_debut=str(jour), date_fin=str(jour))
+        self.assertEqual(
+            Decimal(str(rapport['entrees']['inscriptions'])),
+            self._somme(PaiementInscription.objects.filter(id__in=anciens))
+        )
+        self.assertEqual(Decimal(str(rapport['entrees']['epargnes'])), Decimal('0'))
+
+        reponse = self.client.get(self.URL, {'date_debut': '01/02/2025'})
+        self.assertEqual(reponse.status_code, 400)
+
+    def test_nombre_de_requetes_fixe(self):
+        exercice = Exercice.objects.get(statut='TERMINE')
+        budgets = {
+            self.URL: 16,
+            f"{self.URL}?exercice_id={exercice.id}": 17,
+            f"{self.URL}?date_debut=2020-01-01&date_fin=2100-12-31": 15,
+        }
+        self.verifier_budgets(budgets)
+
+
+class TendancesTests(BudgetRequetesMixin, TestCase):
+    URL = '/api/administration/rapports/tendances/'
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(15, nombre_sessions=6, nombre_exercices=2, graine=12)
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_serie_par_session(self):
+        exercice = Exercice.objects.get(statut='EN_COURS')
+        # Session, utilisateur, exercice, puis la série en une requête
+        with self.assertBudgetRequetes(4):
+            reponse = self.client.get(self.URL, {'exercice_id': str(exercice.id)})
+        self.assertEqual(reponse.status_code, 200)
+
+        series = reponse.data['series']
+        sessions = list(Session.objects.filter(exercice=exercice).order_by('date_session'))
+        self.assertEqual([point['session_id'] for point in series], [session.id for session in sessions])
+        for point, session in zip(series, sessions):
+            self.assertEqual(
+                point['solidarites'],
+                self._somme(PaiementSolidarite.objects.filter(session=session))
+            )
+            self.assertEqual(
+                point['emprunts_decaisses'],
+                self._somme(Emprunt.objects.filter(session_emprunt=session), 'montant_emprunte')
+            )
+
+    def test_serie_par_mois(self):
+        reponse = self.client.get(self.URL, {'granularite': 'mois'})
+        self.assertEqual(reponse.status_code, 200)
+
+        series = reponse.data['series']
+        self.assertEqual(sum(point['nombre_sessions'] for point in series), Session.objects.count())
+        self.assertEqual(
+            sum(point['epargnes_deposees'] for point in series),
+            self._somme(EpargneTransaction.objects.filter(type_transaction='DEPOT'))
+        )
+
+        reponse = self.client.get(self.URL, {'granularite': 'annee'})
+        self.assertEqual(reponse.status_code, 400)
+
+    def _somme(self, queryset, champ='montant'):
+        return queryset.aggregate(total=Sum(champ))['total'] or Decimal('0')
+
+
+class ExerciceTermineTests(TestCase):
+    """Saisies refusées dans une session d'un exercice terminé"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(6, nombre_sessions=4, nombre_exercices=2, graine=21)
+        cls.session_close = Session.objects.filter(exercice__statut='TERMINE').first()
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+        self.membre = Membre.objects.order_by('numero_membre').first()
+
+    def test_saisie_et_paiement_refuses(self):
+        nombre_avant = PaiementSolidarite.objects.count()
+        lignes = [{'type': 'SOLIDARITE', 'membre_id': str(self.membre.id), 'montant': '1000'}]
+        reponse = self.client.post(
+            SaisieSessionTests.URL, {'session_id': str(self.session_close.id), 'lignes': lignes},
+            content_type='application/json'
+        )
+        self.assertEqual(reponse.status_code, 400)
+
+        reponse = self.client.post('/api/administration/gestion-membres/ajouter_paiement_solidarite/', {
+            'membre_id': str(self.membre.id), 'session_id': str(self.session_close.id), 'montant': '1000'
+        }, content_type='application/json')
+        self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(PaiementSolidarite.objects.count(), nombre_avant)
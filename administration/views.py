@@ -3,13 +3,15 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django_filters import rest_framework as filters
-from django.db import models, transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, models, transaction
 from django.db.models import Sum, Count, Q, F
+from datetime import date
 from decimal import Decimal
 from django.utils import timezone
 from authentication.models import Utilisateur
 from core.models import (
-    ConfigurationMutuelle, Exercice, Session, Membre, FondsSocial
+    ConfigurationMutuelle, Exercice, Session, Membre, FondsSocial, SoldeMembre
 )
 from transactions.models import (
     PaiementInscription, PaiementSolidarite, EpargneTransaction,
@@ -19,11 +21,26 @@ from transactions.models import (
 from decimal import Decimal, InvalidOperation
 from .serializers import (
     CreerMembreCompletSerializer, DashboardAdministrateurSerializer, GestionMembreSerializer,
-    GestionTransactionSerializer, RapportFinancierSerializer,
-    StatistiquesGlobalesSerializer
+    GestionTransactionSerializer, ImportMembresSerializer, LigneImportMembreSerializer,
+    RapportFinancierSerializer, SaisieSessionSerializer, StatistiquesGlobalesSerializer,
+    TendancesSerializer
 )
+from transactions.saisie import enregistrer_saisie_session
+from core.cloture import MESSAGE_EXERCICE_TERMINE, exercice_termine, totaux_flux
+from core.tendances import CHAMPS_SERIES, GRANULARITES, series_tendances
+from core.import_membres import creer_membres_en_masse, lire_csv_membres, valider_import
+from core.journalisation import donnees_masquees
 from authentication.permissions import IsAdministrateur
-from core.utils import calculer_donnees_administrateur
+from .dashboard import section_en_cache
+from core.utils import (
+    calculer_donnees_administrateur,
+    marquer_statut_a_recalculer, vider_statuts_en_attente
+)
+import csv
+import logging
+
+logger = logging.getLogger(f'mutuelle.{__name__}')
+
 
 class AdministrationDashboardViewSet(viewsets.ViewSet):
     """
@@ -36,37 +53,17 @@ class AdministrationDashboardViewSet(viewsets.ViewSet):
         """
         Retourne TOUTES les données du dashboard administrateur
         """
-        donnees = calculer_donnees_administrateur()
+        # Chaque section est servie depuis le cache, invalidé par signaux (voir dashboard.py)
+        donnees = dict(section_en_cache('donnees_administrateur', calculer_donnees_administrateur))
         
         # Ajouter des données supplémentaires
         donnees.update({
-            'derniers_paiements': self._get_derniers_paiements(),
-            'alertes': self._get_alertes(),
-            'activite_recente': self._get_activite_recente(),
-            'membres_problematiques': self._get_membres_problematiques()
+            'derniers_paiements': section_en_cache('derniers_paiements', self._get_derniers_paiements),
+            'alertes': section_en_cache('alertes', self._get_alertes),
+            'activite_recente': section_en_cache('activite_recente', self._get_activite_recente),
+            'membres_problematiques': section_en_cache('membres_problematiques', self._get_membres_problematiques),
+            'renflouements': section_en_cache('renflouements', self._get_renflouements_stats),
         })
-        # Calculer les stats de renflouement
-        def _get_renflouements_stats():
-            print("CALCUL DES REMFLOUEMENTS")
-            
-            qs = Renflouement.objects.all()
-            total_du = qs.aggregate(total=Sum('montant_du'))['total'] or Decimal('0')
-            total_paye = qs.aggregate(total=Sum('montant_paye'))['total'] or Decimal('0')
-            taux_recouvrement = float(total_paye) / float(total_du) * 100 if total_du > 0 else 100
-            
-            data = {
-                "montants": {
-                    "total_du": float(total_du),
-                    "total_paye": float(total_paye),
-                },
-                "pourcentages": {
-                    "taux_recouvrement": round(taux_recouvrement, 2)
-                }
-            }
-            print(data)
-
-            return data
-        donnees['renflouements'] = _get_renflouements_stats()
                 
         serializer = DashboardAdministrateurSerializer(donnees)
         return Response(serializer.data)
@@ -137,7 +134,7 @@ class AdministrationDashboardViewSet(viewsets.ViewSet):
             })
         
         # Emprunts en retard
-        emprunts_retard = Emprunt.objects.filter(statut='EN_RETARD')
+        emprunts_retard = Emprunt.objects.filter(statut='EN_RETARD').select_related('membre')
         for emprunt in emprunts_retard:
             alertes.append({
                 'type': 'EMPRUNT_RETARD',
@@ -190,11 +187,11 @@ class AdministrationDashboardViewSet(viewsets.ViewSet):
         # Inscription non terminée
         membres_inscription_incomplete = Membre.objects.filter(
             date_inscription__lte=three_months_ago
-        ).annotate(
+        ).select_related('utilisateur').annotate(
             total_paye=Sum('paiements_inscription__montant')
         ).filter(
             Q(total_paye__isnull=True) | Q(total_paye__lt=config.montant_inscription)
-        )
+        )[:10]  # Top 10
         
         for membre in membres_inscription_incomplete:
             total_paye = membre.total_paye or Decimal('0')
@@ -206,7 +203,26 @@ class AdministrationDashboardViewSet(viewsets.ViewSet):
                 'details': f"Payé {total_paye:,.0f} sur {config.montant_inscription:,.0f}"
             })
         
-        return membres_problematiques[:10]  # Top 10
+        return membres_problematiques
+    
+    def _get_renflouements_stats(self):
+        """Statistiques globales de recouvrement des renflouements"""
+        totaux = Renflouement.objects.aggregate(
+            total_du=Sum('montant_du'), total_paye=Sum('montant_paye')
+        )
+        total_du = totaux['total_du'] or Decimal('0')
+        total_paye = totaux['total_paye'] or Decimal('0')
+        taux_recouvrement = float(total_paye) / float(total_du) * 100 if total_du > 0 else 100
+        
+        return {
+            "montants": {
+                "total_du": float(total_du),
+                "total_paye": float(total_paye),
+            },
+            "pourcentages": {
+                "taux_recouvrement": round(taux_recouvrement, 2)
+            }
+        }
 
 class GestionMembresViewSet(viewsets.ViewSet):
     """
@@ -246,15 +262,10 @@ class GestionMembresViewSet(viewsets.ViewSet):
             ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
             
             if total_paye >= config.montant_inscription and membre.statut != 'EN_REGLE':
-                
-                try:
-                    if membre.calculer_statut_en_regle() :
-                        membre.statut = 'EN_REGLE'
-                        membre.save()
-                except e :
-                    print(f"Erreur de calcul de sttus en regle : {e} ")
-                    pass
-                print("MEMEBRE EN REGLE POUR INSCRIPTION")
+                # Recalcul immédiat: la réponse doit refléter le nouveau statut
+                marquer_statut_a_recalculer(membre.id)
+                vider_statuts_en_attente()
+                membre.refresh_from_db(fields=['statut'])
             
             return Response({
                 'message': 'Paiement inscription ajouté avec succès',
@@ -296,6 +307,11 @@ class GestionMembresViewSet(viewsets.ViewSet):
                     {'error': 'Session introuvable'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            if exercice_termine(session):
+                return Response(
+                    {'error': MESSAGE_EXERCICE_TERMINE},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             # Vérifier si déjà payé pour cette session
             paiement_existant = PaiementSolidarite.objects.filter(
@@ -384,54 +400,53 @@ class GestionMembresViewSet(viewsets.ViewSet):
         """
         Créer un emprunt pour un membre avec logs détaillés et robustesse
         """
-        print("=" * 100)
-        print("🔍 CRÉATION EMPRUNT - DÉBUT")
-        print(f"📡 User: {request.user}")
-        print(f"📡 Data reçue: {request.data}")
-        print(f"📡 Headers: {dict(request.headers)}")
-        print(f"📡 Method: {request.method}")
-        print(f"📡 Content-Type: {request.content_type}")
-        print("=" * 50)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 CRÉATION EMPRUNT - DÉBUT")
+            logger.debug("📡 User: %s", request.user)
+            logger.debug("📡 Data reçue: %s", donnees_masquees(request.data))
+            logger.debug("📡 Method: %s", request.method)
+            logger.debug("📡 Content-Type: %s", request.content_type)
 
         try:
             # 🔧 ÉTAPE 1: Validation du serializer
-            print("🔍 ÉTAPE 1: Validation du serializer")
+            logger.debug("🔍 ÉTAPE 1: Validation du serializer")
             serializer = GestionTransactionSerializer(data=request.data)
-            print(f"🔍 Validation en cours...")
+            logger.debug("🔍 Validation en cours...")
             if not serializer.is_valid():
-                print(f"❌ ERREURS SERIALIZER: {serializer.errors}")
-                print(f"❌ ERREURS DÉTAILLÉES:")
+                logger.warning("❌ ERREURS SERIALIZER: %s", serializer.errors)
+                logger.warning("❌ ERREURS DÉTAILLÉES:")
                 for field, errors in serializer.errors.items():
-                    print(f"   - {field}: {errors}")
+                    logger.debug("   - %s: %s", field, errors)
                 return Response({
                     'error': 'Données invalides',
                     'details': serializer.errors,
                     'data_received': request.data
                 }, status=status.HTTP_400_BAD_REQUEST)
-            print(f"✅ Serializer valide, validated_data: {serializer.validated_data}")
+            logger.debug("✅ Serializer valide, validated_data: %s", serializer.validated_data)
 
             # 🔧 ÉTAPE 2: Récupération du membre
             membre_id = serializer.validated_data.get('membre_id')
             if not membre_id:
                 error_msg = "ID du membre manquant dans les données"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'data_received': serializer.validated_data
                 }, status=status.HTTP_400_BAD_REQUEST)
             try:
                 membre = Membre.objects.select_related('utilisateur').get(id=membre_id)
-                print(f"✅ Membre trouvé: {membre.numero_membre} - {membre.utilisateur.nom_complet}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("✅ Membre trouvé: %s - %s", membre.numero_membre, membre.utilisateur.nom_complet)
             except Membre.DoesNotExist:
                 error_msg = f"Membre avec ID {membre_id} introuvable"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'membre_id': membre_id
                 }, status=status.HTTP_404_NOT_FOUND)
             except Exception as e:
                 error_msg = f"Erreur lors de la récupération du membre: {e}"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'membre_id': membre_id
@@ -439,75 +454,75 @@ class GestionMembresViewSet(viewsets.ViewSet):
 
             # 🔧 ÉTAPE 3: Validation du montant
             montant = serializer.validated_data.get('montant')
-            print(f"🔍 Montant demandé: {montant}")
+            logger.debug("🔍 Montant demandé: %s", montant)
             try:
                 montant_decimal = Decimal(str(montant))
-                print(f"✅ Montant converti en Decimal: {montant_decimal}")
+                logger.debug("✅ Montant converti en Decimal: %s", montant_decimal)
 
                 if montant_decimal <= 0:
                     error_msg = "Le montant de l'emprunt doit être positif"
-                    print(f"❌ ERREUR MONTANT: {error_msg}")
+                    logger.warning("❌ ERREUR MONTANT: %s", error_msg)
                     return Response({
                         'error': error_msg,
                         'montant_recu': montant
                     }, status=status.HTTP_400_BAD_REQUEST)
             except (InvalidOperation, TypeError, ValueError) as e:
                 error_msg = f"Montant invalide: {e}"
-                print(f"❌ ERREUR CONVERSION MONTANT: {error_msg}")
+                logger.warning("❌ ERREUR CONVERSION MONTANT: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'montant_recu': montant
                 }, status=status.HTTP_400_BAD_REQUEST)
 
             # 🔧 ÉTAPE 4: Vérifier si le membre peut emprunter
-            print("🔍 ÉTAPE 4: Vérification de la capacité d'emprunt")
+            logger.debug("🔍 ÉTAPE 4: Vérification de la capacité d'emprunt")
             peut_emprunter, message = membre.peut_emprunter(montant_decimal)
-            print(f"🔍 Peut emprunter ? {peut_emprunter} | Raison: {message}")
+            logger.debug("🔍 Peut emprunter ? %s | Raison: %s", peut_emprunter, message)
             if not peut_emprunter:
-                print(f"❌ REFUS: {message}")
+                logger.warning("❌ REFUS: %s", message)
                 return Response(
                     {'error': message},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
             # 🔧 ÉTAPE 5: Récupération de la session en cours
-            print("🔍 ÉTAPE 5: Récupération de la session en cours")
+            logger.debug("🔍 ÉTAPE 5: Récupération de la session en cours")
             try:
                 session = Session.get_session_en_cours()
                 if not session:
                     error_msg = "Aucune session en cours"
-                    print(f"❌ ERREUR SESSION: {error_msg}")
+                    logger.warning("❌ ERREUR SESSION: %s", error_msg)
                     return Response(
                         {'error': error_msg},
                         status=status.HTTP_400_BAD_REQUEST
                     )
-                print(f"✅ Session trouvée: {session.nom} ({session.id})")
+                logger.debug("✅ Session trouvée: %s (%s)", session.nom, session.id)
             except Exception as e:
                 error_msg = f"Erreur lors de la récupération de la session en cours: {e}"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             # 🔧 ÉTAPE 6: Récupération de la config mutuelle
-            print("🔍 ÉTAPE 6: Récupération de la configuration mutuelle")
+            logger.debug("🔍 ÉTAPE 6: Récupération de la configuration mutuelle")
             try:
                 config = ConfigurationMutuelle.get_configuration()
-                print(f"✅ Config récupérée: taux_interet={config.taux_interet}")
+                logger.debug("✅ Config récupérée: taux_interet=%s", config.taux_interet)
             except Exception as e:
                 error_msg = f"Erreur lors de la récupération de la configuration: {e}"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             # 🔧 ÉTAPE 7: Création de l'emprunt avec transaction
-            print("🔍 ÉTAPE 7: Création de l'emprunt et transaction épargne")
+            logger.debug("🔍 ÉTAPE 7: Création de l'emprunt et transaction épargne")
             notes = serializer.validated_data.get('notes', '')
             try:
                 from django.db import transaction as db_transaction
                 with db_transaction.atomic():
-                    print("🔍 Début transaction DB...")
+                    logger.debug("🔍 Début transaction DB...")
                     emprunt = Emprunt.objects.create(
                         membre=membre,
                         montant_emprunte=montant_decimal,
@@ -515,7 +530,7 @@ class GestionMembresViewSet(viewsets.ViewSet):
                         session_emprunt=session,
                         notes=notes
                     )
-                    print(f"✅ Emprunt créé: {emprunt.id} pour {emprunt.montant_emprunte} F à {emprunt.taux_interet}%")
+                    logger.debug("✅ Emprunt créé: %s pour %s F à %s%%", emprunt.id, emprunt.montant_emprunte, emprunt.taux_interet)
                     # Créer la transaction d'épargne (retrait pour prêt)
                     EpargneTransaction.objects.create(
                         membre=membre,
@@ -524,7 +539,7 @@ class GestionMembresViewSet(viewsets.ViewSet):
                         session=session,
                         notes=f"Retrait pour emprunt {emprunt.id}"
                     )
-                    print(f"✅ Transaction épargne créée pour emprunt {emprunt.id}")
+                    logger.debug("✅ Transaction épargne créée pour emprunt %s", emprunt.id)
                     emprunt.refresh_from_db()
                     response_data = {
                         'message': 'Emprunt créé avec succès',
@@ -533,15 +548,10 @@ class GestionMembresViewSet(viewsets.ViewSet):
                         'montant_a_rembourser': float(getattr(emprunt, 'montant_total_a_rembourser', 0)),
                         'taux_interet': float(emprunt.taux_interet)
                     }
-                    print(f"✅ Données de réponse: {response_data}")
-                    print("=" * 100)
+                    logger.debug("✅ Données de réponse: %s", response_data)
                     return Response(response_data, status=status.HTTP_201_CREATED)
             except Exception as e:
-                print(f"❌ EXCEPTION LORS DE LA CRÉATION: {str(e)}")
-                print(f"❌ TYPE D'EXCEPTION: {type(e)}")
-                import traceback
-                print(f"❌ TRACEBACK COMPLET:\n{traceback.format_exc()}")
-                print("=" * 100)
+                logger.exception("❌ EXCEPTION LORS DE LA CRÉATION: %s", str(e))
                 return Response({
                     'error': 'Erreur lors de la création de l\'emprunt',
                     'details': str(e),
@@ -549,11 +559,7 @@ class GestionMembresViewSet(viewsets.ViewSet):
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         except Exception as e:
-            print(f"❌ EXCEPTION GÉNÉRALE: {str(e)}")
-            print(f"❌ TYPE D'EXCEPTION: {type(e)}")
-            import traceback
-            print(f"❌ TRACEBACK COMPLET:\n{traceback.format_exc()}")
-            print("=" * 100)
+            logger.exception("❌ EXCEPTION GÉNÉRALE: %s", str(e))
             return Response({
                 'error': 'Erreur interne du serveur',
                 'details': str(e),
@@ -566,26 +572,24 @@ class GestionMembresViewSet(viewsets.ViewSet):
         """
         Ajouter un remboursement pour un emprunt
         """
-        print("=" * 100)
-        print("🔍 AJOUT REMBOURSEMENT - DÉBUT")
-        print(f"📡 User: {request.user}")
-        print(f"📡 Data reçue: {request.data}")
-        print(f"📡 Headers: {dict(request.headers)}")
-        print(f"📡 Method: {request.method}")
-        print(f"📡 Content-Type: {request.content_type}")
-        print("=" * 50)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 AJOUT REMBOURSEMENT - DÉBUT")
+            logger.debug("📡 User: %s", request.user)
+            logger.debug("📡 Data reçue: %s", donnees_masquees(request.data))
+            logger.debug("📡 Method: %s", request.method)
+            logger.debug("📡 Content-Type: %s", request.content_type)
         
         try:
             # 🔧 ÉTAPE 1: Validation du serializer
-            print("🔍 ÉTAPE 1: Validation du serializer")
+            logger.debug("🔍 ÉTAPE 1: Validation du serializer")
             serializer = GestionTransactionSerializer(data=request.data)
             
-            print(f"🔍 Validation en cours...")
+            logger.debug("🔍 Validation en cours...")
             if not serializer.is_valid():
-                print(f"❌ ERREURS SERIALIZER: {serializer.errors}")
-                print(f"❌ ERREURS DÉTAILLÉES:")
+                logger.warning("❌ ERREURS SERIALIZER: %s", serializer.errors)
+                logger.warning("❌ ERREURS DÉTAILLÉES:")
                 for field, errors in serializer.errors.items():
-                    print(f"   - {field}: {errors}")
+                    logger.debug("   - %s: %s", field, errors)
                 
                 return Response({
                     'error': 'Données invalides',
@@ -593,16 +597,16 @@ class GestionMembresViewSet(viewsets.ViewSet):
                     'data_received': request.data
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            print(f"✅ Serializer valide, validated_data: {serializer.validated_data}")
+            logger.debug("✅ Serializer valide, validated_data: %s", serializer.validated_data)
             
             # 🔧 ÉTAPE 2: Récupération de l'emprunt
-            print("🔍 ÉTAPE 2: Récupération de l'emprunt")
+            logger.debug("🔍 ÉTAPE 2: Récupération de l'emprunt")
             emprunt_id = serializer.validated_data.get('emprunt')
-            print(f"🔍 Recherche emprunt avec ID: {emprunt_id}")
+            logger.debug("🔍 Recherche emprunt avec ID: %s", emprunt_id)
             
             if not emprunt_id:
                 error_msg = "ID de l'emprunt manquant dans les données"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'data_received': serializer.validated_data
@@ -610,61 +614,62 @@ class GestionMembresViewSet(viewsets.ViewSet):
             
             try:
                 emprunt = Emprunt.objects.select_related('membre__utilisateur', 'session_emprunt').get(id=emprunt_id)
-                print(f"✅ Emprunt trouvé:")
-                print(f"   - ID: {emprunt.id}")
-                print(f"   - Membre: {emprunt.membre.numero_membre} - {emprunt.membre.utilisateur.nom_complet}")
-                print(f"   - Montant emprunté: {emprunt.montant_emprunte}")
-                print(f"   - Montant total à rembourser: {emprunt.montant_total_a_rembourser}")
-                print(f"   - Montant déjà remboursé: {emprunt.montant_rembourse}")
-                print(f"   - Montant restant: {emprunt.montant_restant_a_rembourser}")
-                print(f"   - Statut: {emprunt.statut}")
-                print(f"   - Session: {emprunt.session_emprunt.nom}")
-                print(f"   - Date emprunt: {emprunt.date_emprunt}")
-                print(f"   - Date max remboursement: {getattr(emprunt, 'date_remboursement_max', 'N/A')}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("✅ Emprunt trouvé:")
+                    logger.debug("   - ID: %s", emprunt.id)
+                    logger.debug("   - Membre: %s - %s", emprunt.membre.numero_membre, emprunt.membre.utilisateur.nom_complet)
+                    logger.debug("   - Montant emprunté: %s", emprunt.montant_emprunte)
+                    logger.debug("   - Montant total à rembourser: %s", emprunt.montant_total_a_rembourser)
+                    logger.debug("   - Montant déjà remboursé: %s", emprunt.montant_rembourse)
+                    logger.debug("   - Montant restant: %s", emprunt.montant_restant_a_rembourser)
+                    logger.debug("   - Statut: %s", emprunt.statut)
+                    logger.debug("   - Session: %s", emprunt.session_emprunt.nom)
+                    logger.debug("   - Date emprunt: %s", emprunt.date_emprunt)
+                    logger.debug("   - Date max remboursement: %s", getattr(emprunt, 'date_remboursement_max', 'N/A'))
                 
             except Emprunt.DoesNotExist:
                 error_msg = f"Emprunt avec ID {emprunt_id} introuvable"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'emprunt_id': emprunt_id
                 }, status=status.HTTP_404_NOT_FOUND)
             except Exception as e:
                 error_msg = f"Erreur lors de la récupération de l'emprunt: {e}"
-                print(f"❌ ERREUR: {error_msg}")
+                logger.warning("❌ ERREUR: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'emprunt_id': emprunt_id
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
             # 🔧 ÉTAPE 3: Validation du statut de l'emprunt
-            print("🔍 ÉTAPE 3: Validation du statut de l'emprunt")
-            print(f"🔍 Statut actuel: {emprunt.statut}")
+            logger.debug("🔍 ÉTAPE 3: Validation du statut de l'emprunt")
+            logger.debug("🔍 Statut actuel: %s", emprunt.statut)
             
             if emprunt.statut not in ['EN_COURS', 'EN_RETARD']:
                 error_msg = f"Cet emprunt n'est pas remboursable (statut: {emprunt.statut})"
-                print(f"❌ ERREUR STATUT: {error_msg}")
+                logger.warning("❌ ERREUR STATUT: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'statut_actuel': emprunt.statut,
                     'statuts_autorises': ['EN_COURS', 'EN_RETARD']
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            print(f"✅ Statut valide pour remboursement: {emprunt.statut}")
+            logger.debug("✅ Statut valide pour remboursement: %s", emprunt.statut)
             
             # 🔧 ÉTAPE 4: Validation du montant
-            print("🔍 ÉTAPE 4: Validation du montant")
+            logger.debug("🔍 ÉTAPE 4: Validation du montant")
             montant = serializer.validated_data['montant']
-            print(f"🔍 Montant demandé: {montant}")
-            print(f"🔍 Montant restant à rembourser: {emprunt.montant_restant_a_rembourser}")
+            logger.debug("🔍 Montant demandé: %s", montant)
+            logger.debug("🔍 Montant restant à rembourser: %s", emprunt.montant_restant_a_rembourser)
             
             try:
                 montant_decimal = Decimal(str(montant))
-                print(f"✅ Montant converti en Decimal: {montant_decimal}")
+                logger.debug("✅ Montant converti en Decimal: %s", montant_decimal)
                 
                 if montant_decimal <= 0:
                     error_msg = "Le montant du remboursement doit être positif"
-                    print(f"❌ ERREUR MONTANT: {error_msg}")
+                    logger.warning("❌ ERREUR MONTANT: %s", error_msg)
                     return Response({
                         'error': error_msg,
                         'montant_recu': montant
@@ -674,7 +679,7 @@ class GestionMembresViewSet(viewsets.ViewSet):
                 montant_restant = emprunt.montant_restant_a_rembourser
                 if montant_decimal > montant_restant:
                     error_msg = f'Montant trop élevé. Restant à rembourser: {montant_restant}'
-                    print(f"❌ ERREUR MONTANT TROP ÉLEVÉ: {error_msg}")
+                    logger.warning("❌ ERREUR MONTANT TROP ÉLEVÉ: %s", error_msg)
                     return Response({
                         'error': error_msg,
                         'montant_demande': float(montant_decimal),
@@ -682,66 +687,64 @@ class GestionMembresViewSet(viewsets.ViewSet):
                         'montant_max_autorise': float(montant_restant)
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
-                print(f"✅ Montant validé: {montant_decimal}")
+                logger.debug("✅ Montant validé: %s", montant_decimal)
                 
             except (InvalidOperation, TypeError, ValueError) as e:
                 error_msg = f"Montant invalide: {e}"
-                print(f"❌ ERREUR CONVERSION MONTANT: {error_msg}")
+                logger.warning("❌ ERREUR CONVERSION MONTANT: %s", error_msg)
                 return Response({
                     'error': error_msg,
                     'montant_recu': montant
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # 🔧 ÉTAPE 5: Récupération de la session
-            print("🔍 ÉTAPE 5: Récupération de la session")
+            logger.debug("🔍 ÉTAPE 5: Récupération de la session")
             
             try:
                 session = Session.get_session_en_cours()
                 if not session:
                     error_msg = "Aucune session en cours disponible"
-                    print(f"❌ ERREUR SESSION: {error_msg}")
+                    logger.warning("❌ ERREUR SESSION: %s", error_msg)
                     return Response({
                         'error': error_msg
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
-                print(f"✅ Session trouvée:")
-                print(f"   - ID: {session.id}")
-                print(f"   - Nom: {session.nom}")
-                print(f"   - Statut: {session.statut}")
-                print(f"   - Date début: {session.date_creation}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("✅ Session trouvée:")
+                    logger.debug("   - ID: %s", session.id)
+                    logger.debug("   - Nom: %s", session.nom)
+                    logger.debug("   - Statut: %s", session.statut)
+                    logger.debug("   - Date début: %s", session.date_creation)
                 
             except Exception as e:
                 error_msg = f"Erreur lors de la récupération de la session: {e}"
-                print(f"❌ ERREUR SESSION: {error_msg}")
+                logger.warning("❌ ERREUR SESSION: %s", error_msg)
                 return Response({
                     'error': error_msg
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
             # 🔧 ÉTAPE 6: Vérification des remboursements existants
-            print("🔍 ÉTAPE 6: Vérification des remboursements existants")
+            logger.debug("🔍 ÉTAPE 6: Vérification des remboursements existants")
             
-            try:
-                remboursements_existants = Remboursement.objects.filter(emprunt=emprunt)
-                print(f"🔍 Nombre de remboursements existants: {remboursements_existants.count()}")
-                
-                if remboursements_existants.exists():
-                    print("🔍 Remboursements existants:")
+            # Trace de diagnostic uniquement: aucune requête si DEBUG est désactivé
+            if logger.isEnabledFor(logging.DEBUG):
+                remboursements_existants = list(
+                    Remboursement.objects.filter(emprunt=emprunt)[:6]
+                )
+                if remboursements_existants:
+                    logger.debug("🔍 Remboursements existants:")
                     for i, remb in enumerate(remboursements_existants[:5], 1):  # Afficher max 5
-                        print(f"   {i}. ID: {remb.id} - Montant: {remb.montant} - Date: {remb.date_remboursement}")
-                    
-                    if remboursements_existants.count() > 5:
-                        print(f"   ... et {remboursements_existants.count() - 5} autres")
+                        logger.debug("   %s. ID: %s - Montant: %s - Date: %s", i, remb.id, remb.montant, remb.date_remboursement)
+                    if len(remboursements_existants) > 5:
+                        logger.debug("   ... et d'autres")
                 else:
-                    print("   Aucun remboursement existant")
-                    
-            except Exception as e:
-                print(f"⚠️ Erreur lors de la vérification des remboursements existants: {e}")
+                    logger.debug("   Aucun remboursement existant")
             
             # 🔧 ÉTAPE 7: Préparation des données pour création
-            print("🔍 ÉTAPE 7: Préparation des données pour création")
+            logger.debug("🔍 ÉTAPE 7: Préparation des données pour création")
             
             notes = serializer.validated_data.get('notes', '')
-            print(f"🔍 Notes: '{notes}'")
+            logger.debug("🔍 Notes: '%s'", notes)
             
             creation_data = {
                 'emprunt': emprunt,
@@ -749,47 +752,61 @@ class GestionMembresViewSet(viewsets.ViewSet):
                 'session': session,
                 'notes': notes
             }
-            print(f"🔍 Données de création: {creation_data}")
+            logger.debug("🔍 Données de création: %s", creation_data)
             
             # 🔧 ÉTAPE 8: Création du remboursement avec transaction
-            print("🔍 ÉTAPE 8: Création du remboursement")
+            logger.debug("🔍 ÉTAPE 8: Création du remboursement")
             
             try:
                 from django.db import transaction as db_transaction
                 
                 with db_transaction.atomic():
-                    print("🔍 Début de la transaction...")
+                    logger.debug("🔍 Début de la transaction...")
+                    
+                    # Reste dû relu sur l'emprunt verrouillé: un remboursement
+                    # concurrent ne peut pas faire dépasser le total
+                    restant = Emprunt.objects.select_for_update().get(pk=emprunt.pk).montant_restant_a_rembourser
+                    if montant_decimal > restant:
+                        return Response({
+                            'error': f'Montant trop élevé. Restant à rembourser: {restant}',
+                            'montant_demande': float(montant_decimal),
+                            'montant_restant': float(restant),
+                            'montant_max_autorise': float(restant)
+                        }, status=status.HTTP_400_BAD_REQUEST)
                     
                     # Sauvegarder l'état avant modification
                     ancien_montant_rembourse = emprunt.montant_rembourse
                     ancien_statut = emprunt.statut
                     
-                    print(f"🔍 État avant création:")
-                    print(f"   - Ancien montant remboursé: {ancien_montant_rembourse}")
-                    print(f"   - Ancien statut: {ancien_statut}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("🔍 État avant création:")
+                        logger.debug("   - Ancien montant remboursé: %s", ancien_montant_rembourse)
+                        logger.debug("   - Ancien statut: %s", ancien_statut)
                     
                     # Créer le remboursement
-                    print("🔍 Création de l'instance Remboursement...")
+                    logger.debug("🔍 Création de l'instance Remboursement...")
                     remboursement = Remboursement.objects.create(**creation_data)
                     
-                    print(f"✅ Remboursement créé:")
-                    print(f"   - ID: {remboursement.id}")
-                    print(f"   - Montant total: {remboursement.montant}")
-                    print(f"   - Montant capital: {getattr(remboursement, 'montant_capital', 'N/A')}")
-                    print(f"   - Montant intérêt: {getattr(remboursement, 'montant_interet', 'N/A')}")
-                    print(f"   - Date: {remboursement.date_remboursement}")
-                    print(f"   - Session: {remboursement.session.nom}")
-                    print(f"   - Notes: '{remboursement.notes}'")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("✅ Remboursement créé:")
+                        logger.debug("   - ID: %s", remboursement.id)
+                        logger.debug("   - Montant total: %s", remboursement.montant)
+                        logger.debug("   - Montant capital: %s", getattr(remboursement, 'montant_capital', 'N/A'))
+                        logger.debug("   - Montant intérêt: %s", getattr(remboursement, 'montant_interet', 'N/A'))
+                        logger.debug("   - Date: %s", remboursement.date_remboursement)
+                        logger.debug("   - Session: %s", remboursement.session.nom)
+                        logger.debug("   - Notes: '%s'", remboursement.notes)
                     
                     # Recharger l'emprunt pour voir les modifications
-                    print("🔍 Rechargement de l'emprunt...")
+                    logger.debug("🔍 Rechargement de l'emprunt...")
                     emprunt.refresh_from_db()
                     
-                    print(f"✅ État après création:")
-                    print(f"   - Nouveau montant remboursé: {emprunt.montant_rembourse}")
-                    print(f"   - Nouveau montant restant: {emprunt.montant_restant_a_rembourser}")
-                    print(f"   - Nouveau statut: {emprunt.statut}")
-                    print(f"   - Pourcentage remboursé: {emprunt.pourcentage_rembourse:.2f}%")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("✅ État après création:")
+                        logger.debug("   - Nouveau montant remboursé: %s", emprunt.montant_rembourse)
+                        logger.debug("   - Nouveau montant restant: %s", emprunt.montant_restant_a_rembourser)
+                        logger.debug("   - Nouveau statut: %s", emprunt.statut)
+                        logger.debug("   - Pourcentage remboursé: %s%%", emprunt.pourcentage_rembourse)
                     
                     # Préparer la réponse
                     response_data = {
@@ -804,19 +821,13 @@ class GestionMembresViewSet(viewsets.ViewSet):
                         'emprunt_complete': emprunt.statut == 'REMBOURSE'
                     }
                     
-                    print(f"✅ REMBOURSEMENT CRÉÉ AVEC SUCCÈS")
-                    print(f"✅ Données de réponse: {response_data}")
-                    print("=" * 100)
+                    logger.debug("✅ REMBOURSEMENT CRÉÉ AVEC SUCCÈS")
+                    logger.debug("✅ Données de réponse: %s", response_data)
                     
                     return Response(response_data, status=status.HTTP_201_CREATED)
                     
             except Exception as e:
-                print(f"❌ EXCEPTION LORS DE LA CRÉATION: {str(e)}")
-                print(f"❌ TYPE D'EXCEPTION: {type(e)}")
-                import traceback
-                print(f"❌ TRACEBACK COMPLET:")
-                print(traceback.format_exc())
-                print("=" * 100)
+                logger.exception("❌ EXCEPTION LORS DE LA CRÉATION: %s", str(e))
                 
                 return Response({
                     'error': 'Erreur lors de la création du remboursement',
@@ -825,12 +836,7 @@ class GestionMembresViewSet(viewsets.ViewSet):
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
                 
         except Exception as e:
-            print(f"❌ EXCEPTION GÉNÉRALE: {str(e)}")
-            print(f"❌ TYPE D'EXCEPTION: {type(e)}")
-            import traceback
-            print(f"❌ TRACEBACK COMPLET:")
-            print(traceback.format_exc())
-            print("=" * 100)
+            logger.exception("❌ EXCEPTION GÉNÉRALE: %s", str(e))
             
             return Response({
                 'error': 'Erreur interne du serveur',
@@ -839,6 +845,130 @@ class GestionMembresViewSet(viewsets.ViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
    
+    @action(detail=False, methods=['post'])
+    def saisie_session(self, request):
+        """
+        Enregistre en une requête la feuille d'une séance: liste de lignes
+        {type: INSCRIPTION|SOLIDARITE|EPARGNE|RENFLOUEMENT, membre_id,
+        renflouement_id, montant, notes}. Tout ou rien: si une ligne est
+        invalide, aucune n'est enregistrée et les erreurs sont indexées par ligne
+        """
+        serializer = SaisieSessionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'error': 'Données invalides',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        session_id = serializer.validated_data.get('session_id')
+        if session_id:
+            session = Session.objects.filter(id=session_id).first()
+        else:
+            session = Session.get_session_en_cours()
+        if not session:
+            return Response(
+                {'error': 'Session introuvable'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if exercice_termine(session):
+            return Response(
+                {'error': MESSAGE_EXERCICE_TERMINE},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        lignes = serializer.validated_data['lignes']
+        resultats, erreurs = enregistrer_saisie_session(session, lignes)
+        if erreurs:
+            return Response({
+                'error': 'Lignes invalides: aucune ligne enregistrée',
+                'erreurs': erreurs
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        logger.info("Saisie session %s: %s lignes enregistrées", session.nom, len(resultats))
+        return Response({
+            'message': f'{len(resultats)} paiement(s) enregistré(s)',
+            'session_id': str(session.id),
+            'total_encaisse': sum((ligne['montant'] for ligne in lignes), Decimal('0')),
+            'resultats': resultats
+        }, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def importer_membres(self, request):
+        """
+        Inscription groupée de membres: liste JSON `membres` ou fichier CSV
+        `fichier` (mêmes champs que creer_membre_complet). Erreurs indexées
+        par ligne; par défaut rien n'est créé si une ligne est invalide,
+        avec ignorer_erreurs=true seules les lignes valides sont créées
+        """
+        serializer = ImportMembresSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'error': 'Données invalides',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        fichier = serializer.validated_data.get('fichier')
+        if fichier:
+            try:
+                donnees_brutes = lire_csv_membres(fichier)
+            except (UnicodeDecodeError, csv.Error) as e:
+                return Response(
+                    {'error': f'Fichier CSV illisible: {e}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            donnees_brutes = serializer.validated_data['membres']
+        
+        exercice_actuel = Exercice.get_exercice_en_cours()
+        session_actuelle = Session.get_session_en_cours()
+        if not exercice_actuel or not session_actuelle:
+            return Response(
+                {'error': 'Aucun exercice ou aucune session en cours pour l\'inscription'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        lignes, erreurs = [], []
+        for index, donnees in enumerate(donnees_brutes):
+            ligne = LigneImportMembreSerializer(data=donnees)
+            if ligne.is_valid():
+                lignes.append((index, ligne.validated_data))
+            else:
+                erreurs.append({'index': index, 'erreurs': ligne.errors})
+        erreurs_lot = valider_import(lignes)
+        erreurs = sorted(erreurs + erreurs_lot, key=lambda erreur: erreur['index'])
+        
+        if erreurs and not serializer.validated_data['ignorer_erreurs']:
+            return Response({
+                'error': 'Lignes invalides: aucun membre créé',
+                'erreurs': erreurs
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        indices_invalides = {erreur['index'] for erreur in erreurs_lot}
+        lignes = [(index, donnees) for index, donnees in lignes if index not in indices_invalides]
+        if not lignes:
+            return Response({
+                'error': 'Aucune ligne valide',
+                'erreurs': erreurs
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            resultats = creer_membres_en_masse(lignes, exercice_actuel, session_actuelle)
+        except IntegrityError:
+            # valider_import contrôle l'unicité hors transaction: un compte
+            # créé entre-temps avec le même nom ou email annule tout l'import
+            logger.warning("Import groupé annulé: conflit d'unicité pendant la création")
+            return Response(
+                {'error': 'Un membre importé a été créé entre-temps par une autre requête: '
+                          'aucun membre créé, relancez l\'import'},
+                status=status.HTTP_409_CONFLICT
+            )
+        logger.info("Import groupé: %s membres créés, %s lignes en erreur", len(resultats), len(erreurs))
+        return Response({
+            'message': f'{len(resultats)} membre(s) créé(s)',
+            'resultats': resultats,
+            'erreurs': erreurs
+        }, status=status.HTTP_201_CREATED)
+    
     # Ajouter cette méthode dans la classe GestionMembresViewSet
 
     @action(detail=False, methods=['post'])
@@ -846,9 +976,10 @@ class GestionMembresViewSet(viewsets.ViewSet):
         """
         Créer un membre complet (utilisateur + membre) en une seule fois
         """
-        print("*****************REQUETE DE CREATION DE MEMEBRE***************************")
-        print(request.data)
-        print("****************************************************************************")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("*****************REQUETE DE CREATION DE MEMEBRE***************************")
+            logger.debug("%s", donnees_masquees(request.data))
+            logger.debug("****************************************************************************")
         
         
         
@@ -891,14 +1022,14 @@ class GestionMembresViewSet(viewsets.ViewSet):
                 session_actuelle = Session.get_session_en_cours()
                 
                 if not exercice_actuel:
-                    print("Aucun exercice en cours pour l\'inscription")
+                    logger.debug("Aucun exercice en cours pour l\'inscription")
                     return Response(
                         {'error': 'Aucun exercice en cours pour l\'inscription'}, 
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
                 if not session_actuelle:
-                    print("Aucune session en cours pour l\'inscription")
+                    logger.debug("Aucune session en cours pour l\'inscription")
                     return Response(
                         {'error': 'Aucune session en cours pour l\'inscription'}, 
                         status=status.HTTP_400_BAD_REQUEST
@@ -955,59 +1086,101 @@ class RapportsViewSet(viewsets.ViewSet):
         Rapport financier complet de la mutuelle
         """
         # Filtres optionnels
-        date_debut = request.query_params.get('date_debut')
-        date_fin = request.query_params.get('date_fin')
-        exercice_id = request.query_params.get('exercice_id')
+        filtres = self._filtres_periode(request)
+        if isinstance(filtres, Response):
+            return filtres
+        exercice_id, exercice, date_debut, date_fin = filtres
         
-        rapport = self._generer_rapport_financier(date_debut, date_fin, exercice_id)
+        rapport = self._generer_rapport_financier(date_debut, date_fin, exercice_id, exercice=exercice)
         serializer = RapportFinancierSerializer(rapport)
         return Response(serializer.data)
     
-    def _generer_rapport_financier(self, date_debut=None, date_fin=None, exercice_id=None):
-        """Génère un rapport financier détaillé"""
-        from datetime import datetime
-        
-        # Construire les filtres
-        filters_base = Q()
-        if date_debut:
-            filters_base &= Q(date_creation__gte=datetime.fromisoformat(date_debut))
-        if date_fin:
-            filters_base &= Q(date_creation__lte=datetime.fromisoformat(date_fin))
-        if exercice_id:
-            # Adapter selon le modèle
-            pass
-        
-        # Calculs des entrées
-        total_inscriptions = PaiementInscription.objects.filter(filters_base).aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        total_solidarites = PaiementSolidarite.objects.filter(filters_base).aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        total_epargnes = EpargneTransaction.objects.filter(
-            filters_base, type_transaction='DEPOT'
-        ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
-        
-        total_remboursements = Remboursement.objects.filter(filters_base).aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        total_renflouements = PaiementRenflouement.objects.filter(filters_base).aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        # Calculs des sorties
-        total_emprunts = Emprunt.objects.filter(filters_base).aggregate(
-            total=Sum('montant_emprunte'))['total'] or Decimal('0')
+    @action(detail=False, methods=['get'])
+    def tendances(self, request):
+        """
+        Séries temporelles des flux (solidarités, épargnes, emprunts,
+        remboursements, intérêts, assistances...) par session ou par mois,
+        lues sur les totaux matérialisés des sessions
+        """
+        granularite = request.query_params.get('granularite', 'session')
+        if granularite not in GRANULARITES:
+            return Response(
+                {'error': f"Granularité invalide, valeurs possibles: {', '.join(GRANULARITES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filtres = self._filtres_periode(request)
+        if isinstance(filtres, Response):
+            return filtres
+        exercice_id, exercice, date_debut, date_fin = filtres
         
-        total_assistances = AssistanceAccordee.objects.filter(
-            filters_base, statut='PAYEE'
-        ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
+        serializer = TendancesSerializer({
+            'granularite': granularite,
+            'periode': {'date_debut': date_debut, 'date_fin': date_fin, 'exercice_id': exercice_id},
+            'champs': CHAMPS_SERIES,
+            'series': series_tendances(granularite, exercice, date_debut, date_fin),
+        })
+        return Response(serializer.data)
+    
+    def _filtres_periode(self, request):
+        """
+        Lit exercice_id, date_debut et date_fin (AAAA-MM-JJ).
+        Retourne (exercice_id, exercice, date_debut, date_fin), ou la
+        Response d'erreur à renvoyer (400 date invalide, 404 exercice)
+        """
+        exercice_id = request.query_params.get('exercice_id')
+        try:
+            date_debut = self._date_parametre(request, 'date_debut')
+            date_fin = self._date_parametre(request, 'date_fin')
+        except ValueError:
+            return Response(
+                {'error': 'Date invalide, format attendu: AAAA-MM-JJ'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        total_collations = Session.objects.filter(filters_base).aggregate(
-            total=Sum('montant_collation'))['total'] or Decimal('0')
+        exercice = None
+        if exercice_id:
+            try:
+                exercice = Exercice.objects.filter(id=exercice_id).first()
+            except DjangoValidationError:
+                pass
+            if exercice is None:
+                return Response({'error': 'Exercice introuvable'}, status=status.HTTP_404_NOT_FOUND)
+        return exercice_id, exercice, date_debut, date_fin
+    
+    @staticmethod
+    def _date_parametre(request, nom):
+        valeur = request.query_params.get(nom)
+        return date.fromisoformat(valeur) if valeur else None
+    
+    def _generer_rapport_financier(self, date_debut=None, date_fin=None, exercice_id=None, exercice=None):
+        """
+        Génère un rapport financier détaillé avec un nombre fixe de requêtes:
+        une agrégation par table de flux (filtrée sur sa colonne de date
+        réelle et via session__exercice, voir core.cloture.totaux_flux), puis
+        une agrégation conditionnelle par table pour la situation actuelle
+        """
+        flux = totaux_flux(exercice, date_debut=date_debut, date_fin=date_fin)
+        total_inscriptions = flux['total_inscriptions']
+        total_solidarites = flux['total_solidarites']
+        total_epargnes = flux['total_epargnes']
+        total_remboursements = flux['total_remboursements']
+        total_renflouements = flux['total_renflouements']
+        total_emprunts = flux['total_emprunts']
+        total_assistances = flux['total_assistances']
+        total_collations = flux['total_collations']
         
-        # Situation actuelle
+        # Situation actuelle: soldes matérialisés (une ligne par membre)
         fonds_social = FondsSocial.get_fonds_actuel()
-        cumul_epargnes = sum(m.calculer_epargne_totale() for m in Membre.objects.all())
+        soldes = SoldeMembre.objects.aggregate(
+            cumul_epargnes=Sum('epargne_totale'),
+            renflouement_du=Sum('renflouement_du'),
+            renflouement_paye=Sum('renflouement_paye'),
+        )
+        cumul_epargnes = soldes['cumul_epargnes'] or Decimal('0')
+        membres = Membre.objects.aggregate(
+            total=Count('id'),
+            en_regle=Count('id', filter=Q(statut='EN_REGLE')),
+        )
         
         entrees_totales = (
             total_inscriptions + total_solidarites + total_epargnes + 
@@ -1042,18 +1215,18 @@ class RapportsViewSet(viewsets.ViewSet):
                 'liquidites_totales': (fonds_social.montant_total if fonds_social else Decimal('0')) + cumul_epargnes
             },
             'indicateurs': {
-                'nombre_membres_total': Membre.objects.count(),
-                'nombre_membres_en_regle': Membre.objects.filter(statut='EN_REGLE').count(),
+                'nombre_membres_total': membres['total'],
+                'nombre_membres_en_regle': membres['en_regle'],
                 'nombre_emprunts_en_cours': Emprunt.objects.filter(statut='EN_COURS').count(),
-                'taux_recouvrement_renflouements': self._calculer_taux_recouvrement()
+                'taux_recouvrement_renflouements': self._calculer_taux_recouvrement(
+                    soldes['renflouement_du'] or Decimal('0'),
+                    soldes['renflouement_paye'] or Decimal('0')
+                )
             }
         }
     
-    def _calculer_taux_recouvrement(self):
+    def _calculer_taux_recouvrement(self, total_du, total_paye):
         """Calcule le taux de recouvrement des renflouements"""
-        total_du = Renflouement.objects.aggregate(total=Sum('montant_du'))['total'] or Decimal('0')
-        total_paye = Renflouement.objects.aggregate(total=Sum('montant_paye'))['total'] or Decimal('0')
-        
         if total_du == 0:
             return 100
         return float((total_paye / total_du) * 100)
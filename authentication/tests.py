@@ -1,3 +1,18 @@
+from django.contrib.auth.hashers import check_password
 from django.test import TestCase
 
-# Create your tests here.
+from authentication.utils import SEUIL_HACHAGE_PARALLELE, hacher_mots_de_passe
+
+
+class HachageMotsDePasseTests(TestCase):
+    def test_hachage_parallele_dans_l_ordre(self):
+        mots_de_passe = [f"secret{indice}" for indice in range(SEUIL_HACHAGE_PARALLELE + 2)]
+        hashes = hacher_mots_de_passe(mots_de_passe, processus=2)
+
+        self.assertEqual(len(hashes), len(mots_de_passe))
+        for mot_de_passe, hash_ in zip(mots_de_passe, hashes):
+            self.assertTrue(check_password(mot_de_passe, hash_))
+
+    def test_sel_distinct_pour_un_meme_mot_de_passe(self):
+        hashes = hacher_mots_de_passe(['0000'] * SEUIL_HACHAGE_PARALLELE, processus=2)
+        self.assertEqual(len(set(hashes)), len(hashes))
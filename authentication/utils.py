@@ -1,2 +1,41 @@
 # Utilitaires pour l'authentification (JWT, PIN, etc.)
+import os
+from concurrent.futures import ProcessPoolExecutor
 
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+# En dessous de ce nombre, démarrer des processus coûte plus que le hachage
+SEUIL_HACHAGE_PARALLELE = 8
+
+
+def _initialiser_processus():
+    """Les processus lancés en 'spawn' (macOS, Windows) doivent charger Django"""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _hacher_paquet(mots_de_passe):
+    return [make_password(mot_de_passe) for mot_de_passe in mots_de_passe]
+
+
+def hacher_mots_de_passe(mots_de_passe, processus=None):
+    """
+    Hache une liste de mots de passe (PBKDF2 par défaut, coûteux en CPU)
+    en répartissant le travail sur plusieurs processus (au plus
+    IMPORT_HACHAGE_PROCESSUS par défaut, un pool par appel).
+    Chaque mot de passe garde son propre sel. Retourne les hash dans l'ordre.
+    """
+    mots_de_passe = list(mots_de_passe)
+    processus = min(processus or settings.IMPORT_HACHAGE_PROCESSUS, os.cpu_count() or 1)
+    if processus < 2 or len(mots_de_passe) < SEUIL_HACHAGE_PARALLELE:
+        return _hacher_paquet(mots_de_passe)
+
+    processus = min(processus, len(mots_de_passe))
+    taille = -(-len(mots_de_passe) // processus)
+    paquets = [mots_de_passe[debut:debut + taille] for debut in range(0, len(mots_de_passe), taille)]
+    with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser_processus) as executeur:
+        return [hash_ for paquet in executeur.map(_hacher_paquet, paquets) for hash_ in paquet]
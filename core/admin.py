@@ -3,7 +3,8 @@ from django.utils.html import format_html
 from django.db.models import Sum
 from .models import (
     ConfigurationMutuelle, Exercice, Session, TypeAssistance, 
-    Membre, FondsSocial, MouvementFondsSocial
+    Membre, SoldeMembre, FondsSocial, MouvementFondsSocial, SequenceNumerotation,
+    TacheDifferee, ClotureExercice, TotauxSession
 )
 
 @admin.register(ConfigurationMutuelle)
@@ -114,6 +115,7 @@ class MembreAdmin(admin.ModelAdmin):
         'statut_formate', 'epargne_totale', 'date_inscription'
     )
     list_filter = ('statut', 'exercice_inscription', 'date_inscription')
+    list_select_related = ('utilisateur', 'solde')
     search_fields = (
         'numero_membre', 'utilisateur__first_name', 
         'utilisateur__last_name', 'utilisateur__email'
@@ -187,6 +189,42 @@ class MembreAdmin(admin.ModelAdmin):
             return self.readonly_fields + ('utilisateur',)
         return self.readonly_fields
 
+@admin.register(SoldeMembre)
+class SoldeMembreAdmin(admin.ModelAdmin):
+    list_display = (
+        'membre', 'epargne_totale', 'emprunt_restant',
+        'renflouement_du', 'renflouement_paye', 'date_modification'
+    )
+    list_select_related = ('membre__utilisateur',)
+    search_fields = ('membre__numero_membre', 'membre__utilisateur__last_name')
+    
+    def has_add_permission(self, request):
+        # Les soldes sont maintenus automatiquement par les transactions
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(TotauxSession)
+class TotauxSessionAdmin(admin.ModelAdmin):
+    list_display = (
+        'session', 'solidarites', 'epargnes_deposees', 'emprunts_decaisses',
+        'remboursements', 'assistances_payees', 'date_modification'
+    )
+    list_select_related = ('session',)
+    
+    def has_add_permission(self, request):
+        # Les totaux sont maintenus automatiquement par les transactions
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(SequenceNumerotation)
+class SequenceNumerotationAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'dernier_numero', 'date_modification')
+    readonly_fields = ('date_modification',)
+
 @admin.register(TypeAssistance)
 class TypeAssistanceAdmin(admin.ModelAdmin):
     list_display = ('nom', 'montant_formate', 'actif', 'nombre_accordees', 'date_creation')
@@ -258,4 +296,29 @@ class MouvementFondsSocialAdmin(admin.ModelAdmin):
     
     def description_courte(self, obj):
         return obj.description[:50] + "..." if len(obj.description) > 50 else obj.description
-    description_courte.short_description = 'Description'
\ No newline at end of file
+    description_courte.short_description = 'Description'
+
+@admin.register(ClotureExercice)
+class ClotureExerciceAdmin(admin.ModelAdmin):
+    list_display = ('exercice', 'fonds_social_final', 'cumul_epargnes', 'nombre_membres', 'date_cloture')
+    readonly_fields = [field.name for field in ClotureExercice._meta.fields]
+
+@admin.register(TacheDifferee)
+class TacheDiffereeAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'statut', 'tentatives', 'executer_apres', 'date_execution', 'date_creation')
+    list_filter = ('statut', 'nom')
+    search_fields = ('nom', 'cle_idempotence', 'derniere_erreur')
+    readonly_fields = (
+        'nom', 'parametres', 'cle_idempotence', 'tentatives', 'date_prise',
+        'date_execution', 'derniere_erreur', 'date_creation'
+    )
+    actions = ['relancer_taches']
+    
+    def relancer_taches(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.filter(statut='ECHEC').update(
+            statut='EN_ATTENTE', tentatives=0, executer_apres=timezone.now()
+        )
+        self.message_user(request, f"{updated} tâche(s) relancée(s).")
+    relancer_taches.short_description = "Relancer les tâches en échec"
+
@@ -0,0 +1,367 @@
+"""
+Jeu de données synthétique et mesures de performance des endpoints clés.
+Utilisé par les commandes generer_donnees et benchmark, et par les tests.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+MOT_DE_PASSE_PAR_DEFAUT = 'mutuelle2025'
+
+
+def generer_mutuelle(nombre_membres, nombre_sessions=12, nombre_exercices=1,
+                     nombre_assistances=3, graine=0, taille_lot=1000):
+    """
+    Crée une mutuelle réaliste par bulk_create: exercices, sessions,
+    membres avec inscriptions, solidarités, épargnes, emprunts et
+    remboursements, assistances et renflouements (70% de membres à jour). Les soldes et statuts
+    sont ensuite reconstruits en lot.
+    Retourne un dictionnaire {modèle: nombre de lignes créées}
+    """
+    from authentication.models import Utilisateur
+    from core.models import (
+        ConfigurationMutuelle, Exercice, Session, TypeAssistance,
+        Membre, FondsSocial
+    )
+    from core.utils import recalculer_soldes_membres, recalculer_statuts_membres, recalculer_totaux_sessions
+    from transactions.models import (
+        PaiementInscription, PaiementSolidarite, EpargneTransaction,
+        Emprunt, Remboursement, AssistanceAccordee, Renflouement,
+        PaiementRenflouement
+    )
+
+    aleatoire = random.Random(graine)
+    config = ConfigurationMutuelle.get_configuration()
+    taux_interet = Decimal(str(config.taux_interet))
+    montant_inscription = Decimal(str(config.montant_inscription))
+    montant_solidarite = Decimal(str(config.montant_solidarite))
+    aujourd_hui = date.today()
+    nombre_exercices = max(1, nombre_exercices)
+    sessions_par_exercice = max(1, nombre_sessions // nombre_exercices)
+    compteurs = {}
+
+    with transaction.atomic():
+        # Exercices (le dernier est en cours) et sessions mensuelles
+        exercices = []
+        sessions = []
+        for rang in range(nombre_exercices):
+            anciennete = nombre_exercices - 1 - rang
+            debut = aujourd_hui - timedelta(days=30 * sessions_par_exercice * anciennete + 30 * (sessions_par_exercice - 1))
+            exercice = Exercice.objects.create(
+                nom=f"Exercice simulé {rang + 1}",
+                date_debut=debut,
+                statut='EN_COURS' if anciennete == 0 else 'TERMINE'
+            )
+            exercices.append(exercice)
+            for numero in range(sessions_par_exercice):
+                derniere = anciennete == 0 and numero == sessions_par_exercice - 1
+                sessions.append(Session(
+                    exercice=exercice,
+                    nom=f"Session {numero + 1} - {exercice.nom}",
+                    date_session=debut + timedelta(days=30 * numero),
+                    montant_collation=Decimal('0'),
+                    statut='EN_COURS' if derniere else 'TERMINEE'
+                ))
+        Session.objects.bulk_create(sessions)
+        compteurs['exercices'] = len(exercices)
+        compteurs['sessions'] = len(sessions)
+
+        # Utilisateurs et membres (mot de passe haché une seule fois)
+        mot_de_passe = make_password(MOT_DE_PASSE_PAR_DEFAUT)
+        utilisateurs = [
+            Utilisateur(
+                username=f"membre{indice:05d}",
+                email=f"membre{indice:05d}@mutuelle.test",
+                first_name=f"Prenom{indice}",
+                last_name=f"Nom{indice}",
+                telephone=f"6{indice:08d}",
+                password=mot_de_passe,
+                role='MEMBRE'
+            )
+            for indice in range(nombre_membres)
+        ]
+        Utilisateur.objects.bulk_create(utilisateurs, batch_size=taille_lot)
+
+        numeros = Membre.reserver_numeros(nombre_membres)
+        membres = []
+        for indice, utilisateur in enumerate(utilisateurs):
+            session = aleatoire.choice(sessions[:max(1, len(sessions) // 2)])
+            membres.append(Membre(
+                utilisateur=utilisateur,
+                numero_membre=numeros[indice],
+                date_inscription=session.exercice.date_debut,
+                exercice_inscription=session.exercice,
+                session_inscription=session,
+                statut='EN_REGLE'
+            ))
+        Membre.objects.bulk_create(membres, batch_size=taille_lot)
+        compteurs['membres'] = len(membres)
+
+        # 70% de membres assidus (tout payé), les autres avec des impayés
+        assidus = {membre.id for membre in membres if aleatoire.random() < 0.7}
+        inscriptions = []
+        solidarites = []
+        epargnes = []
+        for membre in membres:
+            assidu = membre.id in assidus
+            complete = assidu or aleatoire.random() < 0.5
+            inscriptions.append(PaiementInscription(
+                membre=membre,
+                montant=montant_inscription if complete else montant_inscription / 2,
+                session=membre.session_inscription
+            ))
+            for session in sessions:
+                if session.exercice.date_debut < membre.date_inscription:
+                    continue
+                if assidu or aleatoire.random() < 0.7:
+                    solidarites.append(PaiementSolidarite(
+                        membre=membre, session=session, montant=montant_solidarite
+                    ))
+                if aleatoire.random() < 0.3:
+                    epargnes.append(EpargneTransaction(
+                        membre=membre, session=session, type_transaction='DEPOT',
+                        montant=Decimal(aleatoire.randint(5, 100) * 1000)
+                    ))
+        PaiementInscription.objects.bulk_create(inscriptions, batch_size=taille_lot)
+        PaiementSolidarite.objects.bulk_create(solidarites, batch_size=taille_lot)
+        compteurs['paiements_inscription'] = len(inscriptions)
+        compteurs['paiements_solidarite'] = len(solidarites)
+
+        # Emprunts en cours pour 20% des membres, avec remboursements partiels
+        session_courante = sessions[-1]
+        emprunts = []
+        remboursements = []
+        for membre in aleatoire.sample(membres, len(membres) // 5):
+            montant = Decimal(aleatoire.randint(10, 200) * 1000)
+            total = (montant * (1 + taux_interet / 100)).quantize(Decimal('0.01'))
+            rembourse = Decimal(aleatoire.randint(0, 5) * 1000)
+            emprunt = Emprunt(
+                membre=membre,
+                montant_emprunte=montant,
+                taux_interet=taux_interet,
+                montant_total_a_rembourser=total,
+                montant_rembourse=rembourse,
+                montant_capital_rembourse=rembourse,
+                session_emprunt=session_courante,
+                date_remboursement_max=aujourd_hui + timedelta(days=60),
+                statut='EN_COURS'
+            )
+            emprunts.append(emprunt)
+            epargnes.append(EpargneTransaction(
+                membre=membre, session=session_courante, type_transaction='RETRAIT_PRET',
+                montant=-montant
+            ))
+            if rembourse:
+                remboursements.append(Remboursement(
+                    emprunt=emprunt, montant=rembourse, session=session_courante,
+                    montant_capital=rembourse, montant_interet=Decimal('0')
+                ))
+        EpargneTransaction.objects.bulk_create(epargnes, batch_size=taille_lot)
+        Emprunt.objects.bulk_create(emprunts, batch_size=taille_lot)
+        Remboursement.objects.bulk_create(remboursements, batch_size=taille_lot)
+        compteurs['epargne_transactions'] = len(epargnes)
+        compteurs['emprunts'] = len(emprunts)
+        compteurs['remboursements'] = len(remboursements)
+
+        # Assistances payées et renflouements correspondants (moitié payés)
+        type_assistance, _ = TypeAssistance.objects.get_or_create(
+            nom='Décès (simulation)', defaults={'montant': Decimal('200000')}
+        )
+        assistances = [
+            AssistanceAccordee(
+                membre=aleatoire.choice(membres),
+                type_assistance=type_assistance,
+                montant=type_assistance.montant,
+                session=aleatoire.choice(sessions),
+                statut='PAYEE',
+                date_paiement=timezone.now(),
+                justification='Assistance simulée'
+            )
+            for _ in range(nombre_assistances)
+        ]
+        AssistanceAccordee.objects.bulk_create(assistances)
+
+        renflouements = []
+        for assistance in assistances:
+            part = (assistance.montant / max(1, len(membres))).quantize(Decimal('0.01'))
+            for membre in membres:
+                paye = part if membre.id in assidus or aleatoire.random() < 0.3 else Decimal('0')
+                renflouements.append(Renflouement(
+                    membre=membre, session=assistance.session, montant_du=part,
+                    montant_paye=paye, type_cause='ASSISTANCE',
+                    cause=f"Assistance {type_assistance.nom}"
+                ))
+        Renflouement.objects.bulk_create(renflouements, batch_size=taille_lot)
+        PaiementRenflouement.objects.bulk_create([
+            PaiementRenflouement(
+                renflouement=renflouement, montant=renflouement.montant_paye,
+                session=renflouement.session
+            )
+            for renflouement in renflouements if renflouement.montant_paye
+        ], batch_size=taille_lot)
+        compteurs['assistances'] = len(assistances)
+        compteurs['renflouements'] = len(renflouements)
+
+        # Fonds social de l'exercice en cours: solidarités + renflouements payés
+        total_fonds = (
+            (PaiementSolidarite.objects.aggregate(total=Sum('montant'))['total'] or Decimal('0')) +
+            (PaiementRenflouement.objects.aggregate(total=Sum('montant'))['total'] or Decimal('0'))
+        )
+        FondsSocial.objects.update_or_create(
+            exercice=exercices[-1], defaults={'montant_total': total_fonds}
+        )
+
+    recalculer_soldes_membres()
+    recalculer_totaux_sessions()
+    recalculer_statuts_membres()
+    return compteurs
+
+
+def _scenarios(contexte):
+    """
+    Scénarios mesurés: (nom, méthode, url, données), avec un membre et
+    un emprunt tirés au hasard à chaque répétition.
+    """
+    from core.models import Exercice, Membre, TypeAssistance
+    from transactions.models import Emprunt
+
+    aleatoire = contexte['aleatoire']
+    membre_ids = contexte.setdefault(
+        'membre_ids', list(Membre.objects.values_list('id', flat=True))
+    )
+    emprunt_ids = contexte.setdefault(
+        'emprunt_ids', list(Emprunt.objects.filter(statut='EN_COURS').values_list('id', flat=True))
+    )
+    type_assistance = TypeAssistance.objects.order_by('nom').first()
+    exercice = Exercice.get_exercice_en_cours()
+    fin_periode = timezone.localdate()
+    debut_periode = fin_periode - timedelta(days=90)
+
+    scenarios = [
+        ('membres_liste', 'get', '/api/core/membres/', None),
+        ('donnees_completes', 'get',
+         f"/api/core/membres/{aleatoire.choice(membre_ids)}/donnees_completes/", None),
+        ('dashboard_complet', 'get', '/api/administration/dashboard/dashboard_complet/', None),
+        ('rapport_financier_complet', 'get', '/api/administration/rapports/rapport_financier_complet/', None),
+        ('tendances_mois', 'get', '/api/administration/rapports/tendances/?granularite=mois', None),
+        ('rapport_financier_periode', 'get',
+         f"/api/administration/rapports/rapport_financier_complet/?date_debut={debut_periode}&date_fin={fin_periode}",
+         None),
+    ]
+    if exercice:
+        scenarios.append((
+            'rapport_financier_exercice', 'get',
+            f"/api/administration/rapports/rapport_financier_complet/?exercice_id={exercice.id}", None
+        ))
+    if emprunt_ids:
+        scenarios.append((
+            'ajouter_remboursement', 'post',
+            '/api/administration/gestion-membres/ajouter_remboursement/',
+            {'emprunt': str(aleatoire.choice(emprunt_ids)), 'montant': '1000', 'notes': 'Benchmark'}
+        ))
+    if type_assistance:
+        scenarios.append((
+            'paiement_assistance', 'post', '/api/transactions/assistances/',
+            {
+                'membre': str(aleatoire.choice(membre_ids)),
+                'type_assistance': str(type_assistance.id),
+                'montant': str(type_assistance.montant),
+                'statut': 'PAYEE',
+                'justification': 'Benchmark'
+            }
+        ))
+    return scenarios
+
+
+@contextmanager
+def _executer_on_commit():
+    """
+    Exécute à la sortie du bloc les callbacks on_commit enregistrés dedans,
+    alors que la transaction englobante (annulée ensuite) n'est pas commitée.
+    Les callbacks peuvent en enregistrer d'autres, exécutés à leur tour
+    """
+    debut = len(connection.run_on_commit)
+    yield
+    while len(connection.run_on_commit) > debut:
+        _, callback, robuste = connection.run_on_commit.pop(debut)
+        try:
+            callback()
+        except Exception:
+            if not robuste:
+                raise
+
+
+def mesurer_scenarios(client, repetitions=5, graine=0, vider_cache=True):
+    """
+    Exécute chaque scénario `repetitions` fois avec le client de test
+    (déjà authentifié en administrateur) et retourne, par scénario:
+    statuts HTTP, nombre de requêtes SQL (max) et latences p50/p95 en ms
+    """
+    contexte = {'aleatoire': random.Random(graine)}
+    mesures = {}
+
+    for _ in range(repetitions):
+        for nom, methode, url, donnees in _scenarios(contexte):
+            if vider_cache:
+                cache.clear()
+            # Chaque itération est annulée: les répétitions mesurent le même état.
+            # Les callbacks on_commit (recalcul des statuts, invalidations) sont
+            # exécutés dans la fenêtre mesurée comme ils le seraient en production.
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as requetes:
+                    debut = time.perf_counter()
+                    with _executer_on_commit():
+                        if methode == 'get':
+                            reponse = client.get(url)
+                        else:
+                            reponse = client.post(url, donnees, content_type='application/json')
+                    duree = (time.perf_counter() - debut) * 1000
+                transaction.set_rollback(True)
+
+            mesure = mesures.setdefault(nom, {'statuts': set(), 'requetes': 0, 'durees': []})
+            mesure['statuts'].add(reponse.status_code)
+            mesure['requetes'] = max(mesure['requetes'], len(requetes))
+            mesure['durees'].append(duree)
+
+    resultats = {}
+    for nom, mesure in mesures.items():
+        durees = sorted(mesure['durees'])
+        if len(durees) > 1:
+            quantiles = statistics.quantiles(durees, n=20, method='inclusive')
+            p50, p95 = statistics.median(durees), quantiles[18]
+        else:
+            p50 = p95 = durees[0]
+        resultats[nom] = {
+            'statuts': sorted(mesure['statuts']),
+            'requetes': mesure['requetes'],
+            'p50_ms': round(p50, 2),
+            'p95_ms': round(p95, 2),
+        }
+    return resultats
+
+
+def creer_administrateur_benchmark():
+    from authentication.models import Utilisateur
+
+    administrateur, _ = Utilisateur.objects.get_or_create(
+        email='admin.benchmark@mutuelle.test',
+        defaults={
+            'username': 'admin_benchmark',
+            'first_name': 'Admin',
+            'last_name': 'Benchmark',
+            'telephone': '600000000',
+            'role': 'ADMINISTRATEUR',
+        }
+    )
+    return administrateur
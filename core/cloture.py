@@ -0,0 +1,192 @@
+"""
+Clôture d'exercice: photographie des flux d'un exercice terminé.
+
+Quand un exercice passe à TERMINE, ses totaux (mutuelle et par membre)
+sont figés dans ClotureExercice / SoldeMembreCloture. Les lectures
+historiques (données d'un membre, rapport financier, trésor) additionnent
+alors ces lignes, une par exercice clos, et n'agrègent les transactions
+que pour les exercices sans clôture: le coût ne croît plus avec les années.
+
+Règle de partition: une transaction appartient à l'exercice de sa session.
+Elle est lue dans la photographie si cet exercice a une clôture, en direct
+sinon (filtre session__exercice__cloture__isnull=True).
+
+Les transactions d'un exercice terminé sont figées: l'API refuse de les
+créer, modifier ou supprimer (exercice_termine), sans quoi elles
+disparaîtraient à la fois des totaux en direct et de la photographie.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .managers import MONTANT_EPARGNE_SIGNE
+from .signals import creations_en_masse
+
+logger = logging.getLogger(f'mutuelle.{__name__}')
+
+
+# Sessions dont la solidarité est due (les sessions PLANIFIEE ne comptent pas),
+# mêmes statuts pour la lecture en direct et pour la photographie
+STATUTS_SESSIONS_DUES = ('EN_COURS', 'TERMINEE')
+
+MESSAGE_EXERCICE_TERMINE = (
+    "L'exercice de cette session est terminé: ses transactions ne peuvent plus être modifiées"
+)
+
+
+def exercice_termine(session):
+    """Vrai si la session appartient à un exercice terminé (transactions figées)"""
+    return session is not None and session.exercice.statut == 'TERMINE'
+
+
+def non_clos(chemin_session='session'):
+    """Filtre des lignes dont l'exercice n'a pas (encore) de clôture"""
+    return Q(**{f'{chemin_session}__exercice__cloture__isnull': True})
+
+
+def _total(queryset, champ='montant'):
+    return queryset.aggregate(total=Sum(champ))['total'] or Decimal('0')
+
+
+def _par_membre(queryset, **agregats):
+    return queryset.order_by().values('membre_id').annotate(**agregats)
+
+
+def _sources_flux():
+    """
+    Champ de ClotureExercice -> (modèle, champ montant, condition propre à la
+    source, chemin vers l'exercice, colonne de date réelle du modèle)
+    """
+    from transactions.models import (
+        AssistanceAccordee, Emprunt, EpargneTransaction, PaiementInscription,
+        PaiementRenflouement, PaiementSolidarite, Remboursement
+    )
+    from .models import Session
+
+    return {
+        'total_inscriptions': (PaiementInscription, 'montant', Q(), 'session__exercice', 'date_paiement'),
+        'total_solidarites': (PaiementSolidarite, 'montant', Q(), 'session__exercice', 'date_paiement'),
+        'total_epargnes': (EpargneTransaction, 'montant', Q(type_transaction='DEPOT'), 'session__exercice', 'date_transaction'),
+        'total_remboursements': (Remboursement, 'montant', Q(), 'session__exercice', 'date_remboursement'),
+        'total_renflouements': (PaiementRenflouement, 'montant', Q(), 'session__exercice', 'date_paiement'),
+        'total_emprunts': (Emprunt, 'montant_emprunte', Q(), 'session_emprunt__exercice', 'date_emprunt'),
+        'total_assistances': (AssistanceAccordee, 'montant', Q(statut='PAYEE'), 'session__exercice', 'date_paiement'),
+        'total_collations': (Session, 'montant_collation', Q(), 'exercice', 'date_session'),
+    }
+
+
+def filtre_periode(colonne, date_debut=None, date_fin=None):
+    """
+    Filtre indexable sur une colonne de date: bornes incluses, exprimées
+    en intervalle [début, lendemain de la fin[ pour les DateTimeField
+    (pas de __date, qui empêcherait l'usage de l'index)
+    """
+    from datetime import datetime, time, timedelta
+    from django.utils import timezone
+
+    def instant(jour):
+        return timezone.make_aware(datetime.combine(jour, time.min))
+
+    filtre = Q()
+    if colonne == 'date_session':
+        if date_debut:
+            filtre &= Q(date_session__gte=date_debut)
+        if date_fin:
+            filtre &= Q(date_session__lte=date_fin)
+        return filtre
+    if date_debut:
+        filtre &= Q(**{f'{colonne}__gte': instant(date_debut)})
+    if date_fin:
+        filtre &= Q(**{f'{colonne}__lt': instant(date_fin + timedelta(days=1))})
+    return filtre
+
+
+def totaux_flux(exercice=None, utiliser_cloture=True, date_debut=None, date_fin=None):
+    """
+    Entrées et sorties (champs ClotureExercice.CHAMPS_FLUX), une requête
+    d'agrégation par table.
+
+    Sans période: un exercice clos est lu directement dans sa clôture (une
+    requête); toute l'histoire (exercice None) = somme des clôtures plus
+    agrégation des seuls exercices ouverts.
+    Avec une période (dates incluses, sur la colonne de date réelle de
+    chaque modèle): agrégation directe, restreinte à l'exercice s'il est donné
+    """
+    from .models import ClotureExercice
+
+    champs = ClotureExercice.CHAMPS_FLUX
+    periode = date_debut is not None or date_fin is not None
+    base = {champ: Decimal('0') for champ in champs}
+    if not periode and exercice is not None and utiliser_cloture:
+        cloture = ClotureExercice.objects.filter(exercice=exercice).first()
+        if cloture:
+            return {champ: getattr(cloture, champ) for champ in champs}
+    elif not periode and exercice is None:
+        sommes = ClotureExercice.objects.aggregate(**{champ: Sum(champ) for champ in champs})
+        base = {champ: sommes[champ] or Decimal('0') for champ in champs}
+
+    totaux = {}
+    for champ, (modele, montant, condition, chemin, colonne) in _sources_flux().items():
+        if exercice is not None:
+            filtre = Q(**{chemin: exercice})
+        elif periode:
+            filtre = Q()
+        else:
+            filtre = Q(**{f'{chemin}__cloture__isnull': True})
+        filtre &= condition & filtre_periode(colonne, date_debut, date_fin)
+        totaux[champ] = base[champ] + _total(modele.objects.filter(filtre), montant)
+    return totaux
+
+
+def cloturer_exercice(exercice):
+    """
+    (Re)construit la photographie de l'exercice. Idempotent: une clôture
+    existante est remplacée. Retourne la ClotureExercice créée
+    """
+    from transactions.models import Emprunt, PaiementInscription, PaiementSolidarite, Renflouement
+    from .models import ClotureExercice, FondsSocial, Membre, SoldeMembre, SoldeMembreCloture
+
+    dans_exercice = Q(session__exercice=exercice)
+
+    with transaction.atomic():
+        ClotureExercice.objects.filter(exercice=exercice).delete()
+
+        fonds = FondsSocial.objects.filter(exercice=exercice).first()
+        cloture = ClotureExercice.objects.create(
+            exercice=exercice,
+            fonds_social_final=fonds.montant_total if fonds else Decimal('0'),
+            cumul_epargnes=_total(SoldeMembre.objects.all(), 'epargne_totale'),
+            nombre_membres=Membre.objects.count(),
+            nombre_membres_en_regle=Membre.objects.filter(statut='EN_REGLE').count(),
+            **totaux_flux(exercice, utiliser_cloture=False)
+        )
+
+        flux = defaultdict(dict)
+        for ligne in _par_membre(PaiementInscription.objects.filter(dans_exercice), total=Sum('montant')):
+            flux[ligne['membre_id']]['inscription_payee'] = ligne['total']
+        solidarites_dues = PaiementSolidarite.objects.filter(
+            dans_exercice, session__statut__in=STATUTS_SESSIONS_DUES
+        )
+        for ligne in _par_membre(solidarites_dues, total=Sum('montant')):
+            flux[ligne['membre_id']]['solidarite_payee'] = ligne['total']
+        epargnes = Membre.objects.filter(
+            transactions_epargne__session__exercice=exercice
+        ).order_by().values('id').annotate(total=Sum(MONTANT_EPARGNE_SIGNE))
+        for ligne in epargnes:
+            flux[ligne['id']]['epargne'] = ligne['total']
+        for ligne in _par_membre(Emprunt.objects.filter(session_emprunt__exercice=exercice), total=Count('id')):
+            flux[ligne['membre_id']]['nombre_emprunts'] = ligne['total']
+        for ligne in _par_membre(Renflouement.objects.filter(dans_exercice), total=Count('id')):
+            flux[ligne['membre_id']]['nombre_renflouements'] = ligne['total']
+
+        SoldeMembreCloture.objects.bulk_create([
+            SoldeMembreCloture(cloture=cloture, membre_id=membre_id, **valeurs)
+            for membre_id, valeurs in flux.items()
+        ], batch_size=500)
+
+    creations_en_masse.send(sender=ClotureExercice)
+    logger.info("Exercice %s clôturé: %s membres photographiés", exercice.nom, len(flux))
+    return cloture
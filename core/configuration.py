@@ -0,0 +1,73 @@
+"""
+Cache en mémoire de la ConfigurationMutuelle, partagé par tout le processus.
+
+La configuration est lue sur presque tous les chemins (statut en règle,
+emprunts, filtres, dashboard) et ne change que par l'administration. Le
+processus garde donc une instance en mémoire, associée à sa version en base:
+la clé (pk, version) de la ligne de configuration, relue par une requête
+d'une ligne. Le champ version est incrémenté en base (F('version') + 1) par
+save() comme par queryset.update(): deux écritures donnent toujours deux
+versions distinctes, quelle que soit la résolution de l'horloge.
+
+- Dans une requête HTTP ou une tâche différée (portée de core.contexte), la
+  version est vérifiée une seule fois: une modification faite par un autre
+  worker est prise en compte dès la requête suivante, tous les autres appels
+  lisent la mémoire.
+- Hors portée (commandes, shell), la version est vérifiée à chaque appel.
+
+Chaque appel renvoie une copie de l'instance en cache: un appelant qui la
+modifie (avec ou sans save()) ne change pas la configuration vue par les autres.
+"""
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# (version, configuration) du processus, remplacé d'un bloc
+_cache = (None, None)
+# Portée courante: {'verifiee': bool}, None hors requête
+_portee = ContextVar('portee_configuration', default=None)
+
+
+def _version_en_base():
+    from .models import ConfigurationMutuelle
+
+    return ConfigurationMutuelle.objects.order_by('pk').values_list('pk', 'version').first()
+
+
+def configuration_courante():
+    """Configuration de la mutuelle (créée par défaut si absente)"""
+    global _cache
+    from .models import ConfigurationMutuelle
+
+    portee = _portee.get()
+    if portee is not None and portee['verifiee'] and _cache[1] is not None:
+        return copy.copy(_cache[1])
+
+    version = _version_en_base()
+    if version is None or version != _cache[0]:
+        configuration = ConfigurationMutuelle.objects.order_by('pk').first()
+        if configuration is None:
+            configuration = ConfigurationMutuelle.objects.create()
+        _cache = ((configuration.pk, configuration.version), configuration)
+    if portee is not None:
+        portee['verifiee'] = True
+    return copy.copy(_cache[1])
+
+
+def oublier_configuration():
+    """Vide le cache du processus (après une sauvegarde ou une suppression)"""
+    global _cache
+    _cache = (None, None)
+    portee = _portee.get()
+    if portee is not None:
+        portee['verifiee'] = False
+
+
+@contextmanager
+def portee_configuration():
+    """Bloc (une requête HTTP) dans lequel la version n'est vérifiée qu'une fois"""
+    jeton = _portee.set({'verifiee': False})
+    try:
+        yield
+    finally:
+        _portee.reset(jeton)
@@ -0,0 +1,50 @@
+"""
+Période courante (exercice, session, fonds social) résolue une fois par portée.
+
+Exercice.get_exercice_en_cours(), Session.get_session_en_cours() et
+FondsSocial.get_fonds_actuel() sont appelés par les modèles, les utilitaires
+et les serializers, souvent plusieurs fois pour une même requête HTTP. Dans
+une portée (ContexteRequeteMiddleware pour une requête, exécution d'une tâche
+différée), chaque valeur est résolue au premier appel puis partagée par tous
+les appelants; la portée couvre aussi la configuration (core.configuration).
+
+Hors portée (shell, tests, commandes), chaque appel interroge la base comme
+avant. Un changement de statut d'un exercice ou d'une session (ou sa
+création, sa suppression) vide la portée courante: l'appel suivant relit la
+base.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .configuration import portee_configuration
+
+# Valeurs résolues dans la portée courante: {clé: valeur}, None hors portée
+_periode = ContextVar('periode_courante', default=None)
+
+
+@contextmanager
+def periode_courante():
+    """Portée (une requête HTTP, une tâche) de la période courante et de la configuration"""
+    jeton = _periode.set({})
+    try:
+        with portee_configuration():
+            yield
+    finally:
+        _periode.reset(jeton)
+
+
+def resoudre(cle, calcul):
+    """Valeur de la portée courante pour cette clé, calculée au premier appel"""
+    valeurs = _periode.get()
+    if valeurs is None:
+        return calcul()
+    if cle not in valeurs:
+        valeurs[cle] = calcul()
+    return valeurs[cle]
+
+
+def invalider_periode():
+    """Oublie l'exercice, la session et le fonds résolus dans la portée courante"""
+    valeurs = _periode.get()
+    if valeurs:
+        valeurs.clear()
@@ -0,0 +1,126 @@
+"""
+Export en flux (CSV / NDJSON) des listes de l'API.
+
+Les lignes sont lues par paquets avec values_list().iterator() et écrites au
+fil de l'eau dans une StreamingHttpResponse: pas de serializer, pas de N+1,
+mémoire constante quel que soit le nombre de lignes.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer
+
+from authentication.permissions import IsAdministrateur
+
+
+TAILLE_PAQUET_EXPORT = 2000
+
+
+def _objets(data):
+    """Réponse non diffusée (erreur, détail) -> liste d'objets à écrire"""
+    if data is None:
+        return []
+    if isinstance(data, (list, tuple)):
+        return [objet if isinstance(objet, dict) else {'valeur': objet} for objet in data]
+    return [data if isinstance(data, dict) else {'valeur': data}]
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Format ?format=csv. Les exports sont produits en flux par ExportMixin;
+    render() ne sert qu'aux autres réponses (erreurs de validation, 403,
+    404...), écrites en CSV: une colonne par clé, une ligne par objet
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        objets = _objets(data)
+        if not objets:
+            return b''
+        entetes = list(dict.fromkeys(cle for objet in objets for cle in objet))
+        encodeur = DjangoJSONEncoder(ensure_ascii=False)
+
+        def cellule(valeur):
+            # Listes de messages d'erreur, objets imbriqués: en JSON
+            return valeur if isinstance(valeur, (str, int, float)) else encodeur.encode(valeur)
+
+        contenu = ''.join(lignes_csv(entetes, (
+            [cellule(objet.get(entete, '')) for entete in entetes] for objet in objets
+        )))
+        return contenu.encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Format ?format=ndjson (un objet JSON par ligne). Comme CSVRenderer,
+    render() ne sert qu'aux réponses non diffusées par ExportMixin
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        encodeur = DjangoJSONEncoder(ensure_ascii=False)
+        return ''.join(encodeur.encode(objet) + '\n' for objet in _objets(data)).encode(self.charset)
+
+
+class _Tampon:
+    """Pseudo-fichier: csv.writer écrit une ligne, on la renvoie telle quelle"""
+
+    def write(self, valeur):
+        return valeur
+
+
+def lignes_csv(entetes, lignes):
+    ecrivain = csv.writer(_Tampon())
+    # BOM UTF-8: accents corrects à l'ouverture dans un tableur
+    yield '\ufeff' + ecrivain.writerow(entetes)
+    for ligne in lignes:
+        yield ecrivain.writerow(ligne)
+
+
+def lignes_ndjson(entetes, lignes):
+    encodeur = DjangoJSONEncoder(ensure_ascii=False)
+    for ligne in lignes:
+        yield encodeur.encode(dict(zip(entetes, ligne))) + '\n'
+
+
+FORMATS_EXPORT = {
+    'csv': (lignes_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (lignes_ndjson, 'application/x-ndjson; charset=utf-8'),
+}
+
+
+class ExportMixin:
+    """
+    Ajoute l'action GET .../export/?format=csv|ndjson à un ViewSet.
+    La vue déclare `champs_export`: liste de (en-tête, lookup values()).
+    Les FilterSets, la recherche et le tri de la liste s'appliquent.
+    """
+    champs_export = []
+    nom_export = None
+
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[IsAdministrateur],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def export(self, request, *args, **kwargs):
+        format_export = request.accepted_renderer.format
+        generer_lignes, content_type = FORMATS_EXPORT[format_export]
+
+        entetes = [entete for entete, _ in self.champs_export]
+        lookups = [lookup for _, lookup in self.champs_export]
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        lignes = queryset.values_list(*lookups).iterator(chunk_size=TAILLE_PAQUET_EXPORT)
+
+        reponse = StreamingHttpResponse(generer_lignes(entetes, lignes), content_type=content_type)
+        nom = self.nom_export or self.basename
+        horodatage = timezone.localtime().strftime('%Y%m%d-%H%M')
+        reponse['Content-Disposition'] = f'attachment; filename="{nom}-{horodatage}.{format_export}"'
+        return reponse
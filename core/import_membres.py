@@ -0,0 +1,148 @@
+"""
+Inscription groupée de membres (nouvelle promotion d'enseignants).
+
+Les lignes sont contrôlées en une passe (doublons dans le fichier et en
+base en deux requêtes), les mots de passe sont hachés en parallèle sur
+plusieurs processus hors transaction, puis utilisateurs, membres et
+paiements d'inscription initiaux sont écrits par bulk_create avec des
+numéros de membre réservés d'un bloc.
+"""
+import csv
+import io
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import Utilisateur
+from authentication.utils import hacher_mots_de_passe
+from transactions.models import PaiementInscription
+from .models import ConfigurationMutuelle, FondsSocial, Membre, SoldeMembre, TotauxSession
+from .signals import creations_en_masse
+
+
+def lire_csv_membres(fichier):
+    """
+    Lit un CSV d'import (UTF-8, avec ou sans BOM, séparateur , ou ;).
+    Les cellules vides sont ignorées pour que les valeurs par défaut s'appliquent
+    """
+    texte = fichier.read().decode('utf-8-sig')
+    dialecte = csv.Sniffer().sniff(texte.split('\n', 1)[0], delimiters=',;')
+    return [
+        {champ.strip(): valeur.strip() for champ, valeur in ligne.items() if champ and valeur and valeur.strip()}
+        for ligne in csv.DictReader(io.StringIO(texte), dialect=dialecte)
+    ]
+
+
+def valider_import(lignes):
+    """
+    Contrôle l'unicité des emails et noms d'utilisateur, dans le fichier
+    et en base. lignes: [(index, donnees)]. Retourne [{'index', 'erreurs'}]
+    """
+    emails = Counter(_email(donnees) for _, donnees in lignes)
+    usernames = Counter(donnees['username'] for _, donnees in lignes)
+    emails_existants = set(
+        Utilisateur.objects.filter(email__in=list(emails)).values_list('email', flat=True)
+    )
+    usernames_existants = set(
+        Utilisateur.objects.filter(username__in=list(usernames)).values_list('username', flat=True)
+    )
+
+    erreurs = []
+    for index, donnees in lignes:
+        erreurs_ligne = []
+        email = _email(donnees)
+        if email in emails_existants:
+            erreurs_ligne.append("Un utilisateur avec cet email existe déjà")
+        elif emails[email] > 1:
+            erreurs_ligne.append("Email présent plusieurs fois dans l'import")
+        if donnees['username'] in usernames_existants:
+            erreurs_ligne.append("Un utilisateur avec ce nom d'utilisateur existe déjà")
+        elif usernames[donnees['username']] > 1:
+            erreurs_ligne.append("Nom d'utilisateur présent plusieurs fois dans l'import")
+        if erreurs_ligne:
+            erreurs.append({'index': index, 'erreurs': erreurs_ligne})
+    return erreurs
+
+
+def _email(donnees):
+    """Email tel que create_user l'enregistrerait (domaine en minuscules)"""
+    return Utilisateur.objects.normalize_email(donnees['email'])
+
+
+def creer_membres_en_masse(lignes, exercice, session):
+    """
+    Crée les utilisateurs, membres et paiements d'inscription initiaux.
+    lignes: [(index, donnees validées par LigneImportMembreSerializer)],
+    supposées déjà contrôlées par valider_import.
+    Retourne [{'index', 'utilisateur_id', 'membre_id', 'numero_membre', 'statut'}]
+    """
+    if not lignes:
+        return []
+
+    config = ConfigurationMutuelle.get_configuration()
+    # Le hachage (PBKDF2) domine le coût: fait avant d'ouvrir la transaction
+    mots_de_passe = hacher_mots_de_passe(donnees['password'] for _, donnees in lignes)
+
+    utilisateurs, membres, inscriptions = [], [], []
+    deltas_soldes, mouvements_fonds = {}, []
+    with transaction.atomic():
+        numeros = Membre.reserver_numeros(len(lignes))
+        for (index, donnees), mot_de_passe, numero in zip(lignes, mots_de_passe, numeros):
+            utilisateur = Utilisateur(
+                username=donnees['username'],
+                email=_email(donnees),
+                first_name=donnees['first_name'],
+                last_name=donnees['last_name'],
+                telephone=donnees['telephone'],
+                role='MEMBRE',
+                password=mot_de_passe,
+            )
+            montant_initial = donnees.get('montant_inscription_initial')
+            membre = Membre(
+                utilisateur=utilisateur,
+                numero_membre=numero,
+                date_inscription=donnees.get('date_inscription') or timezone.now().date(),
+                exercice_inscription=exercice,
+                session_inscription=session,
+                # Même règle que creer_membre_complet
+                statut='EN_REGLE' if montant_initial and montant_initial >= config.montant_inscription else 'NON_EN_REGLE',
+            )
+            utilisateurs.append(utilisateur)
+            membres.append(membre)
+            if montant_initial and montant_initial > 0:
+                inscriptions.append(PaiementInscription(
+                    membre=membre, montant=montant_initial, session=session,
+                    notes="Paiement initial lors de la création"
+                ))
+                deltas_soldes[membre.id] = {'inscription_payee': montant_initial}
+                mouvements_fonds.append((montant_initial, f"Inscription {numero} - Session {session.nom}"))
+
+        Utilisateur.objects.bulk_create(utilisateurs, batch_size=500)
+        Membre.objects.bulk_create(membres, batch_size=500)
+        SoldeMembre.objects.bulk_create([SoldeMembre(membre=membre) for membre in membres], batch_size=500)
+        if inscriptions:
+            PaiementInscription.objects.bulk_create(inscriptions, batch_size=500)
+            # bulk_create ne passe pas par save(): soldes, totaux et fonds social en lot
+            SoldeMembre.appliquer_deltas_en_masse(deltas_soldes)
+            TotauxSession.appliquer_deltas(
+                session.id, {'inscriptions': sum(inscription.montant for inscription in inscriptions)}
+            )
+            fonds = FondsSocial.get_fonds_actuel()
+            if fonds:
+                fonds.ajouter_montants(mouvements_fonds)
+
+    creations_en_masse.send(sender=Membre)
+    if inscriptions:
+        creations_en_masse.send(sender=PaiementInscription)
+
+    return [
+        {
+            'index': index,
+            'utilisateur_id': str(membre.utilisateur_id),
+            'membre_id': str(membre.id),
+            'numero_membre': membre.numero_membre,
+            'statut': membre.statut,
+        }
+        for (index, _), membre in zip(lignes, membres)
+    ]
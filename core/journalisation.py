@@ -0,0 +1,42 @@
+import logging
+import random
+
+
+class EchantillonnageFilter(logging.Filter):
+    """
+    Ne conserve qu'une fraction (taux) des enregistrements de niveau
+    inférieur à WARNING émis par les loggers 'mutuelle.*'.
+    Les avertissements et erreurs sont toujours conservés.
+    """
+
+    def __init__(self, taux=1.0, prefixe='mutuelle'):
+        super().__init__()
+        self.taux = float(taux)
+        self.prefixe = prefixe
+
+    def filter(self, record):
+        if self.taux >= 1 or record.levelno >= logging.WARNING:
+            return True
+        if not record.name.startswith(self.prefixe):
+            return True
+        return random.random() < self.taux
+
+
+# Champs jamais écrits en clair dans les traces (comparés mot par mot: new_password, pin...)
+MOTS_SENSIBLES = {'password', 'pin', 'token', 'secret'}
+MASQUE = '********'
+
+
+def donnees_masquees(donnees):
+    """
+    Copie de request.data pour les traces DEBUG, avec la valeur des champs
+    sensibles (mot de passe, PIN, jeton) remplacée par un masque
+    """
+    if hasattr(donnees, 'dict'):
+        donnees = donnees.dict()
+    if not isinstance(donnees, dict):
+        return donnees
+    return {
+        cle: MASQUE if MOTS_SENSIBLES.intersection(str(cle).lower().split('_')) else valeur
+        for cle, valeur in donnees.items()
+    }
@@ -0,0 +1,74 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmark import generer_mutuelle, mesurer_scenarios, creer_administrateur_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure les endpoints clés (requêtes SQL, latences p50/p95) sur des jeux "
+        "de données synthétiques de tailles croissantes, dans une base de test jetable"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tailles', default='100,1000,10000',
+            help="Nombres de membres séparés par des virgules"
+        )
+        parser.add_argument('--sessions', type=int, default=12, help="Nombre de sessions générées")
+        parser.add_argument('--repetitions', type=int, default=5, help="Répétitions par scénario")
+        parser.add_argument('--graine', type=int, default=0, help="Graine aléatoire")
+        parser.add_argument('--sortie', help="Fichier JSON où écrire les résultats")
+
+    def handle(self, *args, **options):
+        try:
+            tailles = [int(taille) for taille in options['tailles'].split(',') if taille.strip()]
+        except ValueError:
+            raise CommandError("--tailles doit être une liste d'entiers, ex: 100,1000")
+
+        # Les traces DEBUG fausseraient les latences mesurées
+        logger_mutuelle = logging.getLogger('mutuelle')
+        niveau_initial = logger_mutuelle.level
+        logger_mutuelle.setLevel(logging.WARNING)
+
+        resultats = {}
+        setup_test_environment()
+        try:
+            for taille in tailles:
+                runner = DiscoverRunner(interactive=False, verbosity=0)
+                anciennes_bases = runner.setup_databases()
+                try:
+                    self.stdout.write(f"Génération de {taille} membres...")
+                    generer_mutuelle(taille, nombre_sessions=options['sessions'], graine=options['graine'])
+
+                    client = Client()
+                    client.force_login(creer_administrateur_benchmark())
+                    resultats[taille] = mesurer_scenarios(
+                        client, repetitions=options['repetitions'], graine=options['graine']
+                    )
+                finally:
+                    runner.teardown_databases(anciennes_bases)
+                self._afficher(taille, resultats[taille])
+        finally:
+            teardown_test_environment()
+            logger_mutuelle.setLevel(niveau_initial)
+
+        if options['sortie']:
+            with open(options['sortie'], 'w', encoding='utf-8') as fichier:
+                json.dump(resultats, fichier, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['sortie']}"))
+
+    def _afficher(self, taille, mesures):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{taille} membres"))
+        self.stdout.write(f"  {'scénario':<28}{'statuts':<12}{'requêtes':>9}{'p50 ms':>10}{'p95 ms':>10}")
+        for nom, mesure in mesures.items():
+            statuts = ','.join(str(statut) for statut in mesure['statuts'])
+            self.stdout.write(
+                f"  {nom:<28}{statuts:<12}{mesure['requetes']:>9}"
+                f"{mesure['p50_ms']:>10}{mesure['p95_ms']:>10}"
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.cloture import cloturer_exercice
+from core.models import Exercice
+
+
+class Command(BaseCommand):
+    help = "Photographie les exercices terminés sans clôture (ou tous avec --reconstruire)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reconstruire', action='store_true',
+            help="Reconstruit aussi les clôtures existantes"
+        )
+
+    def handle(self, *args, **options):
+        exercices = Exercice.objects.filter(statut='TERMINE').order_by('date_debut')
+        if not options['reconstruire']:
+            exercices = exercices.filter(cloture__isnull=True)
+
+        nombre = 0
+        for exercice in exercices:
+            cloturer_exercice(exercice)
+            nombre += 1
+        self.stdout.write(self.style.SUCCESS(f"{nombre} exercice(s) clôturé(s)"))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.benchmark import generer_mutuelle
+
+
+class Command(BaseCommand):
+    help = "Génère un jeu de données synthétique (membres, sessions, transactions) pour les tests de charge"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--membres', type=int, default=100, help="Nombre de membres à créer")
+        parser.add_argument('--sessions', type=int, default=12, help="Nombre total de sessions")
+        parser.add_argument('--exercices', type=int, default=1, help="Nombre d'exercices (le dernier est en cours)")
+        parser.add_argument('--assistances', type=int, default=3, help="Nombre d'assistances payées")
+        parser.add_argument('--graine', type=int, default=0, help="Graine aléatoire (jeu de données reproductible)")
+
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        compteurs = generer_mutuelle(
+            options['membres'],
+            nombre_sessions=options['sessions'],
+            nombre_exercices=options['exercices'],
+            nombre_assistances=options['assistances'],
+            graine=options['graine'],
+        )
+        for modele, nombre in compteurs.items():
+            self.stdout.write(f"  {modele}: {nombre}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Jeu de données généré en {time.perf_counter() - debut:.1f}s"
+        ))
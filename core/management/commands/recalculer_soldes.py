@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Membre
+from core.utils import recalculer_soldes_membres
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les soldes matérialisés des membres depuis l'historique des transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--membre', action='append', dest='numeros', default=[],
+            help="Numéro de membre à recalculer (répétable). Par défaut: tous les membres"
+        )
+
+    def handle(self, *args, **options):
+        membres = Membre.objects.all()
+        if options['numeros']:
+            membres = membres.filter(numero_membre__in=options['numeros'])
+
+        nombre = recalculer_soldes_membres(membres)
+        self.stdout.write(self.style.SUCCESS(f"{nombre} solde(s) membre recalculé(s)"))
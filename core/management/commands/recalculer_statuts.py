@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Membre
+from core.utils import recalculer_statuts_membres
+
+
+class Command(BaseCommand):
+    help = "Recalcule le statut \"en règle\" de tous les membres (hors suspendus)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--membre', action='append', dest='numeros', default=[],
+            help="Numéro de membre à recalculer (répétable). Par défaut: tous les membres"
+        )
+        parser.add_argument(
+            '--taille-lot', type=int, default=500,
+            help="Nombre de membres calculés par lot"
+        )
+
+    def handle(self, *args, **options):
+        membres = Membre.objects.all()
+        if options['numeros']:
+            membres = membres.filter(numero_membre__in=options['numeros'])
+
+        modifies = recalculer_statuts_membres(membres, taille_lot=options['taille_lot'])
+        self.stdout.write(self.style.SUCCESS(f"{modifies} statut(s) membre modifié(s)"))
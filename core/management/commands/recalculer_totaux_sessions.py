@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Session
+from core.utils import recalculer_totaux_sessions
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les totaux matérialisés des sessions depuis l'historique des transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--exercice', dest='exercice_id',
+            help="Identifiant de l'exercice à recalculer. Par défaut: toutes les sessions"
+        )
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.all()
+        if options['exercice_id']:
+            sessions = sessions.filter(exercice_id=options['exercice_id'])
+
+        nombre = recalculer_totaux_sessions(sessions)
+        self.stdout.write(self.style.SUCCESS(f"{nombre} session(s) recalculée(s)"))
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.taches import traiter_lot
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches différées en attente (voir core.taches)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lot', type=int, default=50,
+            help="Nombre de tâches réservées par lot"
+        )
+        parser.add_argument(
+            '--boucle', action='store_true',
+            help="Tourne en continu (worker) au lieu de vider la file puis s'arrêter"
+        )
+        parser.add_argument(
+            '--intervalle', type=float, default=2.0,
+            help="Attente (secondes) quand la file est vide, en mode --boucle"
+        )
+
+    def handle(self, *args, **options):
+        if settings.TACHES_EXECUTION == 'worker' and settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+            # Les invalidations faites ici n'atteindraient pas le cache des processus web
+            raise CommandError(
+                "Mode worker avec un cache en mémoire locale: configurer un cache partagé "
+                "(CACHE_BACKEND, ex. DatabaseCache après `manage.py createcachetable`)"
+            )
+        total_reussies = total_erreurs = 0
+        while True:
+            reussies, en_erreur = traiter_lot(options['lot'])
+            total_reussies += reussies
+            total_erreurs += en_erreur
+            if reussies or en_erreur:
+                continue
+            if not options['boucle']:
+                break
+            time.sleep(options['intervalle'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_reussies} tâche(s) exécutée(s), {total_erreurs} en erreur"
+        ))
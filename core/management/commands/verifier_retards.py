@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.models import Emprunt
+
+
+class Command(BaseCommand):
+    help = "Met à jour en masse le statut des emprunts actifs (en cours / en retard / remboursés)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date', dest='date_reference',
+            help="Date de référence AAAA-MM-JJ (par défaut: aujourd'hui)"
+        )
+
+    def handle(self, *args, **options):
+        aujourd_hui = None
+        if options['date_reference']:
+            try:
+                aujourd_hui = date.fromisoformat(options['date_reference'])
+            except ValueError:
+                raise CommandError("Date invalide, format attendu: AAAA-MM-JJ")
+
+        modifies = Emprunt.verifier_retards_globaux(aujourd_hui=aujourd_hui)
+        self.stdout.write(self.style.SUCCESS(f"{modifies} emprunt(s) mis à jour"))
@@ -1,2 +1,132 @@
-# Managers personnaliss pour les modles
+# Managers personnalisés pour les modèles
+from decimal import Decimal
 
+from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+MONTANT = models.DecimalField(max_digits=15, decimal_places=2)
+
+
+# Contribution signée d'une transaction d'épargne
+# (épargne = dépôts - retraits + intérêts + retours)
+MONTANT_EPARGNE_SIGNE = Case(
+    When(transactions_epargne__type_transaction='RETRAIT_PRET', then=-F('transactions_epargne__montant')),
+    default=F('transactions_epargne__montant'),
+    output_field=models.DecimalField(max_digits=15, decimal_places=2),
+)
+
+
+class ConfigurationQuerySet(models.QuerySet):
+    """
+    QuerySet de la configuration: tout UPDATE incrémente la version, qui
+    invalide le cache des processus (voir core.configuration)
+    """
+
+    def update(self, **kwargs):
+        from .configuration import oublier_configuration
+
+        kwargs.setdefault('version', F('version') + 1)
+        lignes = super().update(**kwargs)
+        oublier_configuration()
+        return lignes
+
+
+class MembreQuerySet(models.QuerySet):
+    """
+    QuerySet des membres avec les calculs ensemblistes
+    """
+
+    def avec_epargne(self):
+        """
+        Annote chaque membre avec son épargne totale ('epargne'): flux des
+        exercices clos lus dans les clôtures, plus agrégation conditionnelle
+        des transactions des exercices ouverts (voir core.cloture)
+        Recalcul depuis l'historique: les lectures passent par SoldeMembre
+        (calculer_epargnes_membres), cette annotation sert aux contrôles de
+        cohérence
+        """
+        return self.annotate(
+            epargne=Coalesce(
+                Sum(
+                    MONTANT_EPARGNE_SIGNE,
+                    filter=Q(transactions_epargne__session__exercice__cloture__isnull=True)
+                ),
+                Value(Decimal('0')),
+                output_field=MONTANT,
+            ) + somme_par_parent(self, 'soldes_clotures', 'epargne')
+        )
+
+
+def somme_par_parent(queryset, relation, champ):
+    """
+    Sous-requête corrélée: somme de `champ` des lignes de la relation
+    inverse `relation` rattachées à l'objet courant (0 si aucune).
+    Évite la multiplication des lignes de plusieurs Sum() sur des jointures.
+    """
+    champ_fk = queryset.model._meta.get_field(relation).field.name
+    lignes = queryset.model._meta.get_field(relation).related_model.objects.filter(
+        **{champ_fk: OuterRef('pk')}
+    ).order_by().values(champ_fk).annotate(total=Sum(champ)).values('total')
+    return Coalesce(Subquery(lignes, output_field=MONTANT), Value(Decimal('0')), output_field=MONTANT)
+
+
+class ExerciceQuerySet(models.QuerySet):
+    """
+    QuerySet des exercices avec les compteurs affichés par l'API
+    """
+
+    def avec_totaux(self):
+        """Annote 'nombre_sessions_total' et joint le fonds social"""
+        return self.select_related('fonds_social').annotate(
+            nombre_sessions_total=Count('sessions')
+        )
+
+
+class SessionQuerySet(models.QuerySet):
+    """
+    QuerySet des sessions avec les totaux affichés par l'API
+    """
+
+    def avec_totaux(self):
+        """
+        Annote 'nombre_nouveaux_membres', 'total_solidarite' et
+        'total_renflouements_du' (une seule requête SQL; les montants
+        viennent des TotauxSession matérialisés)
+        """
+        return self.select_related('exercice').annotate(
+            nombre_nouveaux_membres=Coalesce(
+                Subquery(
+                    self.model._meta.get_field('nouveaux_membres').related_model.objects.filter(
+                        session_inscription=OuterRef('pk')
+                    ).order_by().values('session_inscription').annotate(
+                        nombre=Count('pk')
+                    ).values('nombre'),
+                    output_field=models.IntegerField(),
+                ),
+                Value(0),
+            ),
+            total_solidarite=Coalesce(F('totaux__solidarites'), Value(Decimal('0')), output_field=MONTANT),
+            total_renflouements_du=Coalesce(
+                F('totaux__renflouements_generes'), Value(Decimal('0')), output_field=MONTANT
+            ),
+        )
+
+
+class TypeAssistanceQuerySet(models.QuerySet):
+    """
+    QuerySet des types d'assistance avec les totaux des assistances payées
+    """
+
+    def avec_totaux(self):
+        """Annote 'nombre_assistances_payees' et 'montant_assistances_payees'"""
+        payee = Q(assistances_accordees__statut='PAYEE')
+        return self.annotate(
+            nombre_assistances_payees=Count('assistances_accordees', filter=payee),
+            montant_assistances_payees=Coalesce(
+                Sum('assistances_accordees__montant', filter=payee),
+                Value(Decimal('0')),
+                output_field=MONTANT,
+            ),
+        )
@@ -0,0 +1,31 @@
+from .contexte import periode_courante
+from .utils import differer_recalcul_statuts
+
+
+class RecalculStatutsMiddleware:
+    """
+    Collecte les membres dont le statut "en règle" doit être recalculé
+    pendant la requête et les recalcule une seule fois en fin de requête
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with differer_recalcul_statuts():
+            return self.get_response(request)
+
+
+class ContexteRequeteMiddleware:
+    """
+    Ouvre pour chaque requête la portée de la période courante et de la
+    configuration: exercice, session, fonds social et configuration ne sont
+    résolus qu'une fois (voir core.contexte et core.configuration)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with periode_courante():
+            return self.get_response(request)
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:18
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+SIGNES_EPARGNE = {
+    'DEPOT': ('epargne_depots', 1),
+    'RETRAIT_PRET': ('epargne_retraits', -1),
+    'AJOUT_INTERET': ('interets_recus', 1),
+    'RETOUR_REMBOURSEMENT': ('retours_remboursements', 1),
+}
+
+
+def initialiser_soldes(apps, schema_editor):
+    """Calcule les soldes initiaux depuis l'historique existant"""
+    Membre = apps.get_model('core', 'Membre')
+    SoldeMembre = apps.get_model('core', 'SoldeMembre')
+    PaiementInscription = apps.get_model('transactions', 'PaiementInscription')
+    PaiementSolidarite = apps.get_model('transactions', 'PaiementSolidarite')
+    EpargneTransaction = apps.get_model('transactions', 'EpargneTransaction')
+    Emprunt = apps.get_model('transactions', 'Emprunt')
+    Renflouement = apps.get_model('transactions', 'Renflouement')
+
+    soldes = {membre_id: {} for membre_id in Membre.objects.values_list('id', flat=True)}
+
+    def cumuler(membre_id, champ, montant):
+        soldes[membre_id][champ] = soldes[membre_id].get(champ, Decimal('0')) + (montant or Decimal('0'))
+
+    for ligne in PaiementInscription.objects.values('membre_id').annotate(total=Sum('montant')):
+        cumuler(ligne['membre_id'], 'inscription_payee', ligne['total'])
+    for ligne in PaiementSolidarite.objects.values('membre_id').annotate(total=Sum('montant')):
+        cumuler(ligne['membre_id'], 'solidarite_payee', ligne['total'])
+    for ligne in EpargneTransaction.objects.values('membre_id', 'type_transaction').annotate(total=Sum('montant')):
+        champ, signe = SIGNES_EPARGNE[ligne['type_transaction']]
+        cumuler(ligne['membre_id'], champ, ligne['total'])
+        cumuler(ligne['membre_id'], 'epargne_totale', signe * ligne['total'])
+    for ligne in Renflouement.objects.values('membre_id').annotate(du=Sum('montant_du'), paye=Sum('montant_paye')):
+        cumuler(ligne['membre_id'], 'renflouement_du', ligne['du'])
+        cumuler(ligne['membre_id'], 'renflouement_paye', ligne['paye'])
+    for emprunt in Emprunt.objects.values('membre_id', 'montant_total_a_rembourser', 'montant_rembourse'):
+        restant = emprunt['montant_total_a_rembourser'] - emprunt['montant_rembourse']
+        cumuler(emprunt['membre_id'], 'emprunt_restant', max(restant, Decimal('0')))
+
+    SoldeMembre.objects.bulk_create(
+        [SoldeMembre(membre_id=membre_id, **valeurs) for membre_id, valeurs in soldes.items()],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_session_statut'),
+        ('transactions', '0003_emprunt_date_creation_emprunt_date_modification_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SoldeMembre',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('inscription_payee', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Inscription payée (FCFA)')),
+                ('solidarite_payee', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Solidarité payée (FCFA)')),
+                ('epargne_depots', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name="Dépôts d'épargne (FCFA)")),
+                ('epargne_retraits', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Retraits pour prêts (FCFA)')),
+                ('interets_recus', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Intérêts reçus (FCFA)')),
+                ('retours_remboursements', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Retours de remboursement (FCFA)')),
+                ('epargne_totale', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Épargne totale (FCFA)')),
+                ('renflouement_du', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Renflouement dû (FCFA)')),
+                ('renflouement_paye', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Renflouement payé (FCFA)')),
+                ('emprunt_restant', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Emprunt restant à rembourser (FCFA)')),
+                ('date_modification', models.DateTimeField(auto_now=True)),
+                ('membre', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='solde', to='core.membre')),
+            ],
+            options={
+                'verbose_name': 'Solde membre',
+                'verbose_name_plural': 'Soldes membres',
+            },
+        ),
+        migrations.RunPython(initialiser_soldes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:41
+
+from django.db import migrations, models
+
+
+def initialiser_sequence(apps, schema_editor):
+    """Démarre la séquence après le plus grand numéro ENS-XXXX existant"""
+    Membre = apps.get_model('core', 'Membre')
+    SequenceNumerotation = apps.get_model('core', 'SequenceNumerotation')
+    suffixes = (
+        numero.split('-')[-1]
+        for numero in Membre.objects.filter(numero_membre__startswith='ENS-').values_list('numero_membre', flat=True)
+    )
+    dernier = max((int(suffixe) for suffixe in suffixes if suffixe.isdigit()), default=0)
+    SequenceNumerotation.objects.create(nom='numero_membre', dernier_numero=dernier)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_solde_membre'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceNumerotation',
+            fields=[
+                ('nom', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Nom de la séquence')),
+                ('dernier_numero', models.PositiveIntegerField(default=0, verbose_name='Dernier numéro attribué')),
+                ('date_modification', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Séquence de numérotation',
+                'verbose_name_plural': 'Séquences de numérotation',
+            },
+        ),
+        migrations.RunPython(initialiser_sequence, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:46
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_sequence_numerotation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TacheDifferee',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nom', models.CharField(max_length=100, verbose_name='Tâche')),
+                ('parametres', models.JSONField(blank=True, default=dict, verbose_name='Paramètres')),
+                ('cle_idempotence', models.CharField(blank=True, help_text='Une seule tâche par clé: replanifier la même opération est sans effet', max_length=200, null=True, unique=True, verbose_name="Clé d'idempotence")),
+                ('statut', models.CharField(choices=[('EN_ATTENTE', 'En attente'), ('EN_COURS', 'En cours'), ('TERMINEE', 'Terminée'), ('ECHEC', 'Échec')], default='EN_ATTENTE', max_length=15, verbose_name='Statut')),
+                ('tentatives', models.PositiveIntegerField(default=0, verbose_name='Tentatives')),
+                ('max_tentatives', models.PositiveIntegerField(default=5, verbose_name='Tentatives maximum')),
+                ('executer_apres', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Exécuter après')),
+                ('date_prise', models.DateTimeField(blank=True, null=True, verbose_name='Prise en charge le')),
+                ('date_execution', models.DateTimeField(blank=True, null=True, verbose_name='Exécutée le')),
+                ('derniere_erreur', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Tâche différée',
+                'verbose_name_plural': 'Tâches différées',
+                'ordering': ['date_creation'],
+                'indexes': [models.Index(fields=['statut', 'executer_apres'], name='core_tached_statut_c06095_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:49
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_taches_differees'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClotureExercice',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total_inscriptions', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Inscriptions (FCFA)')),
+                ('total_solidarites', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Solidarités (FCFA)')),
+                ('total_epargnes', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name="Dépôts d'épargne (FCFA)")),
+                ('total_remboursements', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Remboursements (FCFA)')),
+                ('total_renflouements', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Paiements de renflouement (FCFA)')),
+                ('total_emprunts', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Emprunts accordés (FCFA)')),
+                ('total_assistances', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Assistances payées (FCFA)')),
+                ('total_collations', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Collations (FCFA)')),
+                ('fonds_social_final', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Fonds social à la clôture (FCFA)')),
+                ('cumul_epargnes', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Cumul des épargnes à la clôture (FCFA)')),
+                ('nombre_membres', models.PositiveIntegerField(default=0, verbose_name='Nombre de membres')),
+                ('nombre_membres_en_regle', models.PositiveIntegerField(default=0, verbose_name='Membres en règle')),
+                ('date_cloture', models.DateTimeField(auto_now=True, verbose_name='Date de clôture')),
+                ('exercice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cloture', to='core.exercice')),
+            ],
+            options={
+                'verbose_name': "Clôture d'exercice",
+                'verbose_name_plural': "Clôtures d'exercice",
+                'ordering': ['-date_cloture'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SoldeMembreCloture',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('inscription_payee', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Inscription payée (FCFA)')),
+                ('solidarite_payee', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Solidarité payée (FCFA)')),
+                ('epargne', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name="Variation d'épargne (FCFA)")),
+                ('nombre_emprunts', models.PositiveIntegerField(default=0, verbose_name='Emprunts')),
+                ('nombre_renflouements', models.PositiveIntegerField(default=0, verbose_name='Renflouements')),
+                ('cloture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='soldes_membres', to='core.clotureexercice')),
+                ('membre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='soldes_clotures', to='core.membre')),
+            ],
+            options={
+                'verbose_name': 'Solde membre à la clôture',
+                'verbose_name_plural': 'Soldes membres à la clôture',
+                'unique_together': {('cloture', 'membre')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_clotures_exercices'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['date_session'], name='core_sessio_date_se_af8746_idx'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:59
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+CHAMPS_EPARGNE = {
+    'DEPOT': 'epargnes_deposees',
+    'RETRAIT_PRET': 'retraits_prets',
+    'AJOUT_INTERET': 'interets_redistribues',
+    'RETOUR_REMBOURSEMENT': 'retours_remboursements',
+}
+
+
+def initialiser_totaux(apps, schema_editor):
+    """Calcule les totaux initiaux des sessions depuis l'historique existant"""
+    Session = apps.get_model('core', 'Session')
+    TotauxSession = apps.get_model('core', 'TotauxSession')
+    PaiementInscription = apps.get_model('transactions', 'PaiementInscription')
+    PaiementSolidarite = apps.get_model('transactions', 'PaiementSolidarite')
+    EpargneTransaction = apps.get_model('transactions', 'EpargneTransaction')
+    Emprunt = apps.get_model('transactions', 'Emprunt')
+    Remboursement = apps.get_model('transactions', 'Remboursement')
+    AssistanceAccordee = apps.get_model('transactions', 'AssistanceAccordee')
+    Renflouement = apps.get_model('transactions', 'Renflouement')
+    PaiementRenflouement = apps.get_model('transactions', 'PaiementRenflouement')
+
+    totaux = {session_id: {} for session_id in Session.objects.values_list('id', flat=True)}
+
+    def cumuler(session_id, champ, montant):
+        if session_id in totaux:
+            totaux[session_id][champ] = totaux[session_id].get(champ, Decimal('0')) + (montant or Decimal('0'))
+
+    sources = (
+        (PaiementInscription.objects.all(), 'session_id', {'inscriptions': 'montant'}),
+        (PaiementSolidarite.objects.all(), 'session_id', {'solidarites': 'montant'}),
+        (Emprunt.objects.all(), 'session_emprunt_id', {'emprunts_decaisses': 'montant_emprunte'}),
+        (Remboursement.objects.all(), 'session_id', {
+            'remboursements': 'montant', 'interets_rembourses': 'montant_interet'
+        }),
+        (AssistanceAccordee.objects.filter(statut='PAYEE'), 'session_id', {'assistances_payees': 'montant'}),
+        (Renflouement.objects.all(), 'session_id', {'renflouements_generes': 'montant_du'}),
+        (PaiementRenflouement.objects.all(), 'session_id', {'renflouements_payes': 'montant'}),
+    )
+    for queryset, cle, champs in sources:
+        lignes = queryset.order_by().values(cle).annotate(**{champ: Sum(montant) for champ, montant in champs.items()})
+        for ligne in lignes:
+            for champ in champs:
+                cumuler(ligne[cle], champ, ligne[champ])
+    for ligne in EpargneTransaction.objects.order_by().values(
+        'session_id', 'type_transaction'
+    ).annotate(total=Sum('montant')):
+        cumuler(ligne['session_id'], CHAMPS_EPARGNE[ligne['type_transaction']], ligne['total'])
+
+    TotauxSession.objects.bulk_create(
+        [TotauxSession(session_id=session_id, **valeurs) for session_id, valeurs in totaux.items()],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_index_dates_rapports'),
+        ('transactions', '0004_index_dates_rapports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TotauxSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('inscriptions', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Inscriptions (FCFA)')),
+                ('solidarites', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Solidarités collectées (FCFA)')),
+                ('epargnes_deposees', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Épargnes déposées (FCFA)')),
+                ('retraits_prets', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Retraits pour prêts (FCFA)')),
+                ('interets_redistribues', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Intérêts redistribués (FCFA)')),
+                ('retours_remboursements', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Retours de remboursement (FCFA)')),
+                ('emprunts_decaisses', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Emprunts décaissés (FCFA)')),
+                ('remboursements', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Remboursements (FCFA)')),
+                ('interets_rembourses', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Intérêts remboursés (FCFA)')),
+                ('assistances_payees', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Assistances payées (FCFA)')),
+                ('renflouements_generes', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Renflouements générés (FCFA)')),
+                ('renflouements_payes', models.DecimalField(decimal_places=2, default=0, max_digits=15, verbose_name='Renflouements payés (FCFA)')),
+                ('date_modification', models.DateTimeField(auto_now=True)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='totaux', to='core.session')),
+            ],
+            options={
+                'verbose_name': 'Totaux de session',
+                'verbose_name_plural': 'Totaux des sessions',
+            },
+        ),
+        migrations.RunPython(initialiser_totaux, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_totaux_sessions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exercice',
+            index=models.Index(condition=models.Q(('statut', 'EN_COURS')), fields=['-date_debut'], name='exercice_en_cours_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='membre',
+            index=models.Index(fields=['statut'], name='core_membre_statut_35397f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(condition=models.Q(('statut', 'EN_COURS')), fields=['-date_session'], name='session_en_cours_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_index_requetes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='configurationmutuelle',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
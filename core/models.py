@@ -3,13 +3,26 @@ from django.core.validators import MinValueValidator
 from django.conf import settings
 import uuid
 from decimal import Decimal, ROUND_HALF_UP
-from django.db.models import Sum, Q
+from django.db.models import Sum, Q, F
+from django.utils import timezone
 from Backend.settings import MUTUELLE_DEFAULTS
 from datetime import datetime, timedelta
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+from .configuration import configuration_courante, oublier_configuration
+from .contexte import invalider_periode, resoudre
+from .managers import (
+    ConfigurationQuerySet, ExerciceQuerySet, MembreQuerySet, SessionQuerySet, TypeAssistanceQuerySet
+)
+from .taches import planifier, tache
 from django.db import models
 import uuid
+import logging
+
+logger = logging.getLogger(f'mutuelle.{__name__}')
+
+SEQUENCE_NUMERO_MEMBRE = 'numero_membre'
+PREFIXE_NUMERO_MEMBRE = 'ENS-'
 
 class ConfigurationMutuelle(models.Model):
     """
@@ -43,6 +56,10 @@ class ConfigurationMutuelle(models.Model):
     )
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
+    # Incrémentée en base à chaque écriture: clé du cache des processus
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    
+    objects = ConfigurationQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Configuration Mutuelle"
@@ -51,13 +68,28 @@ class ConfigurationMutuelle(models.Model):
     def __str__(self):
         return f"Configuration Mutuelle (Modifiée le {self.date_modification.date()})"
     
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version = F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+        if not isinstance(self.version, int):
+            self.refresh_from_db(fields=['version'])
+        oublier_configuration()
+    
+    def delete(self, *args, **kwargs):
+        resultat = super().delete(*args, **kwargs)
+        oublier_configuration()
+        return resultat
+    
     @classmethod
     def get_configuration(cls):
-        """Retourne la configuration actuelle ou en crée une par défaut"""
-        config = cls.objects.first()
-        if not config:
-            config = cls.objects.create()
-        return config
+        """
+        Retourne la configuration actuelle ou en crée une par défaut.
+        Copie de l'instance en cache (voir core.configuration)
+        """
+        return configuration_courante()
 
 
 
@@ -83,10 +115,19 @@ class Exercice(models.Model):
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
     
+    objects = ExerciceQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Exercice"
         verbose_name_plural = "Exercices"
         ordering = ['-date_debut']
+        indexes = [
+            # get_exercice_en_cours(): filtre et tri servis par le même index partiel
+            models.Index(
+                fields=['-date_debut'], condition=models.Q(statut='EN_COURS'),
+                name='exercice_en_cours_idx'
+            ),
+        ]
         # ✅ Retiré unique_together car date_fin peut être null
     
     def save(self, *args, **kwargs):
@@ -108,15 +149,28 @@ class Exercice(models.Model):
                 # Calculer date de fin en ajoutant la durée en mois
                 self.date_fin = self.date_debut + relativedelta(months=duree_mois)
                 
-                print(f"✅ Date de fin calculée automatiquement: {self.date_fin} (durée: {duree_mois} mois)")
+                logger.debug("✅ Date de fin calculée automatiquement: %s (durée: %s mois)", self.date_fin, duree_mois)
                 
             except Exception as e:
-                print(f"❌ Erreur calcul date_fin: {e}")
+                logger.error("❌ Erreur calcul date_fin: %s", e)
                 # Fallback: ajouter 12 mois par défaut
                 self.date_fin = self.date_debut + relativedelta(months=12)
-                print(f"🔄 Fallback: date_fin = {self.date_fin} (12 mois par défaut)")
+                logger.debug("🔄 Fallback: date_fin = %s (12 mois par défaut)", self.date_fin)
+        
+        ancien_statut = None
+        if not self._state.adding:
+            ancien_statut = Exercice.objects.filter(pk=self.pk).values_list('statut', flat=True).first()
         
         super().save(*args, **kwargs)
+        if self.statut != ancien_statut:
+            invalider_periode()
+        
+        # Clôture: photographie des flux de l'exercice (tâche différée)
+        if self.statut == 'TERMINE' and ancien_statut != 'TERMINE':
+            planifier('cloturer_exercice', exercice_id=str(self.pk))
+        elif ancien_statut == 'TERMINE' and self.statut != 'TERMINE':
+            # Exercice rouvert: ses transactions sont de nouveau agrégées en direct
+            ClotureExercice.objects.filter(exercice=self).delete()
     
     def __str__(self):
         date_fin_str = self.date_fin.strftime("%Y-%m-%d") if self.date_fin else "Non définie"
@@ -157,10 +211,15 @@ class Exercice(models.Model):
             elapsed_days = (today - self.date_debut).days
             return round((elapsed_days / total_days) * 100, 1) if total_days > 0 else 0
     
+    def delete(self, *args, **kwargs):
+        resultat = super().delete(*args, **kwargs)
+        invalider_periode()
+        return resultat
+    
     @classmethod
     def get_exercice_en_cours(cls):
-        """Retourne l'exercice en cours"""
-        return cls.objects.filter(statut='EN_COURS').first()
+        """Retourne l'exercice en cours (résolu une fois par portée, voir core.contexte)"""
+        return resoudre('exercice', lambda: cls.objects.filter(statut='EN_COURS').first())
     
     @classmethod
     def get_exercice_actuel(cls):
@@ -179,8 +238,14 @@ class Exercice(models.Model):
         Active cet exercice (désactive les autres)
         """
         if self.can_be_activated():
-            # Désactiver tous les autres exercices
-            Exercice.objects.filter(statut='EN_COURS').update(statut='TERMINE')
+            # Désactiver tous les autres exercices (et les clôturer)
+            termines = list(
+                Exercice.objects.filter(statut='EN_COURS').exclude(pk=self.pk).values_list('id', flat=True)
+            )
+            Exercice.objects.filter(id__in=termines).update(statut='TERMINE')
+            invalider_periode()
+            for exercice_id in termines:
+                planifier('cloturer_exercice', exercice_id=str(exercice_id))
             # Activer celui-ci
             self.statut = 'EN_COURS'
             self.save()
@@ -243,11 +308,22 @@ class Session(models.Model):
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
     
+    objects = SessionQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Session"
         verbose_name_plural = "Sessions"
         ordering = ['-date_session']
         unique_together = [['exercice', 'date_session']]
+        indexes = [
+            # Rapports par période (toutes sessions confondues)
+            models.Index(fields=['date_session']),
+            # get_session_en_cours(): filtre et tri servis par le même index partiel
+            models.Index(
+                fields=['-date_session'], condition=models.Q(statut='EN_COURS'),
+                name='session_en_cours_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['exercice'],
@@ -265,8 +341,8 @@ class Session(models.Model):
     
     @classmethod
     def get_session_en_cours(cls):
-        """Retourne la session en cours"""
-        return cls.objects.filter(statut='EN_COURS').first()
+        """Retourne la session en cours (résolue une fois par portée, voir core.contexte)"""
+        return resoudre('session', lambda: cls.objects.filter(statut='EN_COURS').first())
     
     def save(self, *args, **kwargs):
         """
@@ -335,14 +411,19 @@ class Session(models.Model):
         
         # ✅ Sauvegarder l'instance
         super().save(*args, **kwargs)
+        if self.statut != old_statut:
+            invalider_periode()
         
-        # ✅ Traiter la collation seulement si le statut change vers EN_COURS
+        # ✅ Traiter la collation quand la session est EN_COURS (tâche différée,
+        # une seule fois par session grâce à la clé d'idempotence)
         if self.statut == 'EN_COURS' :
             if self.montant_collation > 0:
-                try:
-                    self._traiter_collation()
-                except Exception as e:
-                    print(f"❌ Erreur traitement collation: {e}")
+                planifier('traiter_collation', cle=f"collation:{self.pk}", session_id=str(self.pk))
+    
+    def delete(self, *args, **kwargs):
+        resultat = super().delete(*args, **kwargs)
+        invalider_periode()
+        return resultat
     
     def _traiter_collation(self):
         """
@@ -350,7 +431,7 @@ class Session(models.Model):
         1. Prélève du fonds social
         2. Crée les renflouements pour tous les membres en règle
         """
-        print(f"🎯 Traitement collation pour session {self.nom}: {self.montant_collation:,.0f} FCFA")
+        logger.debug("🎯 Traitement collation pour session %s: %s FCFA", self.nom, self.montant_collation)
         
         # 1. VÉRIFIER ET PRÉLEVER DU FONDS SOCIAL
         try:
@@ -359,31 +440,31 @@ class Session(models.Model):
             
             fonds = FondsSocial.get_fonds_actuel()
             if not fonds:
-                print("❌ ERREUR: Aucun fonds social actuel trouvé pour la collation")
+                logger.error("❌ ERREUR: Aucun fonds social actuel trouvé pour la collation")
                 return False
             
             if not fonds.retirer_montant(
                 self.montant_collation,
                 f"Collation Session {self.nom} - {self.date_session}"
             ):
-                print(f"❌ ERREUR: Fonds social insuffisant pour la collation de {self.montant_collation:,.0f} FCFA")
+                logger.error("❌ ERREUR: Fonds social insuffisant pour la collation de %s FCFA", self.montant_collation)
                 return False
             
         except Exception as e:
-            print(f"❌ Erreur lors du prélèvement du fonds social: {e}")
+            logger.error("❌ Erreur lors du prélèvement du fonds social: %s", e)
             return False
         
         # 2. CRÉER LES RENFLOUEMENTS
         try:
             success = self._creer_renflouement_collation()
             if success:
-                print(f"✅ Collation payée: {self.montant_collation:,.0f} FCFA prélevés du fonds social")
+                logger.debug("✅ Collation payée: %s FCFA prélevés du fonds social", self.montant_collation)
                 return True
             else:
-                print(f"⚠️ Problème lors de la création des renflouements")
+                logger.warning("⚠️ Problème lors de la création des renflouements")
                 return False
         except Exception as e:
-            print(f"❌ Erreur lors de la création des renflouements: {e}")
+            logger.error("❌ Erreur lors de la création des renflouements: %s", e)
             return False
     
     def _creer_renflouement_collation(self):
@@ -401,35 +482,27 @@ class Session(models.Model):
             
             nombre_membres = membres_en_regle.count()
             if nombre_membres == 0:
-                print("⚠️ ATTENTION: Aucun membre en règle pour le renflouement de collation")
+                logger.warning("⚠️ ATTENTION: Aucun membre en règle pour le renflouement de collation")
                 return False
             
             montant_par_membre = (Decimal(str(self.montant_collation)) / nombre_membres).quantize(
                 Decimal('0.01'), rounding=ROUND_HALF_UP
             )
             
-            renflouements_crees = 0
-            for membre in membres_en_regle:
-                try:
-                    renflouement, created = Renflouement.objects.get_or_create(
-                        membre=membre,
-                        session=self,
-                        type_cause='COLLATION',
-                        defaults={
-                            'montant_du': montant_par_membre,
-                            'cause': f"Collation Session {self.nom} - {self.date_session}",
-                        }
-                    )
-                    if created:
-                        renflouements_crees += 1
-                except Exception as e:
-                    print(f"❌ Erreur création renflouement pour {membre}: {e}")
+            renflouements_crees = Renflouement.creer_en_masse(
+                membres_en_regle,
+                session=self,
+                montant_du=montant_par_membre,
+                cause=f"Collation Session {self.nom} - {self.date_session}",
+                type_cause='COLLATION',
+                ignorer_existants=True
+            )
             
-            print(f"✅ Renflouement collation: {renflouements_crees}/{nombre_membres} créés - {montant_par_membre:,.0f} FCFA chacun")
+            logger.debug("✅ Renflouement collation: %s/%s créés - %s FCFA chacun", renflouements_crees, nombre_membres, montant_par_membre)
             return renflouements_crees > 0
             
         except Exception as e:
-            print(f"❌ Erreur dans _creer_renflouement_collation: {e}")
+            logger.error("❌ Erreur dans _creer_renflouement_collation: %s", e)
             return False
     
     def clean(self):
@@ -450,6 +523,21 @@ class Session(models.Model):
 
 
 
+@tache('cloturer_exercice')
+def cloturer_exercice(exercice_id):
+    from .cloture import cloturer_exercice as cloturer
+    exercice = Exercice.objects.filter(pk=exercice_id).first()
+    if exercice and exercice.statut == 'TERMINE':
+        cloturer(exercice)
+
+
+@tache('traiter_collation')
+def traiter_collation(session_id):
+    session = Session.objects.filter(pk=session_id).first()
+    if session:
+        session._traiter_collation()
+
+
 class TypeAssistance(models.Model):
     """
     Types d'assistance disponibles (mariage, décès, etc.)
@@ -466,6 +554,8 @@ class TypeAssistance(models.Model):
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
     
+    objects = TypeAssistanceQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Type d'assistance"
         verbose_name_plural = "Types d'assistance"
@@ -474,6 +564,49 @@ class TypeAssistance(models.Model):
     def __str__(self):
         return f"{self.nom} - {self.montant:,.0f} FCFA"
 
+class SequenceNumerotation(models.Model):
+    """
+    Compteur de numérotation (une ligne par séquence, ex: numéros de membre)
+    L'incrément est un UPDATE atomique suivi d'une lecture dans la même
+    transaction: la ligne reste verrouillée jusqu'au commit, deux créations
+    concurrentes ne peuvent donc pas obtenir le même numéro
+    """
+    nom = models.CharField(max_length=50, primary_key=True, verbose_name="Nom de la séquence")
+    dernier_numero = models.PositiveIntegerField(default=0, verbose_name="Dernier numéro attribué")
+    date_modification = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Séquence de numérotation"
+        verbose_name_plural = "Séquences de numérotation"
+
+    def __str__(self):
+        return f"{self.nom}: {self.dernier_numero}"
+
+    @classmethod
+    def reserver(cls, nom, quantite=1, initialiser=None):
+        """
+        Réserve `quantite` numéros consécutifs et retourne le range réservé.
+        initialiser: fonction retournant la valeur de départ si la séquence
+        n'existe pas encore (appelée une seule fois, à la création)
+        """
+        from django.db import IntegrityError, transaction
+
+        if quantite < 1:
+            return range(0)
+
+        with transaction.atomic():
+            if not cls.objects.filter(nom=nom).update(dernier_numero=F('dernier_numero') + quantite):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(nom=nom, dernier_numero=initialiser() if initialiser else 0)
+                except IntegrityError:
+                    # Créée entre-temps par une requête concurrente
+                    pass
+                cls.objects.filter(nom=nom).update(dernier_numero=F('dernier_numero') + quantite)
+            dernier = cls.objects.filter(nom=nom).values_list('dernier_numero', flat=True).get()
+        return range(dernier - quantite + 1, dernier + 1)
+
+
 class Membre(models.Model):
     """
     Modèle Membre lié à un Utilisateur
@@ -494,10 +627,16 @@ class Membre(models.Model):
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
     
+    objects = MembreQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Membre"
         verbose_name_plural = "Membres"
         ordering = ['-date_inscription']
+        indexes = [
+            # Filtres par statut (listes, tableau de bord, recalcul des statuts)
+            models.Index(fields=['statut']),
+        ]
     
     def __str__(self):
         return f"{self.numero_membre} - {self.utilisateur.nom_complet}"
@@ -508,24 +647,8 @@ class Membre(models.Model):
     
 
     def calculer_epargne_totale(self):
-        """Calcule l'épargne totale du membre"""
-        from transactions.models import EpargneTransaction
-        
-        transactions = EpargneTransaction.objects.filter(membre=self)
-        
-        depots = transactions.filter(type_transaction='DEPOT').aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        retraits = transactions.filter(type_transaction='RETRAIT_PRET').aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        interets = transactions.filter(type_transaction='AJOUT_INTERET').aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        retours = transactions.filter(type_transaction='RETOUR_REMBOURSEMENT').aggregate(
-            total=Sum('montant'))['total'] or Decimal('0')
-        
-        return depots - retraits + interets + retours
+        """Calcule l'épargne totale du membre (lue depuis le solde matérialisé)"""
+        return SoldeMembre.pour_membre(self).epargne_totale
     
     def get_donnees_completes(self):
         """Retourne toutes les données financières du membre"""
@@ -560,18 +683,198 @@ class Membre(models.Model):
         donnees = self.get_donnees_completes()
         return donnees['membre_info']['en_regle']
     
+    @staticmethod
+    def _dernier_numero_existant():
+        """Plus grand suffixe ENS-XXXX existant (initialisation de la séquence)"""
+        numeros = Membre.objects.filter(
+            numero_membre__startswith=PREFIXE_NUMERO_MEMBRE
+        ).values_list('numero_membre', flat=True)
+        return max(
+            (int(numero.split('-')[-1]) for numero in numeros if numero.split('-')[-1].isdigit()),
+            default=0
+        )
+
+    @classmethod
+    def reserver_numeros(cls, quantite=1):
+        """Réserve `quantite` numéros de membre (imports groupés compris)"""
+        return [
+            f"{PREFIXE_NUMERO_MEMBRE}{numero:04d}"
+            for numero in SequenceNumerotation.reserver(
+                SEQUENCE_NUMERO_MEMBRE, quantite, initialiser=cls._dernier_numero_existant
+            )
+        ]
+
     def save(self, *args, **kwargs):
         if not self.numero_membre:
             # Génération automatique du numéro de membre
-            last_member = Membre.objects.order_by('numero_membre').last()
-            if last_member:
-                last_number = int(last_member.numero_membre.split('-')[-1])
-                self.numero_membre = f"ENS-{last_number + 1:04d}"
-            else:
-                self.numero_membre = "ENS-0001"
+            self.numero_membre = Membre.reserver_numeros(1)[0]
         super().save(*args, **kwargs)
-        
-        
+
+
+
+class AgregatParDeltas(models.Model):
+    """
+    Base des agrégats matérialisés (une ligne par clé) maintenus par deltas
+    F() à chaque mouvement d'argent. Les sous-classes définissent CHAMP_CLE
+    (membre_id, session_id), leurs champs montants et date_modification
+    """
+    CHAMP_CLE = None
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def appliquer_deltas(cls, cle, deltas, creer=True):
+        """
+        Applique des deltas atomiques (UPDATE ... SET champ = champ + delta)
+        à la ligne de la clé. La ligne est créée si elle n'existe pas encore,
+        sauf si creer=False (suppressions en cascade d'un membre par exemple)
+        """
+        from django.db import transaction
+        from django.utils import timezone
+
+        deltas = {champ: montant for champ, montant in deltas.items() if montant}
+        if not cle or not deltas:
+            return
+
+        expressions = {champ: F(champ) + montant for champ, montant in deltas.items()}
+        expressions['date_modification'] = timezone.now()
+
+        # Cas courant: la ligne existe, un seul UPDATE (atomique en soi)
+        if cls.objects.filter(**{cls.CHAMP_CLE: cle}).update(**expressions) or not creer:
+            return
+        with transaction.atomic():
+            cls.objects.get_or_create(**{cls.CHAMP_CLE: cle})
+            cls.objects.filter(**{cls.CHAMP_CLE: cle}).update(**expressions)
+
+    @classmethod
+    def appliquer_deltas_en_masse(cls, deltas_par_cle, taille_lot=200):
+        """
+        Variante ensembliste de appliquer_deltas pour de nombreuses clés:
+        {cle: {champ: montant}} appliqué par UPDATE ... CASE par lot,
+        après création groupée des lignes manquantes
+        """
+        from django.db import transaction
+        from django.db.models import Case, When, Value
+        from django.utils import timezone
+
+        deltas_par_cle = {
+            cle: {champ: montant for champ, montant in deltas.items() if montant}
+            for cle, deltas in deltas_par_cle.items()
+        }
+        deltas_par_cle = {cle: deltas for cle, deltas in deltas_par_cle.items() if deltas}
+        if not deltas_par_cle:
+            return
+
+        cles = list(deltas_par_cle)
+        with transaction.atomic():
+            existants = set(
+                cls.objects.filter(**{f'{cls.CHAMP_CLE}__in': cles}).values_list(cls.CHAMP_CLE, flat=True)
+            )
+            cls.objects.bulk_create(
+                [cls(**{cls.CHAMP_CLE: cle}) for cle in cles if cle not in existants],
+                ignore_conflicts=True
+            )
+
+            for debut in range(0, len(cles), taille_lot):
+                lot = cles[debut:debut + taille_lot]
+                champs = {champ for cle in lot for champ in deltas_par_cle[cle]}
+                expressions = {
+                    champ: Case(
+                        *[
+                            When(**{cls.CHAMP_CLE: cle}, then=F(champ) + Value(deltas_par_cle[cle][champ]))
+                            for cle in lot if champ in deltas_par_cle[cle]
+                        ],
+                        default=F(champ),
+                        output_field=models.DecimalField(max_digits=15, decimal_places=2)
+                    )
+                    for champ in champs
+                }
+                cls.objects.filter(**{f'{cls.CHAMP_CLE}__in': lot}).update(
+                    date_modification=timezone.now(), **expressions
+                )
+
+
+class SoldeMembre(AgregatParDeltas):
+    """
+    Soldes financiers matérialisés d'un membre (une ligne par membre)
+    Maintenus par deltas F() à chaque mouvement d'argent, pour éviter
+    de ré-agréger tout l'historique du membre à chaque lecture
+    """
+    CHAMPS_MONTANTS = (
+        'inscription_payee', 'solidarite_payee',
+        'epargne_depots', 'epargne_retraits', 'interets_recus',
+        'retours_remboursements', 'epargne_totale',
+        'renflouement_du', 'renflouement_paye', 'emprunt_restant',
+    )
+    CHAMP_CLE = 'membre_id'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    membre = models.OneToOneField(Membre, on_delete=models.CASCADE, related_name='solde')
+    inscription_payee = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Inscription payée (FCFA)")
+    solidarite_payee = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Solidarité payée (FCFA)")
+    epargne_depots = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Dépôts d'épargne (FCFA)")
+    epargne_retraits = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Retraits pour prêts (FCFA)")
+    interets_recus = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Intérêts reçus (FCFA)")
+    retours_remboursements = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Retours de remboursement (FCFA)")
+    epargne_totale = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Épargne totale (FCFA)")
+    renflouement_du = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Renflouement dû (FCFA)")
+    renflouement_paye = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Renflouement payé (FCFA)")
+    emprunt_restant = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Emprunt restant à rembourser (FCFA)")
+    date_modification = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Solde membre"
+        verbose_name_plural = "Soldes membres"
+
+    def __str__(self):
+        return f"Solde {self.membre_id} - Épargne {self.epargne_totale:,.0f} FCFA"
+
+    @classmethod
+    def pour_membre(cls, membre):
+        """Retourne le solde du membre (instance vide non sauvegardée si absent)"""
+        try:
+            return membre.solde
+        except cls.DoesNotExist:
+            return cls(membre=membre, **{champ: Decimal('0') for champ in cls.CHAMPS_MONTANTS})
+
+
+class TotauxSession(AgregatParDeltas):
+    """
+    Flux d'argent matérialisés d'une session (une ligne par session), tenus
+    à jour par deltas comme SoldeMembre. Les séries temporelles (par session,
+    par mois) se lisent sur ces lignes au lieu de parcourir les transactions
+    """
+    CHAMPS_MONTANTS = (
+        'inscriptions', 'solidarites',
+        'epargnes_deposees', 'retraits_prets', 'interets_redistribues', 'retours_remboursements',
+        'emprunts_decaisses', 'remboursements', 'interets_rembourses',
+        'assistances_payees', 'renflouements_generes', 'renflouements_payes',
+    )
+    CHAMP_CLE = 'session_id'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    session = models.OneToOneField(Session, on_delete=models.CASCADE, related_name='totaux')
+    inscriptions = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Inscriptions (FCFA)")
+    solidarites = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Solidarités collectées (FCFA)")
+    epargnes_deposees = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Épargnes déposées (FCFA)")
+    retraits_prets = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Retraits pour prêts (FCFA)")
+    interets_redistribues = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Intérêts redistribués (FCFA)")
+    retours_remboursements = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Retours de remboursement (FCFA)")
+    emprunts_decaisses = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Emprunts décaissés (FCFA)")
+    remboursements = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Remboursements (FCFA)")
+    interets_rembourses = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Intérêts remboursés (FCFA)")
+    assistances_payees = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Assistances payées (FCFA)")
+    renflouements_generes = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Renflouements générés (FCFA)")
+    renflouements_payes = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Renflouements payés (FCFA)")
+    date_modification = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Totaux de session"
+        verbose_name_plural = "Totaux des sessions"
+
+    def __str__(self):
+        return f"Totaux {self.session_id}"
 
 
 class FondsSocial(models.Model):
@@ -598,7 +901,14 @@ class FondsSocial(models.Model):
     
     @classmethod
     def get_fonds_actuel(cls):
-        """Retourne le fonds social de l'exercice en cours"""
+        """
+        Retourne le fonds social de l'exercice en cours (résolu une fois par
+        portée, voir core.contexte: le get_or_create n'est tenté qu'au premier appel)
+        """
+        return resoudre('fonds', cls._resoudre_fonds_actuel)
+    
+    @classmethod
+    def _resoudre_fonds_actuel(cls):
         exercice_actuel = Exercice.get_exercice_en_cours()
         if exercice_actuel:
             fonds, created = cls.objects.get_or_create(exercice=exercice_actuel)
@@ -606,36 +916,95 @@ class FondsSocial(models.Model):
         return None
     
     def ajouter_montant(self, montant, description=""):
-        """Ajoute un montant au fonds social"""
-        self.montant_total += montant
-        self.save()
+        """
+        Ajoute un montant au fonds social.
+        Chemin rapide sans verrou: un seul UPDATE relatif (montant_total + x),
+        sans relire ni réécrire toute la ligne
+        """
+        from django.db import transaction
+        from django.utils import timezone
         
-        # Log de l'opération
-        MouvementFondsSocial.objects.create(
-            fonds_social=self,
-            type_mouvement='ENTREE',
-            montant=montant,
-            description=description
-        )
-        print(f"Fonds Social: +{montant:,.0f} FCFA - {description}")
-    
-    def retirer_montant(self, montant, description=""):
-        """Retire un montant du fonds social"""
-        if self.montant_total >= montant:
-            self.montant_total -= montant
-            self.save()
+        with transaction.atomic():
+            FondsSocial.objects.filter(pk=self.pk).update(
+                montant_total=F('montant_total') + montant,
+                date_modification=timezone.now()
+            )
             
             # Log de l'opération
             MouvementFondsSocial.objects.create(
                 fonds_social=self,
-                type_mouvement='SORTIE',
+                type_mouvement='ENTREE',
                 montant=montant,
                 description=description
             )
-            print(f"Fonds Social: -{montant:,.0f} FCFA - {description}")
+        self.refresh_from_db(fields=['montant_total', 'date_modification'])
+        logger.info("Fonds Social: +%s FCFA - %s", montant, description)
+    
+    def ajouter_montants(self, mouvements):
+        """
+        Variante groupée de ajouter_montant pour une liste de
+        (montant, description): un seul UPDATE relatif du total et un
+        bulk_create de l'historique des mouvements
+        """
+        from django.db import transaction
+        from django.utils import timezone
+        from core.signals import creations_en_masse
+        
+        mouvements = [(montant, description) for montant, description in mouvements if montant]
+        if not mouvements:
+            return
+        total = sum((montant for montant, _ in mouvements), Decimal('0'))
+        
+        with transaction.atomic():
+            FondsSocial.objects.filter(pk=self.pk).update(
+                montant_total=F('montant_total') + total,
+                date_modification=timezone.now()
+            )
+            MouvementFondsSocial.objects.bulk_create([
+                MouvementFondsSocial(
+                    fonds_social=self,
+                    type_mouvement='ENTREE',
+                    montant=montant,
+                    description=description
+                )
+                for montant, description in mouvements
+            ])
+        creations_en_masse.send(sender=MouvementFondsSocial)
+        self.refresh_from_db(fields=['montant_total', 'date_modification'])
+        logger.info("Fonds Social: +%s FCFA (%s mouvements)", total, len(mouvements))
+    
+    def retirer_montant(self, montant, description=""):
+        """
+        Retire un montant du fonds social.
+        UPDATE conditionnel (montant_total >= x): le contrôle du solde et le
+        débit sont une seule opération atomique, sans perte de mise à jour
+        """
+        from django.db import transaction
+        from django.utils import timezone
+        
+        with transaction.atomic():
+            retire = FondsSocial.objects.filter(
+                pk=self.pk, montant_total__gte=montant
+            ).update(
+                montant_total=F('montant_total') - montant,
+                date_modification=timezone.now()
+            )
+            
+            if retire:
+                # Log de l'opération
+                MouvementFondsSocial.objects.create(
+                    fonds_social=self,
+                    type_mouvement='SORTIE',
+                    montant=montant,
+                    description=description
+                )
+        self.refresh_from_db(fields=['montant_total', 'date_modification'])
+        
+        if retire:
+            logger.info("Fonds Social: -%s FCFA - %s", montant, description)
             return True
         else:
-            print(f"ERREUR: Fonds insuffisant. Disponible: {self.montant_total:,.0f}, Demandé: {montant:,.0f}")
+            logger.error("ERREUR: Fonds insuffisant. Disponible: %s, Demandé: %s", self.montant_total, montant)
             return False
 
 class MouvementFondsSocial(models.Model):
@@ -661,4 +1030,109 @@ class MouvementFondsSocial(models.Model):
     
     def __str__(self):
         signe = "+" if self.type_mouvement == 'ENTREE' else "-"
-        return f"{signe}{self.montant:,.0f} FCFA - {self.description[:50]}"
\ No newline at end of file
+        return f"{signe}{self.montant:,.0f} FCFA - {self.description[:50]}"
+
+class ClotureExercice(models.Model):
+    """
+    Photographie des flux d'un exercice terminé (voir core.cloture).
+    Les rapports additionnent ces lignes (une par exercice clos) et
+    n'agrègent les transactions que pour les exercices encore ouverts
+    """
+    CHAMPS_FLUX = (
+        'total_inscriptions', 'total_solidarites', 'total_epargnes',
+        'total_remboursements', 'total_renflouements',
+        'total_emprunts', 'total_assistances', 'total_collations',
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    exercice = models.OneToOneField(Exercice, on_delete=models.CASCADE, related_name='cloture')
+    # Entrées de l'exercice
+    total_inscriptions = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Inscriptions (FCFA)")
+    total_solidarites = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Solidarités (FCFA)")
+    total_epargnes = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Dépôts d'épargne (FCFA)")
+    total_remboursements = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Remboursements (FCFA)")
+    total_renflouements = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Paiements de renflouement (FCFA)")
+    # Sorties de l'exercice
+    total_emprunts = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Emprunts accordés (FCFA)")
+    total_assistances = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Assistances payées (FCFA)")
+    total_collations = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Collations (FCFA)")
+    # Situation à la clôture
+    fonds_social_final = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Fonds social à la clôture (FCFA)")
+    cumul_epargnes = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Cumul des épargnes à la clôture (FCFA)")
+    nombre_membres = models.PositiveIntegerField(default=0, verbose_name="Nombre de membres")
+    nombre_membres_en_regle = models.PositiveIntegerField(default=0, verbose_name="Membres en règle")
+    date_cloture = models.DateTimeField(auto_now=True, verbose_name="Date de clôture")
+
+    class Meta:
+        verbose_name = "Clôture d'exercice"
+        verbose_name_plural = "Clôtures d'exercice"
+        ordering = ['-date_cloture']
+
+    def __str__(self):
+        return f"Clôture {self.exercice.nom} ({self.date_cloture:%d/%m/%Y})"
+
+
+class SoldeMembreCloture(models.Model):
+    """
+    Flux d'un membre pendant un exercice clos. Les données d'un membre
+    additionnent ces lignes et les transactions des exercices ouverts
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    cloture = models.ForeignKey(ClotureExercice, on_delete=models.CASCADE, related_name='soldes_membres')
+    membre = models.ForeignKey(Membre, on_delete=models.CASCADE, related_name='soldes_clotures')
+    inscription_payee = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Inscription payée (FCFA)")
+    # Sessions dues de l'exercice seulement (voir core.cloture.STATUTS_SESSIONS_DUES)
+    solidarite_payee = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Solidarité payée (FCFA)")
+    epargne = models.DecimalField(max_digits=15, decimal_places=2, default=0, verbose_name="Variation d'épargne (FCFA)")
+    nombre_emprunts = models.PositiveIntegerField(default=0, verbose_name="Emprunts")
+    nombre_renflouements = models.PositiveIntegerField(default=0, verbose_name="Renflouements")
+
+    class Meta:
+        verbose_name = "Solde membre à la clôture"
+        verbose_name_plural = "Soldes membres à la clôture"
+        unique_together = ['cloture', 'membre']
+
+    def __str__(self):
+        return f"{self.membre_id} - {self.cloture.exercice_id}"
+
+
+class TacheDifferee(models.Model):
+    """
+    File de tâches durable (outbox): écrite dans la même transaction que
+    l'opération qui la déclenche, exécutée après le commit par le worker
+    `manage.py traiter_taches` (voir core.taches)
+    """
+    STATUT_CHOICES = [
+        ('EN_ATTENTE', 'En attente'),
+        ('EN_COURS', 'En cours'),
+        ('TERMINEE', 'Terminée'),
+        ('ECHEC', 'Échec'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    nom = models.CharField(max_length=100, verbose_name="Tâche")
+    parametres = models.JSONField(default=dict, blank=True, verbose_name="Paramètres")
+    cle_idempotence = models.CharField(
+        max_length=200, unique=True, null=True, blank=True,
+        verbose_name="Clé d'idempotence",
+        help_text="Une seule tâche par clé: replanifier la même opération est sans effet"
+    )
+    statut = models.CharField(max_length=15, choices=STATUT_CHOICES, default='EN_ATTENTE', verbose_name="Statut")
+    tentatives = models.PositiveIntegerField(default=0, verbose_name="Tentatives")
+    max_tentatives = models.PositiveIntegerField(default=5, verbose_name="Tentatives maximum")
+    executer_apres = models.DateTimeField(default=timezone.now, verbose_name="Exécuter après")
+    date_prise = models.DateTimeField(null=True, blank=True, verbose_name="Prise en charge le")
+    date_execution = models.DateTimeField(null=True, blank=True, verbose_name="Exécutée le")
+    derniere_erreur = models.TextField(blank=True, verbose_name="Dernière erreur")
+    date_creation = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Tâche différée"
+        verbose_name_plural = "Tâches différées"
+        ordering = ['date_creation']
+        indexes = [
+            models.Index(fields=['statut', 'executer_apres']),
+        ]
+
+    def __str__(self):
+        return f"{self.nom} ({self.get_statut_display()}, {self.tentatives} tentative(s))"
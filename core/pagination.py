@@ -0,0 +1,138 @@
+"""
+Pagination des listes volumineuses (historiques de transactions).
+
+Par défaut: pagination par numéro de page (COUNT + OFFSET), inchangée.
+Deux modes optionnels, choisis par paramètre de requête:
+- ?curseur=        pagination par clé (keyset) sur l'ordre par défaut de la vue
+                   (ex: -date_paiement) avec l'UUID comme départage. Chaque page
+                   coûte le même prix, qu'elle soit la 1re ou la 500e.
+- ?sans_total=1    pagination par numéro de page sans COUNT(*), pour les
+                   clients en défilement infini.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+VALEURS_VRAIES = ('1', 'true', 'oui')
+
+
+class PaginationTransactions(PageNumberPagination):
+    """
+    Pagination par numéro de page, avec modes curseur et sans total optionnels
+    """
+    page_size_query_param = 'taille_page'
+    max_page_size = 500
+    parametre_curseur = 'curseur'
+    parametre_sans_total = 'sans_total'
+    champ_departage = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = 'page'
+        if self.parametre_curseur in request.query_params:
+            self.mode = 'curseur'
+            return self._paginer_par_curseur(queryset, request, view)
+        if request.query_params.get(self.parametre_sans_total, '').lower() in VALEURS_VRAIES:
+            self.mode = 'sans_total'
+            return self._paginer_sans_total(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.mode == 'page':
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.lien_suivant,
+            'previous': self.lien_precedent,
+            'results': data,
+        })
+
+    # --- Mode curseur (keyset) ---
+
+    def _champ_de_tri(self, view):
+        """Premier champ de l'ordre par défaut de la vue, ex: '-date_paiement'"""
+        ordre = getattr(view, 'ordering', None) or [f'-{self.champ_departage}']
+        return ordre[0] if isinstance(ordre, (list, tuple)) else ordre
+
+    def _paginer_par_curseur(self, queryset, request, view):
+        champ = self._champ_de_tri(view)
+        decroissant = champ.startswith('-')
+        nom = champ.lstrip('-')
+        signe = '-' if decroissant else ''
+        comparaison = 'lt' if decroissant else 'gt'
+
+        # L'ordre est imposé: le curseur n'a de sens que pour un ordre stable et total
+        queryset = queryset.order_by(f'{signe}{nom}', f'{signe}{self.champ_departage}')
+
+        curseur = request.query_params.get(self.parametre_curseur)
+        if curseur:
+            valeur, departage = self._decoder_curseur(curseur, queryset.model, nom)
+            queryset = queryset.filter(
+                Q(**{f'{nom}__{comparaison}': valeur}) |
+                Q(**{nom: valeur, f'{self.champ_departage}__{comparaison}': departage})
+            )
+
+        taille = self.get_page_size(request)
+        lignes = list(queryset[:taille + 1])
+        page = lignes[:taille]
+
+        self.lien_precedent = None
+        self.lien_suivant = None
+        if len(lignes) > taille:
+            derniere = page[-1]
+            self.lien_suivant = replace_query_param(
+                remove_query_param(request.build_absolute_uri(), self.page_query_param),
+                self.parametre_curseur,
+                self._encoder_curseur(getattr(derniere, nom), getattr(derniere, self.champ_departage)),
+            )
+        return page
+
+    def _encoder_curseur(self, valeur, departage):
+        valeur = valeur.isoformat() if hasattr(valeur, 'isoformat') else valeur
+        contenu = json.dumps({'v': valeur, 'id': str(departage)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(contenu.encode()).decode().rstrip('=')
+
+    def _decoder_curseur(self, curseur, modele, nom):
+        try:
+            remplissage = '=' * (-len(curseur) % 4)
+            contenu = json.loads(base64.urlsafe_b64decode(curseur + remplissage))
+            valeur = modele._meta.get_field(nom).to_python(contenu['v'])
+            departage = modele._meta.get_field(self.champ_departage).to_python(contenu['id'])
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound("Curseur invalide")
+        return valeur, departage
+
+    # --- Mode sans total ---
+
+    def _paginer_sans_total(self, queryset, request):
+        try:
+            numero = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound("Page invalide")
+        if numero < 1:
+            raise NotFound("Page invalide")
+
+        taille = self.get_page_size(request)
+        debut = (numero - 1) * taille
+        # Une ligne de plus que la page suffit à savoir s'il existe une page suivante
+        lignes = list(queryset[debut:debut + taille + 1])
+
+        url = request.build_absolute_uri()
+        self.lien_suivant = (
+            replace_query_param(url, self.page_query_param, numero + 1)
+            if len(lignes) > taille else None
+        )
+        if numero == 1:
+            self.lien_precedent = None
+        elif numero == 2:
+            self.lien_precedent = remove_query_param(url, self.page_query_param)
+        else:
+            self.lien_precedent = replace_query_param(url, self.page_query_param, numero - 1)
+        return lignes[:taille]
@@ -6,7 +6,7 @@ from django.db import models
 
 from .models import (
     ConfigurationMutuelle, Exercice, Session, TypeAssistance, 
-    Membre, FondsSocial, MouvementFondsSocial
+    Membre, FondsSocial, MouvementFondsSocial, TotauxSession
 )
 from authentication.serializers import UtilisateurSerializer
 from .utils import calculer_donnees_membre_completes, calculer_donnees_administrateur
@@ -36,6 +36,9 @@ class ExerciceSerializer(serializers.ModelSerializer):
         ]
     
     def get_nombre_sessions(self, obj):
+        # Annoté par Exercice.objects.avec_totaux() dans les listes
+        if hasattr(obj, 'nombre_sessions_total'):
+            return obj.nombre_sessions_total
         return obj.sessions.count()
     
     def get_fonds_social_info(self, obj):
@@ -67,19 +70,28 @@ class SessionSerializer(serializers.ModelSerializer):
             'renflouements_generes', 'date_creation', 'date_modification'
         ]
     
+    # Les totaux sont annotés par Session.objects.avec_totaux() dans les vues;
+    # les requêtes ne servent qu'aux instances non annotées (création, session en cours)
     def get_nombre_membres_inscrits(self, obj):
+        if hasattr(obj, 'nombre_nouveaux_membres'):
+            return obj.nombre_nouveaux_membres
         return obj.nouveaux_membres.count()
     
     def get_total_solidarite_collectee(self, obj):
-        from transactions.models import PaiementSolidarite
-        total = PaiementSolidarite.objects.filter(session=obj).aggregate(
-            total=models.Sum('montant'))['total'] or Decimal('0')
-        return total
+        if hasattr(obj, 'total_solidarite'):
+            return obj.total_solidarite
+        return self._totaux(obj).solidarites
     
     def get_renflouements_generes(self, obj):
-        total = obj.renflouements.aggregate(
-            total=models.Sum('montant_du'))['total'] or Decimal('0')
-        return total
+        if hasattr(obj, 'total_renflouements_du'):
+            return obj.total_renflouements_du
+        return self._totaux(obj).renflouements_generes
+    
+    def _totaux(self, obj):
+        """Totaux matérialisés de la session (ligne vide si aucun mouvement)"""
+        return TotauxSession.objects.filter(session=obj).first() or TotauxSession(
+            session=obj, **{champ: Decimal('0') for champ in TotauxSession.CHAMPS_MONTANTS}
+        )
 
 class TypeAssistanceSerializer(serializers.ModelSerializer):
     """
@@ -96,10 +108,15 @@ class TypeAssistanceSerializer(serializers.ModelSerializer):
             'date_creation', 'date_modification'
         ]
     
+    # Annotés par TypeAssistance.objects.avec_totaux() (listes et imbrications)
     def get_nombre_assistances_accordees(self, obj):
+        if hasattr(obj, 'nombre_assistances_payees'):
+            return obj.nombre_assistances_payees
         return obj.assistances_accordees.filter(statut='PAYEE').count()
     
     def get_montant_total_accorde(self, obj):
+        if hasattr(obj, 'montant_assistances_payees'):
+            return obj.montant_assistances_payees
         total = obj.assistances_accordees.filter(statut='PAYEE').aggregate(
             total=models.Sum('montant'))['total'] or Decimal('0')
         return total
@@ -119,7 +136,10 @@ class FondsSocialSerializer(serializers.ModelSerializer):
         ]
     
     def get_mouvements_recents(self, obj):
-        mouvements = obj.mouvements.all()[:10]  # 10 derniers mouvements
+        # Préchargés (10 par fonds, une seule requête) par FondsSocialViewSet
+        mouvements = getattr(obj, 'mouvements_recents', None)
+        if mouvements is None:
+            mouvements = obj.mouvements.all()[:10]  # 10 derniers mouvements
         return MouvementFondsSocialSerializer(mouvements, many=True).data
 
 class MouvementFondsSocialSerializer(serializers.ModelSerializer):
@@ -158,6 +178,10 @@ class MembreSerializer(serializers.ModelSerializer):
         Retourne TOUTES les données financières calculées du membre
         Cette méthode est CRUCIALE car elle expose tout ce que le frontend doit afficher
         """
+        # Données précalculées en lot par la vue de liste (voir calculer_donnees_membres)
+        donnees_precalculees = self.context.get('donnees_financieres', {})
+        if obj.id in donnees_precalculees:
+            return donnees_precalculees[obj.id]
         return calculer_donnees_membre_completes(obj)
 
 class MembreSimpleSerializer(serializers.ModelSerializer):
@@ -1,2 +1,11 @@
 # Signaux Django pour les automatisations
+from django.dispatch import Signal
 
+
+# Envoyé après une mise à jour ensembliste du statut des membres
+# (UPDATE direct, sans post_save). Argument: membre_ids
+statuts_membres_modifies = Signal()
+
+# Envoyé après une création ou mise à jour groupée (bulk_create, UPDATE
+# ensembliste) qui ne déclenche pas post_save. sender: la classe du modèle
+creations_en_masse = Signal()
@@ -0,0 +1,172 @@
+"""
+Tâches différées (outbox) pour les effets de bord lourds.
+
+Une opération (remboursement, paiement d'assistance, ouverture de session)
+enregistre une TacheDifferee dans sa propre transaction au lieu d'exécuter
+la redistribution ou la création en masse des renflouements pendant la
+requête HTTP. La tâche n'existe donc que si l'opération est commitée.
+
+Exécution selon settings.TACHES_EXECUTION:
+- 'worker' (défaut hors DEBUG): laissée en base pour
+  `manage.py traiter_taches --boucle` (autre processus), qui doit tourner.
+  Les tâches invalident le cache du dashboard depuis ce processus: le cache
+  doit être partagé (DatabaseCache par défaut dans ce mode, Redis...), le
+  worker refuse de démarrer sur un cache en mémoire locale
+- 'immediate' (défaut en DEBUG, tests): exécutée dans le processus, juste
+  après le commit, avant la fin de la requête
+Dans les deux cas une tâche en échec est retentée par le worker, avec un
+délai croissant, jusqu'à max_tentatives.
+
+En mode 'worker', l'API est cohérente à terme: la réponse de l'opération ne
+contient pas encore les effets de ses tâches, visibles seulement après leur
+exécution par le worker:
+- assistance payée (payer_assistance): date_paiement encore vide, fonds
+  social non débité, renflouements des membres pas encore créés (ni
+  dette_renflouement, ni changement de statut qui en découle);
+- remboursement avec intérêts (redistribuer_interets): épargnes des membres
+  pas encore créditées de leur part d'intérêts;
+- ouverture de session (traiter_collation): collation pas encore prélevée
+  sur le fonds social;
+- exercice terminé (cloturer_exercice): pas encore de clôture, les lectures
+  historiques agrègent l'exercice en direct (mêmes totaux).
+
+Chaque tâche a une clé d'idempotence unique: planifier deux fois la même
+opération ne crée qu'une tâche, et la tâche est marquée terminée dans la
+même transaction que ses écritures (pas de double exécution). Une tâche
+dont l'objet a été supprimé avant son exécution se termine sans effet.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .contexte import periode_courante
+
+logger = logging.getLogger(f'mutuelle.{__name__}')
+
+_TACHES = {}
+
+
+def tache(nom):
+    """Enregistre une fonction comme tâche différée sous ce nom"""
+    def decorateur(fonction):
+        _TACHES[nom] = fonction
+        return fonction
+    return decorateur
+
+
+def planifier(nom, cle=None, delai=None, **parametres):
+    """
+    Enregistre une tâche dans la transaction courante. Les paramètres doivent
+    être sérialisables en JSON (identifiants en str). Retourne la tâche, ou
+    None si une tâche de même clé existe déjà
+    """
+    from .models import TacheDifferee
+
+    if nom not in _TACHES:
+        raise ValueError(f"Tâche inconnue: {nom}")
+
+    try:
+        with transaction.atomic():
+            tache_differee = TacheDifferee.objects.create(
+                nom=nom,
+                parametres=parametres,
+                cle_idempotence=cle,
+                max_tentatives=settings.TACHES_MAX_TENTATIVES,
+                executer_apres=timezone.now() + (delai or timedelta(0)),
+            )
+    except IntegrityError:
+        logger.debug("Tâche %s déjà planifiée (clé %s)", nom, cle)
+        return None
+
+    if settings.TACHES_EXECUTION == 'immediate' and not delai:
+        transaction.on_commit(lambda: executer_tache(tache_differee.id))
+    return tache_differee
+
+
+def _delai_avant_nouvel_essai(tentatives):
+    """Attente exponentielle: 30 s, 1 min, 2 min, ... plafonnée à 1 h"""
+    return timedelta(seconds=min(30 * 2 ** (tentatives - 1), 3600))
+
+
+def executer_tache(tache_id):
+    """
+    Prend la tâche si elle est en attente (UPDATE conditionnel: un seul
+    processus gagne) puis l'exécute. Retourne True si elle a réussi
+    """
+    from .models import TacheDifferee
+
+    maintenant = timezone.now()
+    if not TacheDifferee.objects.filter(
+        id=tache_id, statut='EN_ATTENTE', executer_apres__lte=maintenant
+    ).update(statut='EN_COURS', tentatives=F('tentatives') + 1, date_prise=maintenant):
+        return False
+    return _executer(TacheDifferee.objects.get(id=tache_id))
+
+
+def _executer(tache_differee):
+    from .models import TacheDifferee
+
+    fonction = _TACHES.get(tache_differee.nom)
+    try:
+        if fonction is None:
+            raise LookupError(f"Tâche inconnue: {tache_differee.nom}")
+        # Période courante et configuration résolues une fois par tâche
+        with periode_courante(), transaction.atomic():
+            fonction(**tache_differee.parametres)
+            TacheDifferee.objects.filter(id=tache_differee.id).update(
+                statut='TERMINEE', date_execution=timezone.now(), derniere_erreur=''
+            )
+        return True
+    except Exception as e:
+        echec = tache_differee.tentatives >= tache_differee.max_tentatives
+        logger.exception(
+            "Tâche %s (%s) en erreur, tentative %s/%s",
+            tache_differee.nom, tache_differee.id, tache_differee.tentatives, tache_differee.max_tentatives
+        )
+        TacheDifferee.objects.filter(id=tache_differee.id).update(
+            statut='ECHEC' if echec else 'EN_ATTENTE',
+            executer_apres=timezone.now() + _delai_avant_nouvel_essai(tache_differee.tentatives),
+            derniere_erreur=f"{type(e).__name__}: {e}",
+        )
+        return False
+
+
+def reserver_lot(taille=50):
+    """
+    Réserve jusqu'à `taille` tâches prêtes (et celles restées EN_COURS après
+    un arrêt brutal du worker). skip_locked: plusieurs workers se répartissent
+    les tâches sans se bloquer (sans effet sous SQLite)
+    """
+    from .models import TacheDifferee
+
+    maintenant = timezone.now()
+    abandonnees = maintenant - timedelta(seconds=settings.TACHES_DELAI_ABANDON)
+    with transaction.atomic():
+        ids = list(
+            TacheDifferee.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(statut='EN_ATTENTE', executer_apres__lte=maintenant) |
+                Q(statut='EN_COURS', date_prise__lt=abandonnees)
+            )
+            .order_by('executer_apres')
+            .values_list('id', flat=True)[:taille]
+        )
+        TacheDifferee.objects.filter(id__in=ids).update(
+            statut='EN_COURS', tentatives=F('tentatives') + 1, date_prise=maintenant
+        )
+    return list(TacheDifferee.objects.filter(id__in=ids).order_by('executer_apres'))
+
+
+def traiter_lot(taille=50):
+    """Exécute un lot de tâches. Retourne (reussies, en_erreur)"""
+    reussies = en_erreur = 0
+    for tache_differee in reserver_lot(taille):
+        if _executer(tache_differee):
+            reussies += 1
+        else:
+            en_erreur += 1
+    return reussies, en_erreur
@@ -0,0 +1,64 @@
+"""
+Séries temporelles des flux d'argent (par session ou par mois).
+
+Les séries se lisent sur les TotauxSession matérialisés, une ligne par
+session: un graphique sur un exercice ou plusieurs années charge quelques
+dizaines de lignes au lieu de parcourir toutes les transactions. La série
+mensuelle regroupe les sessions par mois de leur date (une session par mois
+en fonctionnement normal).
+"""
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Session, TotauxSession
+
+GRANULARITES = ('session', 'mois')
+CHAMPS_SERIES = TotauxSession.CHAMPS_MONTANTS + ('collations',)
+
+
+def _sessions(exercice=None, date_debut=None, date_fin=None):
+    sessions = Session.objects.all()
+    if exercice is not None:
+        sessions = sessions.filter(exercice=exercice)
+    if date_debut:
+        sessions = sessions.filter(date_session__gte=date_debut)
+    if date_fin:
+        sessions = sessions.filter(date_session__lte=date_fin)
+    return sessions
+
+
+def series_tendances(granularite='session', exercice=None, date_debut=None, date_fin=None):
+    """
+    Points de la série, triés par date (une requête). Chaque point porte les
+    champs CHAMPS_SERIES; une session sans mouvement compte pour 0
+    """
+    sessions = _sessions(exercice, date_debut, date_fin)
+    # Préfixés: certains noms (remboursements, renflouements...) sont aussi
+    # des relations inverses de Session
+    colonnes = {f'totaux__{champ}': champ for champ in TotauxSession.CHAMPS_MONTANTS}
+
+    if granularite == 'session':
+        lignes = sessions.order_by('date_session').values(
+            'id', 'nom', 'date_session', 'exercice_id', 'montant_collation', *colonnes
+        )
+        entete = {'id': 'session_id', 'date_session': 'date', 'montant_collation': 'collations'}
+    else:
+        lignes = sessions.annotate(mois=TruncMonth('date_session')).order_by('mois').values('mois').annotate(
+            nombre_sessions=Count('id'),
+            total_collations=Sum('montant_collation'),
+            **{f'total_{champ}': Sum(colonne) for colonne, champ in colonnes.items()}
+        )
+        entete = {'total_collations': 'collations'}
+        colonnes = {f'total_{champ}': champ for champ in TotauxSession.CHAMPS_MONTANTS}
+
+    renommage = {**entete, **colonnes}
+    points = []
+    for ligne in lignes:
+        point = {renommage.get(cle, cle): valeur for cle, valeur in ligne.items()}
+        for champ in CHAMPS_SERIES:
+            if point[champ] is None:
+                point[champ] = Decimal('0')
+        points.append(point)
+    return points
@@ -0,0 +1,167 @@
+"""
+Outils de test: budgets de requêtes SQL par endpoint, plans d'exécution.
+
+Un budget fixe le nombre maximal de requêtes d'un endpoint, indépendamment
+du nombre d'objets renvoyés. Un N+1 réintroduit fait échouer le test et le
+message liste les empreintes SQL (requêtes normalisées) les plus répétées.
+
+Les assertions de plan (EXPLAIN QUERY PLAN sous SQLite) portent sur le SQL
+réellement émis par les vues et les utilitaires, capturé pendant l'appel:
+un index supprimé ou un filtre modifié qui retombe sur un parcours complet
+de table fait échouer le test.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+_CHAINES = re.compile(r"'(?:[^']|'')*'")
+_NOMBRES = re.compile(r"\b\d+(?:\.\d+)?\b")
+_UUIDS_HEX = re.compile(r"\b[0-9a-f]{32}\b", re.IGNORECASE)
+_LISTES_IN = re.compile(r"\bIN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_ESPACES = re.compile(r"\s+")
+# "SCAN table [USING [COVERING] INDEX index]": parcours de la table entière,
+# ou d'un index dans l'ordre (complet sauf index partiel ou LIMIT)
+_PARCOURS = re.compile(r"\bSCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+_TRI_TEMPORAIRE = 'USE TEMP B-TREE FOR ORDER BY'
+
+# Cache partagé exigé par le worker en mode 'worker' (override_settings(CACHES=...),
+# table créée par `manage.py createcachetable` dans le test)
+CACHE_PARTAGE = {
+    'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'mutuelle_cache_tests'}
+}
+
+
+def empreinte_sql(sql):
+    """
+    Normalise une requête SQL: les littéraux (chaînes, nombres, UUID) et
+    les listes IN (...) sont remplacés, pour regrouper les requêtes qui ne
+    diffèrent que par leurs paramètres
+    """
+    empreinte = _CHAINES.sub('%s', sql)
+    empreinte = _UUIDS_HEX.sub('%s', empreinte)
+    empreinte = _NOMBRES.sub('%s', empreinte)
+    empreinte = _LISTES_IN.sub('IN (...)', empreinte)
+    return _ESPACES.sub(' ', empreinte).strip()
+
+
+def compter_empreintes(requetes):
+    """Compte les requêtes capturées par empreinte SQL"""
+    return Counter(empreinte_sql(requete['sql']) for requete in requetes)
+
+
+def rapport_requetes(requetes, limite=10):
+    """Rapport lisible: empreintes triées de la plus répétée à la moins répétée"""
+    lignes = []
+    for empreinte, nombre in compter_empreintes(requetes).most_common(limite):
+        suspect = '  <- N+1 probable' if nombre > 1 else ''
+        lignes.append(f"  {nombre:>4} x {empreinte}{suspect}")
+    return '\n'.join(lignes)
+
+
+class BudgetRequetesMixin:
+    """
+    Mixin de TestCase: assertions sur le nombre de requêtes SQL
+    """
+
+    @contextmanager
+    def assertBudgetRequetes(self, budget, libelle='', using='default'):
+        """
+        Échoue si le bloc exécute plus de `budget` requêtes, en listant
+        les empreintes SQL responsables
+        """
+        with CaptureQueriesContext(connections[using]) as contexte:
+            yield contexte
+
+        nombre = len(contexte.captured_queries)
+        if nombre > budget:
+            self.fail(
+                f"{libelle or 'Bloc'}: {nombre} requêtes SQL pour un budget de {budget}\n"
+                f"{rapport_requetes(contexte.captured_queries)}"
+            )
+
+    def verifier_budgets(self, budgets, client=None):
+        """
+        Vérifie une table {url: budget} d'endpoints GET (un sous-test par URL)
+        """
+        client = client or self.client
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                with self.assertBudgetRequetes(budget, libelle=f"GET {url}"):
+                    reponse = client.get(url)
+                self.assertEqual(reponse.status_code, 200, url)
+
+
+def plan_requete(sql, using='default'):
+    """Plan d'exécution (EXPLAIN QUERY PLAN, SQLite) d'une requête SQL capturée"""
+    with connections[using].cursor() as curseur:
+        curseur.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(ligne[-1] for ligne in curseur.fetchall())
+
+
+def index_partiels(using='default'):
+    """Noms des index partiels (CREATE INDEX ... WHERE) de la base SQLite"""
+    with connections[using].cursor() as curseur:
+        curseur.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")
+        return {ligne[0] for ligne in curseur.fetchall()}
+
+
+def parcours_complets(plan, sql='', partiels=frozenset()):
+    """
+    Tables parcourues entièrement dans un plan d'exécution: SCAN sans index,
+    ou SCAN d'un index complet dans une requête sans LIMIT. Le parcours d'un
+    index partiel (partiels) ne lit que les lignes qu'il contient
+    """
+    limite = bool(_LIMIT.search(sql))
+    return sorted({
+        table for table, index in _PARCOURS.findall(plan)
+        if not index or (index not in partiels and not limite)
+    })
+
+
+class PlanRequetesMixin:
+    """
+    Mixin de TestCase: assertions sur le plan d'exécution des requêtes
+    réellement émises par les vues et les utilitaires.
+    Les plans ne sont vérifiés que sous SQLite (base des tests): sur de
+    petites tables sans statistiques, PostgreSQL préfère le parcours séquentiel
+    """
+
+    def setUp(self):
+        super().setUp()
+        if connections['default'].vendor != 'sqlite':
+            self.skipTest("Plans d'exécution vérifiés sous SQLite uniquement")
+
+    @contextmanager
+    def assertRequetesIndexees(self, *tables, tri=False, using='default'):
+        """
+        Capture les SELECT du bloc et vérifie le plan de ceux qui lisent une
+        des tables données: échec si l'une d'elles est parcourue entièrement,
+        ou (tri=True) si les lignes sont triées dans un B-tree temporaire au
+        lieu de suivre un index. Échoue aussi si aucune requête ne lit une
+        des tables (le bloc ne teste plus le chemin voulu)
+        """
+        with CaptureQueriesContext(connections[using]) as contexte:
+            yield contexte
+
+        lues = set()
+        partiels = index_partiels(using)
+        for requete in contexte.captured_queries:
+            sql = requete['sql']
+            concernees = [table for table in tables if f'"{table}"' in sql]
+            if not sql.lstrip().upper().startswith('SELECT') or not concernees:
+                continue
+            lues.update(concernees)
+            plan = plan_requete(sql, using)
+            completes = [table for table in parcours_complets(plan, sql, partiels) if table in concernees]
+            if completes:
+                self.fail(f"Parcours complet de {', '.join(completes)}:\n{plan}\n{sql}")
+            if tri and _TRI_TEMPORAIRE in plan:
+                self.fail(f"Tri sans index:\n{plan}\n{sql}")
+        absentes = [table for table in tables if table not in lues]
+        if absentes:
+            self.fail(f"Aucune requête du bloc ne lit {', '.join(absentes)}")
@@ -1,3 +1,586 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.benchmark import generer_mutuelle, mesurer_scenarios, creer_administrateur_benchmark
+from authentication.models import Utilisateur
+from core.models import (
+    ClotureExercice, ConfigurationMutuelle, Exercice, FondsSocial, Membre, MouvementFondsSocial, SequenceNumerotation, Session, SoldeMembre, SoldeMembreCloture, TacheDifferee, TypeAssistance,
+    SEQUENCE_NUMERO_MEMBRE
+)
+from core.taches import planifier, tache, traiter_lot
+from core.testing import (
+    CACHE_PARTAGE, BudgetRequetesMixin, PlanRequetesMixin, empreinte_sql, parcours_complets, plan_requete, rapport_requetes
+)
+from core.cloture import totaux_flux
+from core.configuration import portee_configuration
+from core.contexte import periode_courante
+from core.journalisation import MASQUE, donnees_masquees
+from core.utils import (
+    calculer_donnees_membres, calculer_epargnes_membres, differer_recalcul_statuts, marquer_statut_a_recalculer,
+    recalculer_statuts_membres
+)
+from transactions.models import (
+    AssistanceAccordee, Emprunt, EpargneTransaction, PaiementSolidarite, Remboursement,
+    Renflouement
+)
+
+
+class GenerationDonneesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.compteurs = generer_mutuelle(20, nombre_sessions=6, nombre_exercices=2, graine=1)
+
+    def test_volumes_generes(self):
+        self.assertEqual(Membre.objects.count(), 20)
+        self.assertEqual(Session.objects.count(), 6)
+        self.assertEqual(self.compteurs['emprunts'], 4)
+        self.assertEqual(Session.objects.filter(statut='EN_COURS').count(), 1)
+
+    def test_soldes_coherents_avec_transactions(self):
+        historique = dict(Membre.objects.avec_epargne().values_list('id', 'epargne'))
+        self.assertEqual(calculer_epargnes_membres(), historique)
+        for solde in SoldeMembre.objects.all():
+            self.assertEqual(solde.epargne_totale, historique[solde.membre_id])
+
+
+class CoherenceEpargnesTests(TestCase):
+    """L'épargne matérialisée (SoldeMembre) suit l'historique sur tous les chemins d'écriture"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(8, nombre_sessions=3, graine=9)
+
+    def assertEpargnesCoherentes(self):
+        self.assertEqual(
+            calculer_epargnes_membres(), dict(Membre.objects.avec_epargne().values_list('id', 'epargne'))
+        )
+
+    def test_ecritures_unitaires_et_redistribution(self):
+        session = Session.get_session_en_cours()
+        membre = Membre.objects.order_by('numero_membre').first()
+        depot = EpargneTransaction.objects.create(
+            membre=membre, type_transaction='DEPOT', montant=Decimal('4000'), session=session
+        )
+        depot.montant = Decimal('6000')
+        depot.save()
+        self.assertEpargnesCoherentes()
+        depot.delete()
+        self.assertEpargnesCoherentes()
+
+        # Solde complet d'un emprunt: intérêts redistribués par bulk_create
+        emprunt = Emprunt.objects.filter(statut='EN_COURS').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            Remboursement.objects.create(
+                emprunt=emprunt, montant=emprunt.montant_restant_a_rembourser, session=session
+            )
+        self.assertTrue(EpargneTransaction.objects.filter(type_transaction='AJOUT_INTERET').exists())
+        self.assertEpargnesCoherentes()
+
+    def test_scenarios_benchmark(self):
+        self.client.force_login(creer_administrateur_benchmark())
+        resultats = mesurer_scenarios(self.client, repetitions=1)
+
+        self.assertIn('paiement_assistance', resultats)
+        for nom, mesure in resultats.items():
+            with self.subTest(scenario=nom):
+                self.assertTrue(all(200 <= statut < 300 for statut in mesure['statuts']), mesure)
+                self.assertGreater(mesure['requetes'], 0)
+
+
+class EmpreinteSqlTests(TestCase):
+    def test_parametres_normalises(self):
+        self.assertEqual(
+            empreinte_sql("SELECT * FROM core_membre WHERE id = 'ab12' AND age > 30"),
+            empreinte_sql("SELECT *  FROM core_membre WHERE id = 'cd34' AND age > 7"),
+        )
+        self.assertEqual(
+            empreinte_sql("SELECT 1 FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT %s FROM t WHERE id IN (...)",
+        )
+
+    def test_rapport_signale_les_requetes_repetees(self):
+        requetes = [{'sql': f"SELECT nom FROM core_session WHERE id = {i}"} for i in range(3)]
+        self.assertIn("3 x SELECT nom FROM core_session WHERE id = %s  <- N+1 probable",
+                      rapport_requetes(requetes))
+
+
+class BudgetRequetesCoreTests(BudgetRequetesMixin, TestCase):
+    """
+    Nombre maximal de requêtes par endpoint. Chaque liste contient plus
+    d'objets que son budget: un N+1 réintroduit dépasse forcément le budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(15, nombre_sessions=6, nombre_exercices=3, graine=3)
+        for indice in range(5):
+            TypeAssistance.objects.create(nom=f"Type budget {indice}", montant=Decimal('50000'))
+        fonds = FondsSocial.get_fonds_actuel()
+        for indice in range(12):
+            fonds.ajouter_montant(Decimal('1000'), f"Mouvement {indice}")
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_budgets_listes(self):
+        self.verifier_budgets({
+            '/api/core/configurations/': 4,
+            '/api/core/exercices/': 4,
+            '/api/core/sessions/': 4,
+            '/api/core/membres/': 12,
+            '/api/core/types-assistance/': 4,
+            '/api/core/fonds-social/': 5,
+        })
+
+    def test_budgets_details(self):
+        self.verifier_budgets({
+            f'/api/core/exercices/{Exercice.objects.first().id}/': 3,
+            f'/api/core/sessions/{Session.objects.first().id}/': 3,
+            f'/api/core/membres/{Membre.objects.first().id}/': 11,
+            f'/api/core/types-assistance/{TypeAssistance.objects.first().id}/': 3,
+            f'/api/core/fonds-social/{FondsSocial.get_fonds_actuel().id}/': 4,
+        })
+
+    def test_depassement_liste_les_empreintes(self):
+        with self.assertRaises(AssertionError) as contexte:
+            with self.assertBudgetRequetes(1, libelle='Sessions'):
+                for session in Session.objects.all():
+                    session.exercice.nom
+        self.assertIn("Sessions: 7 requêtes SQL pour un budget de 1", str(contexte.exception))
+        self.assertIn("6 x SELECT", str(contexte.exception))
+
+
+class FondsSocialTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(3, nombre_sessions=1, graine=14)
+
+    def _sorties(self, fonds):
+        return MouvementFondsSocial.objects.filter(fonds_social=fonds, type_mouvement='SORTIE').count()
+
+    def test_retrait_refuse_si_solde_insuffisant(self):
+        fonds = FondsSocial.get_fonds_actuel()
+        disponible, sorties = fonds.montant_total, self._sorties(fonds)
+
+        with self.assertLogs('mutuelle.core.models', 'ERROR'):
+            self.assertFalse(fonds.retirer_montant(disponible + Decimal('0.01'), "Trop"))
+        self.assertEqual(FondsSocial.objects.get(pk=fonds.pk).montant_total, disponible)
+        self.assertEqual(self._sorties(fonds), sorties)
+
+        self.assertTrue(fonds.retirer_montant(disponible, "Tout"))
+        self.assertEqual(fonds.montant_total, 0)
+        self.assertEqual(self._sorties(fonds), sorties + 1)
+
+    def test_instance_perimee_ne_met_pas_a_decouvert(self):
+        # Deux instances lues avant les retraits: le contrôle se fait en base
+        fonds, copie = FondsSocial.get_fonds_actuel(), FondsSocial.objects.get(pk=FondsSocial.get_fonds_actuel().pk)
+        moitie_plus = (fonds.montant_total / 2 + 1).quantize(Decimal('0.01'))
+
+        self.assertTrue(fonds.retirer_montant(moitie_plus, "Premier"))
+        with self.assertLogs('mutuelle.core.models', 'ERROR'):
+            self.assertFalse(copie.retirer_montant(moitie_plus, "Second"))
+        self.assertEqual(copie.montant_total, fonds.montant_total)
+        self.assertGreaterEqual(FondsSocial.objects.get(pk=fonds.pk).montant_total, 0)
+
+
+class PlanRequetesTests(PlanRequetesMixin, TestCase):
+    """
+    Les requêtes émises par les vues et les utilitaires (SQL capturé, pas
+    des querysets reconstruits) restent servies par un index
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, graine=5)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_detection_parcours_complet(self):
+        with CaptureQueriesContext(connection) as requetes:
+            list(Renflouement.objects.filter(montant_du__gt=0))
+        plan = plan_requete(requetes.captured_queries[0]['sql'])
+        self.assertEqual(parcours_complets(plan), ['transactions_renflouement'], plan)
+        with self.assertRaises(AssertionError):
+            with self.assertRequetesIndexees('transactions_renflouement'):
+                list(Renflouement.objects.filter(montant_du__gt=0))
+        with self.assertRaises(AssertionError):
+            with self.assertRequetesIndexees('transactions_renflouement'):
+                Session.get_session_en_cours()
+
+    def test_periode_courante(self):
+        with self.assertRequetesIndexees('core_exercice', 'core_session', tri=True):
+            Exercice.get_exercice_en_cours()
+            Session.get_session_en_cours()
+
+    def test_filtres_de_la_liste_des_membres(self):
+        # MembreFilter: statut, puis renflouements dus (filtre et exclusion)
+        with self.assertRequetesIndexees('core_membre'):
+            self.assertEqual(self.client.get('/api/core/membres/', {'statut': 'EN_REGLE'}).status_code, 200)
+        with self.assertRequetesIndexees('core_membre', 'transactions_renflouement'):
+            reponse = self.client.get('/api/core/membres/', {'has_renflouements_dus': 'true'})
+            self.assertEqual(reponse.status_code, 200)
+        with self.assertRequetesIndexees('transactions_renflouement'):
+            reponse = self.client.get('/api/core/membres/', {'has_renflouements_dus': 'false'})
+            self.assertEqual(reponse.status_code, 200)
+
+    def test_moteur_de_calcul_par_lot(self):
+        membres = list(Membre.objects.order_by('numero_membre')[:4])
+        tables = (
+            'core_soldemembre', 'core_soldemembrecloture', 'transactions_paiementsolidarite',
+            'transactions_emprunt', 'transactions_renflouement',
+        )
+        with self.assertRequetesIndexees(*tables):
+            calculer_donnees_membres(membres)
+        with self.assertRequetesIndexees('core_membre', *tables):
+            recalculer_statuts_membres(Membre.objects.filter(id__in=[membre.id for membre in membres]))
+
+
+class ConfigurationCacheTests(TestCase):
+    def setUp(self):
+        self.configuration = ConfigurationMutuelle.get_configuration()
+
+    def test_version_verifiee_une_fois_par_requete(self):
+        with portee_configuration():
+            with self.assertNumQueries(1):
+                for _ in range(5):
+                    self.assertEqual(ConfigurationMutuelle.get_configuration().pk, self.configuration.pk)
+
+    def test_modification_par_un_autre_processus(self):
+        # Écriture d'un autre processus (le cache de celui-ci n'est pas vidé),
+        # même horodatage: la version incrémentée suffit à invalider
+        with connection.cursor() as curseur:
+            curseur.execute(
+                "UPDATE core_configurationmutuelle SET montant_inscription = 99000, version = version + 1"
+            )
+        with portee_configuration():
+            with self.assertNumQueries(2):
+                self.assertEqual(ConfigurationMutuelle.get_configuration().montant_inscription, Decimal('99000'))
+                ConfigurationMutuelle.get_configuration()
+
+    def test_sauvegarde_invalide_le_cache(self):
+        with portee_configuration():
+            configuration = ConfigurationMutuelle.objects.get(pk=self.configuration.pk)
+            configuration.taux_interet = Decimal('7.5')
+            configuration.save()
+            self.assertEqual(configuration.version, self.configuration.version + 1)
+            self.assertEqual(ConfigurationMutuelle.get_configuration().taux_interet, Decimal('7.5'))
+
+    def test_update_incremente_la_version(self):
+        ConfigurationMutuelle.objects.filter(pk=self.configuration.pk).update(taux_interet=Decimal('6'))
+        configuration = ConfigurationMutuelle.get_configuration()
+        self.assertEqual(configuration.version, self.configuration.version + 1)
+        self.assertEqual(configuration.taux_interet, Decimal('6'))
+
+    def test_copie_renvoyee(self):
+        configuration = ConfigurationMutuelle.get_configuration()
+        configuration.taux_interet = Decimal('42')
+        self.assertNotEqual(ConfigurationMutuelle.get_configuration().taux_interet, Decimal('42'))
+
+
+class PeriodeCouranteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(3, nombre_sessions=2, graine=6)
+
+    def test_resolue_une_fois_par_portee(self):
+        with periode_courante():
+            with self.assertNumQueries(3):
+                for _ in range(3):
+                    exercice = Exercice.get_exercice_en_cours()
+                    session = Session.get_session_en_cours()
+                    fonds = FondsSocial.get_fonds_actuel()
+        self.assertEqual(fonds.exercice, exercice)
+        self.assertEqual(session.statut, 'EN_COURS')
+
+    def test_invalidee_par_changement_de_statut(self):
+        with periode_courante():
+            ancienne = Session.get_session_en_cours()
+            exercice = Exercice.get_exercice_en_cours()
+            nouvelle = Session.objects.create(
+                exercice=exercice, date_session=ancienne.date_session + timedelta(days=30)
+            )
+            self.assertEqual(Session.get_session_en_cours(), nouvelle)
+
+            exercice.statut = 'TERMINE'
+            exercice.save()
+            self.assertIsNone(Exercice.get_exercice_en_cours())
+            self.assertIsNone(FondsSocial.get_fonds_actuel())
+
+    def test_hors_portee_sans_cache(self):
+        with self.assertNumQueries(2):
+            Session.get_session_en_cours()
+            Session.get_session_en_cours()
+
+
+class RecalculStatutsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(8, nombre_sessions=3, graine=10)
+
+    def _membre(self, en_regle, statut):
+        """
+        Membre dont le statut en base contredit le calcul, avec une solidarité
+        retirée: (membre, session et montant de la solidarité à repayer)
+        """
+        for membre in Membre.objects.order_by('numero_membre'):
+            paiement = membre.paiements_solidarite.first()
+            if paiement and membre.calculer_statut_en_regle() == en_regle:
+                paiement.delete()
+                Membre.objects.filter(pk=membre.pk).update(statut=statut)
+                return membre, paiement.session, paiement.montant
+        self.fail("Jeu de données sans membre adapté")
+
+    def _statut(self, membre):
+        membre.refresh_from_db(fields=['statut'])
+        return membre.statut
+
+    def test_paiement_promeut_sans_retrograder(self):
+        # captureOnCommitCallbacks: simule le commit de l'écriture (TestCase ne commite jamais)
+        membre, session, _ = self._membre(en_regle=False, statut='EN_REGLE')
+        with differer_recalcul_statuts():
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                PaiementSolidarite.objects.create(membre=membre, session=session, montant=Decimal('1'))
+        self.assertTrue(callbacks)
+        self.assertEqual(self._statut(membre), 'EN_REGLE')
+
+        membre, session, montant = self._membre(en_regle=True, statut='NON_EN_REGLE')
+        with differer_recalcul_statuts():
+            with self.captureOnCommitCallbacks(execute=True):
+                PaiementSolidarite.objects.create(membre=membre, session=session, montant=montant)
+            # Recalculé au commit de l'écriture, avant la construction de la réponse
+            self.assertEqual(self._statut(membre), 'EN_REGLE')
+
+    def test_rien_apres_une_exception(self):
+        membre, _, _ = self._membre(en_regle=True, statut='NON_EN_REGLE')
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                with differer_recalcul_statuts():
+                    marquer_statut_a_recalculer(membre.id)
+                    raise ValueError("requête en échec")
+        self.assertEqual(self._statut(membre), 'NON_EN_REGLE')
+
+    def test_rien_apres_un_rollback(self):
+        membre, session, montant = self._membre(en_regle=True, statut='NON_EN_REGLE')
+        with self.captureOnCommitCallbacks(execute=True):
+            with differer_recalcul_statuts():
+                with transaction.atomic():
+                    PaiementSolidarite.objects.create(membre=membre, session=session, montant=montant)
+                    transaction.set_rollback(True)
+        self.assertEqual(self._statut(membre), 'NON_EN_REGLE')
+
+
+class NumerotationMembresTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(3, nombre_sessions=2, graine=4)
+
+    def _creer_membre(self, indice):
+        session = Session.objects.first()
+        utilisateur = Utilisateur.objects.create(
+            username=f"nouveau{indice}", email=f"nouveau{indice}@mutuelle.test", telephone=f"7{indice:08d}"
+        )
+        return Membre.objects.create(
+            utilisateur=utilisateur, date_inscription=session.date_session,
+            exercice_inscription=session.exercice, session_inscription=session
+        )
+
+    def test_numero_suit_la_sequence(self):
+        self.assertEqual(self._creer_membre(1).numero_membre, "ENS-0004")
+        self.assertEqual(self._creer_membre(2).numero_membre, "ENS-0005")
+
+    def test_reservation_groupee_contigue(self):
+        self.assertEqual(Membre.reserver_numeros(3), ["ENS-0004", "ENS-0005", "ENS-0006"])
+        self.assertEqual(self._creer_membre(1).numero_membre, "ENS-0007")
+
+    def test_reservation_sans_parcourir_les_membres(self):
+        with CaptureQueriesContext(connection) as requetes:
+            Membre.reserver_numeros(500)
+        self.assertFalse([requete for requete in requetes if 'core_membre' in requete['sql']])
+        self.assertEqual(SequenceNumerotation.objects.get(nom=SEQUENCE_NUMERO_MEMBRE).dernier_numero, 503)
+
+    def test_sequence_absente_initialisee_depuis_les_membres(self):
+        SequenceNumerotation.objects.all().delete()
+        Membre.objects.filter(numero_membre="ENS-0002").update(numero_membre="ENS-0042")
+        self.assertEqual(Membre.reserver_numeros(1), ["ENS-0043"])
+
+
+@tache('test_echec')
+def _tache_en_echec():
+    raise RuntimeError("service indisponible")
+
+
+class TachesDiffereesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, nombre_assistances=0, graine=6)
+
+    def _payer_assistance(self):
+        return AssistanceAccordee.objects.create(
+            membre=Membre.objects.first(), type_assistance=TypeAssistance.objects.first(),
+            montant=Decimal('30000'), session=Session.get_session_en_cours(),
+            justification="Test", statut='PAYEE'
+        )
+
+    def test_execution_immediate_apres_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            assistance = self._payer_assistance()
+
+        self.assertTrue(Renflouement.objects.filter(cause__contains=assistance.membre.numero_membre).exists())
+        self.assertEqual(TacheDifferee.objects.get().statut, 'TERMINEE')
+
+    @override_settings(TACHES_EXECUTION='worker', CACHES=CACHE_PARTAGE)
+    def test_worker_execute_une_seule_fois(self):
+        call_command('createcachetable')
+        fonds_avant = FondsSocial.get_fonds_actuel().montant_total
+        with self.captureOnCommitCallbacks(execute=True):
+            assistance = self._payer_assistance()
+        self.assertEqual(TacheDifferee.objects.get().statut, 'EN_ATTENTE')
+        self.assertFalse(Renflouement.objects.filter(type_cause='ASSISTANCE').exists())
+
+        # Replanifier la même opération est sans effet (clé d'idempotence)
+        self.assertIsNone(planifier('payer_assistance', cle=f"assistance:{assistance.id}", assistance_id=str(assistance.id)))
+
+        sortie = StringIO()
+        call_command('traiter_taches', stdout=sortie)
+        call_command('traiter_taches', stdout=sortie)
+
+        self.assertIn("1 tâche(s) exécutée(s)", sortie.getvalue())
+        self.assertEqual(FondsSocial.get_fonds_actuel().montant_total, fonds_avant - Decimal('30000'))
+        self.assertTrue(Renflouement.objects.filter(type_cause='ASSISTANCE').exists())
+
+    @override_settings(TACHES_EXECUTION='worker')
+    def test_worker_refuse_un_cache_local(self):
+        with self.assertRaises(CommandError):
+            call_command('traiter_taches', stdout=StringIO())
+
+    @override_settings(TACHES_EXECUTION='worker')
+    def test_collation_planifiee_une_fois_par_session(self):
+        session = Session.get_session_en_cours()
+        session.montant_collation = Decimal('5000')
+        session.save()
+        session.save()
+        self.assertEqual(TacheDifferee.objects.filter(nom='traiter_collation').count(), 1)
+
+    @override_settings(TACHES_EXECUTION='worker')
+    def test_objet_supprime_avant_execution(self):
+        emprunt = Emprunt.objects.filter(statut='EN_COURS').first()
+        remboursement = Remboursement.objects.create(
+            emprunt=emprunt, montant=emprunt.montant_restant_a_rembourser, session=Session.get_session_en_cours()
+        )
+        remboursement.delete()
+
+        self.assertEqual(traiter_lot(), (1, 0))
+        self.assertEqual(TacheDifferee.objects.get(nom='redistribuer_interets').statut, 'TERMINEE')
+        self.assertFalse(EpargneTransaction.objects.filter(type_transaction='AJOUT_INTERET').exists())
+
+    @override_settings(TACHES_EXECUTION='worker', TACHES_MAX_TENTATIVES=2)
+    def test_nouvel_essai_puis_echec(self):
+        tache_differee = planifier('test_echec')
+
+        self.assertEqual(traiter_lot(), (0, 1))
+        tache_differee.refresh_from_db()
+        self.assertEqual((tache_differee.statut, tache_differee.tentatives), ('EN_ATTENTE', 1))
+        self.assertGreater(tache_differee.executer_apres, timezone.now())
+        self.assertIn("service indisponible", tache_differee.derniere_erreur)
+
+        TacheDifferee.objects.update(executer_apres=timezone.now())
+        traiter_lot()
+        tache_differee.refresh_from_db()
+        self.assertEqual((tache_differee.statut, tache_differee.tentatives), ('ECHEC', 2))
+
+
+class ClotureExerciceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # L'exercice le plus ancien est TERMINE mais pas encore photographié
+        generer_mutuelle(15, nombre_sessions=6, nombre_exercices=2, nombre_assistances=2, graine=8)
+        cls.exercice_clos = Exercice.objects.get(statut='TERMINE')
+
+    def _lectures(self):
+        membres = Membre.objects.select_related('solde').order_by('numero_membre')
+        return calculer_epargnes_membres(), calculer_donnees_membres(membres), totaux_flux()
+
+    def test_lectures_identiques_avant_et_apres_cloture(self):
+        # Paiement sur une session PLANIFIEE de l'exercice: non dû, ni avant ni après
+        derniere = self.exercice_clos.sessions.order_by('-date_session').first()
+        planifiee = Session.objects.create(
+            exercice=self.exercice_clos, nom="Session planifiée",
+            date_session=derniere.date_session + timedelta(days=1), statut='PLANIFIEE'
+        )
+        PaiementSolidarite.objects.create(
+            membre=Membre.objects.order_by('numero_membre').first(), session=planifiee, montant=Decimal('10000')
+        )
+        avant = self._lectures()
+        sortie = StringIO()
+        call_command('cloturer_exercices', stdout=sortie)
+
+        self.assertIn("1 exercice(s) clôturé(s)", sortie.getvalue())
+        self.assertTrue(ClotureExercice.objects.filter(exercice=self.exercice_clos).exists())
+        self.assertTrue(SoldeMembreCloture.objects.exists())
+        self.assertEqual(self._lectures(), avant)
+
+    def test_passage_a_termine_planifie_la_cloture(self):
+        exercice = Exercice.objects.get(statut='EN_COURS')
+        with self.captureOnCommitCallbacks(execute=True):
+            exercice.statut = 'TERMINE'
+            exercice.save()
+
+        cloture = ClotureExercice.objects.get(exercice=exercice)
+        self.assertEqual(cloture.nombre_membres, Membre.objects.count())
+        self.assertEqual(
+            {champ: getattr(cloture, champ) for champ in ClotureExercice.CHAMPS_FLUX},
+            totaux_flux(exercice, utiliser_cloture=False)
+        )
+
+    def test_reouverture_supprime_la_cloture(self):
+        call_command('cloturer_exercices', stdout=StringIO())
+        avant = self._lectures()
+
+        self.exercice_clos.statut = 'EN_COURS'
+        self.exercice_clos.save()
+
+        self.assertFalse(ClotureExercice.objects.exists())
+        self.assertFalse(SoldeMembreCloture.objects.exists())
+        self.assertEqual(self._lectures(), avant)
+
+    def test_rapport_financier_lit_la_cloture(self):
+        call_command('cloturer_exercices', stdout=StringIO())
+        self.client.force_login(creer_administrateur_benchmark())
+        cloture = ClotureExercice.objects.get()
+
+        reponse = self.client.get(
+            '/api/administration/rapports/rapport_financier_complet/',
+            {'exercice_id': str(self.exercice_clos.id)}
+        )
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(Decimal(str(reponse.data['entrees']['epargnes'])), cloture.total_epargnes)
+        self.assertEqual(Decimal(str(reponse.data['sorties']['emprunts'])), cloture.total_emprunts)
+
+        reponse = self.client.get(
+            '/api/administration/rapports/rapport_financier_complet/', {'exercice_id': 'inconnu'}
+        )
+        self.assertEqual(reponse.status_code, 404)
+
+
+class DonneesMasqueesTests(SimpleTestCase):
+    def test_champs_sensibles_masques(self):
+        donnees = {'username': 'awa', 'password': 'secret', 'new_password_confirm': 'secret', 'pin': '1234'}
+        self.assertEqual(
+            donnees_masquees(donnees),
+            {'username': 'awa', 'password': MASQUE, 'new_password_confirm': MASQUE, 'pin': MASQUE}
+        )
+        self.assertEqual(donnees['password'], 'secret')
+
+    def test_querydict_et_donnees_non_dict(self):
+        self.assertEqual(donnees_masquees(QueryDict('pin=1234&montant=500')), {'pin': MASQUE, 'montant': '500'})
+        self.assertEqual(donnees_masquees(['a', 'b']), ['a', 'b'])
@@ -1,6 +1,17 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from decimal import Decimal, ROUND_HALF_UP
-from django.db.models import Sum, Q
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+import logging
+
+logger = logging.getLogger(f'mutuelle.{__name__}')
+
+
+# Membres dont le statut "en règle" doit être recalculé à la fin de la collecte courante
+_statuts_a_recalculer = ContextVar('statuts_a_recalculer', default=None)
 
 
 
@@ -23,22 +34,36 @@ def calculer_fonds_social_total():
         'derniere_modification': None
     }
 
+def calculer_epargnes_membres(membres=None):
+    """
+    Épargne totale de chaque membre du queryset donné (tous les membres par
+    défaut), lue dans les SoldeMembre matérialisés, en une seule requête.
+    SoldeMembre est la source unique de l'épargne: MembreQuerySet.avec_epargne()
+    la recalcule depuis l'historique et ne sert qu'aux contrôles de cohérence.
+    Retourne un dictionnaire {membre_id: epargne}
+    """
+    from core.models import Membre
+    
+    if membres is None:
+        membres = Membre.objects.all()
+    
+    return dict(membres.annotate(
+        epargne_materialisee=Coalesce(F('solde__epargne_totale'), Value(Decimal('0')))
+    ).order_by().values_list('id', 'epargne_materialisee'))
+
 def calculer_cumul_epargnes_total():
     """
     Calcule le cumul total des épargnes de tous les membres (le trésor)
     """
     from core.models import Membre
     
-    total_epargnes = Decimal('0')
-    membres_actifs = Membre.objects.filter(statut__in=['EN_REGLE', 'NON_EN_REGLE'])
-    
-    for membre in membres_actifs:
-        epargne_membre = membre.calculer_epargne_totale()
-        total_epargnes += epargne_membre
+    epargnes = calculer_epargnes_membres(
+        Membre.objects.filter(statut__in=['EN_REGLE', 'NON_EN_REGLE'])
+    )
     
     return {
-        'cumul_total_epargnes': total_epargnes,
-        'nombre_membres': membres_actifs.count()
+        'cumul_total_epargnes': sum(epargnes.values(), Decimal('0')),
+        'nombre_membres': len(epargnes)
     }
 
 def calculer_donnees_administrateur():
@@ -75,19 +100,131 @@ def calculer_donnees_membre_completes(membre):
     Cette fonction est cruciale car elle retourne toutes les informations
     que le frontend doit afficher selon les spécifications
     """
-    from core.models import ConfigurationMutuelle, Session
-    from transactions.models import (
-        PaiementInscription, PaiementSolidarite, EpargneTransaction,
-        Emprunt, Renflouement
-    )
+    return calculer_donnees_membres([membre])[membre.id]
+
+def calculer_donnees_membres(membres):
+    """
+    Calcule les données financières complètes d'un lot de membres
+    (typiquement une page de liste) avec un nombre fixe de requêtes
+    groupées par membre, quel que soit le nombre de membres.
+    Retourne un dictionnaire {membre.id: donnees_completes}
+    """
+    from bisect import bisect_left
+    from django.db.models import Count, F
+    from core.cloture import STATUTS_SESSIONS_DUES, non_clos
+    from core.models import ConfigurationMutuelle, Membre, Session, SoldeMembre, SoldeMembreCloture
+    from transactions.models import PaiementSolidarite, Emprunt, Renflouement
+    
+    membres = list(membres)
+    if not membres:
+        return {}
+    ids = [membre.id for membre in membres]
     
     config = ConfigurationMutuelle.get_configuration()
     session_courante = Session.get_session_en_cours()
     
+    # Totaux cumulés lus depuis les soldes matérialisés (déjà joints par les vues
+    # qui font select_related('solde'))
+    soldes = {}
+    for membre in membres:
+        if Membre.solde.is_cached(membre):
+            try:
+                soldes[membre.id] = membre.solde
+            except SoldeMembre.DoesNotExist:
+                pass
+    if len(soldes) < len(ids):
+        soldes.update({
+            solde.membre_id: solde
+            for solde in SoldeMembre.objects.filter(membre_id__in=[i for i in ids if i not in soldes])
+        })
+    
+    # Exercices clos: flux lus dans les clôtures, une ligne par exercice (voir core.cloture)
+    clotures = {
+        ligne['membre_id']: ligne
+        for ligne in SoldeMembreCloture.objects.filter(membre_id__in=ids).order_by().values(
+            'membre_id'
+        ).annotate(
+            solidarite_due_payee=Sum('solidarite_payee', filter=Q(
+                cloture__exercice__date_debut__gte=F('membre__date_inscription')
+            )),
+            nombre_emprunts=Sum('nombre_emprunts'),
+            nombre_renflouements=Sum('nombre_renflouements'),
+        )
+    }
+    
+    # Solidarité: session courante et sessions depuis l'inscription, en une requête
+    sessions_dues = Q(
+        session__statut__in=STATUTS_SESSIONS_DUES,
+        session__exercice__date_debut__gte=F('membre__date_inscription')
+    ) & non_clos()
+    agregats_solidarite = {
+        'total_depuis_inscription': Sum('montant', filter=sessions_dues),
+    }
+    if session_courante:
+        agregats_solidarite['total_session_courante'] = Sum(
+            'montant', filter=Q(session=session_courante)
+        )
+    solidarites = {
+        ligne['membre_id']: ligne
+        for ligne in PaiementSolidarite.objects.filter(membre_id__in=ids).values(
+            'membre_id'
+        ).annotate(**agregats_solidarite)
+    }
+    
+    # Dates de début d'exercice des sessions dues, triées pour compter par bissection
+    debuts_sessions_dues = sorted(Session.objects.filter(
+        statut__in=STATUTS_SESSIONS_DUES
+    ).values_list('exercice__date_debut', flat=True))
+    
+    # Emprunts: le plus récent en cours et le nombre total par membre
+    emprunts_en_cours = {}
+    for emprunt in Emprunt.objects.filter(membre_id__in=ids, statut='EN_COURS'):
+        emprunts_en_cours.setdefault(emprunt.membre_id, emprunt)
+    nombres_emprunts = dict(
+        Emprunt.objects.filter(membre_id__in=ids).filter(non_clos('session_emprunt')).values('membre_id').annotate(
+            total=Count('id')
+        ).values_list('membre_id', 'total')
+    )
+    
+    nombres_renflouements = dict(
+        Renflouement.objects.filter(membre_id__in=ids).filter(non_clos()).values('membre_id').annotate(
+            total=Count('id')
+        ).values_list('membre_id', 'total')
+    )
+    
+    resultats = {}
+    for membre in membres:
+        solidarite = solidarites.get(membre.id, {})
+        cloture = clotures.get(membre.id, {})
+        nombre_sessions_dues = len(debuts_sessions_dues) - bisect_left(
+            debuts_sessions_dues, membre.date_inscription
+        )
+        resultats[membre.id] = _assembler_donnees_membre(
+            membre,
+            config,
+            session_courante,
+            soldes.get(membre.id) or SoldeMembre.pour_membre(membre),
+            solidarite.get('total_session_courante') or Decimal('0'),
+            nombre_sessions_dues,
+            (solidarite.get('total_depuis_inscription') or Decimal('0'))
+            + (cloture.get('solidarite_due_payee') or Decimal('0')),
+            emprunts_en_cours.get(membre.id),
+            nombres_emprunts.get(membre.id, 0) + (cloture.get('nombre_emprunts') or 0),
+            nombres_renflouements.get(membre.id, 0) + (cloture.get('nombre_renflouements') or 0),
+        )
+    
+    return resultats
+
+def _assembler_donnees_membre(membre, config, session_courante, solde,
+                              paiement_session_courante, nombre_sessions_dues,
+                              total_solidarite_payee, emprunt_en_cours,
+                              nombre_emprunts, nombre_renflouements):
+    """
+    Construit le dictionnaire des données financières d'un membre
+    à partir des agrégats déjà chargés (aucune requête ici)
+    """
     # 1. INSCRIPTION
-    total_paye_inscription = PaiementInscription.objects.filter(
-        membre=membre
-    ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
+    total_paye_inscription = solde.inscription_payee
     
     inscription_data = {
         'montant_total_inscription': config.montant_inscription,
@@ -101,12 +238,6 @@ def calculer_donnees_membre_completes(membre):
     solidarite_data = {'sessions_impayees': []}
     
     if session_courante:
-        # Solidarité pour la session courante
-        paiement_session_courante = PaiementSolidarite.objects.filter(
-            membre=membre,
-            session=session_courante
-        ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
-        
         solidarite_data.update({
             'montant_solidarite_session_courante': config.montant_solidarite,
             'montant_paye_session_courante': paiement_session_courante,
@@ -114,18 +245,8 @@ def calculer_donnees_membre_completes(membre):
             'solidarite_session_courante_complete': paiement_session_courante >= config.montant_solidarite
         })
     
-    # Calcul du cumul des dettes de solidarité
-    # Pour toutes les sessions depuis l'inscription du membre
-    sessions_depuis_inscription = Session.objects.filter(
-        exercice__date_debut__gte=membre.date_inscription,
-        statut__in=['EN_COURS', 'TERMINEE']
-    )
-    
-    total_solidarite_due = sessions_depuis_inscription.count() * config.montant_solidarite
-    total_solidarite_payee = PaiementSolidarite.objects.filter(
-        membre=membre,
-        session__in=sessions_depuis_inscription
-    ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
+    # Cumul des dettes de solidarité pour toutes les sessions depuis l'inscription
+    total_solidarite_due = nombre_sessions_dues * config.montant_solidarite
     
     solidarite_data.update({
         'total_solidarite_due': total_solidarite_due,
@@ -135,42 +256,19 @@ def calculer_donnees_membre_completes(membre):
     })
     
     # 3. ÉPARGNES ET INTÉRÊTS
-    transactions_epargne = EpargneTransaction.objects.filter(membre=membre)
-    
-    epargne_base = transactions_epargne.filter(
-        type_transaction='DEPOT'
-    ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
-    
-    retraits_prets = transactions_epargne.filter(
-        type_transaction='RETRAIT_PRET'
-    ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
-    
-    interets_recus = transactions_epargne.filter(
-        type_transaction='AJOUT_INTERET'
-    ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
-    
-    retours_remboursements = transactions_epargne.filter(
-        type_transaction='RETOUR_REMBOURSEMENT'
-    ).aggregate(total=Sum('montant'))['total'] or Decimal('0')
-    
-    epargne_totale = epargne_base - retraits_prets + interets_recus + retours_remboursements
+    epargne_totale = solde.epargne_totale
     
     epargne_data = {
-        'epargne_base': epargne_base,
-        'retraits_pour_prets': retraits_prets,
-        'interets_recus': interets_recus,
-        'retours_remboursements': retours_remboursements,
+        'epargne_base': solde.epargne_depots,
+        'retraits_pour_prets': solde.epargne_retraits,
+        'interets_recus': solde.interets_recus,
+        'retours_remboursements': solde.retours_remboursements,
         'epargne_totale': epargne_totale,
         'epargne_plus_interets': epargne_totale,  # Dans notre cas, c'est la même chose
-        'montant_interets_separe': interets_recus
+        'montant_interets_separe': solde.interets_recus
     }
     
     # 4. EMPRUNTS
-    emprunt_en_cours = Emprunt.objects.filter(
-        membre=membre,
-        statut='EN_COURS'
-    ).first()
-    
     emprunt_data = {
         'a_emprunt_en_cours': emprunt_en_cours is not None,
         'montant_emprunt_en_cours': emprunt_en_cours.montant_emprunte if emprunt_en_cours else Decimal('0'),
@@ -178,7 +276,7 @@ def calculer_donnees_membre_completes(membre):
         'montant_deja_rembourse': emprunt_en_cours.montant_rembourse if emprunt_en_cours else Decimal('0'),
         'montant_restant_a_rembourser': emprunt_en_cours.montant_restant_a_rembourser if emprunt_en_cours else Decimal('0'),
         'pourcentage_rembourse': emprunt_en_cours.pourcentage_rembourse if emprunt_en_cours else 0,
-        'nombre_emprunts_total': Emprunt.objects.filter(membre=membre).count()
+        'nombre_emprunts_total': nombre_emprunts
     }
     
     # Calcul du montant maximum empruntable
@@ -190,22 +288,15 @@ def calculer_donnees_membre_completes(membre):
     emprunt_data['montant_max_empruntable'] = montant_max_empruntable
     
     # 5. RENFLOUEMENTS
-    renflouements_dus = Renflouement.objects.filter(membre=membre)
-    
-    total_renflouement_du = renflouements_dus.aggregate(
-        total=Sum('montant_du')
-    )['total'] or Decimal('0')
-    
-    total_renflouement_paye = renflouements_dus.aggregate(
-        total=Sum('montant_paye')
-    )['total'] or Decimal('0')
+    total_renflouement_du = solde.renflouement_du
+    total_renflouement_paye = solde.renflouement_paye
     
     renflouement_data = {
         'total_renflouement_du': total_renflouement_du,
         'total_renflouement_paye': total_renflouement_paye,
         'solde_renflouement_du': total_renflouement_du - total_renflouement_paye,
         'renflouement_a_jour': total_renflouement_paye >= total_renflouement_du,
-        'nombre_renflouements': renflouements_dus.count()
+        'nombre_renflouements': nombre_renflouements
     }
     
     # 6. STATUT GLOBAL "EN RÈGLE"
@@ -249,5 +340,229 @@ def calculer_donnees_membre_completes(membre):
         }
     }
     
-    print(f"Calcul complet pour {membre.numero_membre}: En règle = {en_regle}")
-    return donnees_completes
\ No newline at end of file
+    logger.debug("Calcul complet pour %s: En règle = %s", membre.numero_membre, en_regle)
+    return donnees_completes
+
+def recalculer_soldes_membres(membres=None):
+    """
+    Reconstruit les SoldeMembre à partir de tout l'historique des transactions.
+    Sert à l'initialisation et à la réparation d'éventuelles dérives;
+    en fonctionnement normal les soldes sont maintenus par deltas.
+    """
+    from django.db import transaction
+    from core.models import Membre, SoldeMembre
+    from transactions.models import (
+        PaiementInscription, PaiementSolidarite, EpargneTransaction,
+        Emprunt, Renflouement
+    )
+    
+    if membres is None:
+        membres = Membre.objects.all()
+    
+    soldes = {
+        membre_id: {champ: Decimal('0') for champ in SoldeMembre.CHAMPS_MONTANTS}
+        for membre_id in membres.values_list('id', flat=True)
+    }
+    
+    for ligne in PaiementInscription.objects.filter(membre__in=membres).values(
+        'membre_id'
+    ).annotate(total=Sum('montant')):
+        soldes[ligne['membre_id']]['inscription_payee'] = ligne['total']
+    
+    for ligne in PaiementSolidarite.objects.filter(membre__in=membres).values(
+        'membre_id'
+    ).annotate(total=Sum('montant')):
+        soldes[ligne['membre_id']]['solidarite_payee'] = ligne['total']
+    
+    for ligne in EpargneTransaction.objects.filter(membre__in=membres).values(
+        'membre_id', 'type_transaction'
+    ).annotate(total=Sum('montant')):
+        champ, signe = EpargneTransaction.CHAMPS_SOLDE[ligne['type_transaction']]
+        solde = soldes[ligne['membre_id']]
+        solde[champ] += ligne['total']
+        solde['epargne_totale'] += signe * ligne['total']
+    
+    for ligne in Renflouement.objects.filter(membre__in=membres).values(
+        'membre_id'
+    ).annotate(du=Sum('montant_du'), paye=Sum('montant_paye')):
+        soldes[ligne['membre_id']]['renflouement_du'] = ligne['du']
+        soldes[ligne['membre_id']]['renflouement_paye'] = ligne['paye']
+    
+    for emprunt in Emprunt.objects.filter(membre__in=membres).only(
+        'membre_id', 'montant_total_a_rembourser', 'montant_rembourse'
+    ):
+        soldes[emprunt.membre_id]['emprunt_restant'] += emprunt.montant_restant_a_rembourser
+    
+    with transaction.atomic():
+        SoldeMembre.objects.filter(membre_id__in=soldes.keys()).delete()
+        SoldeMembre.objects.bulk_create(
+            [SoldeMembre(membre_id=membre_id, **valeurs) for membre_id, valeurs in soldes.items()],
+            batch_size=500
+        )
+    
+    return len(soldes)
+
+def recalculer_totaux_sessions(sessions=None):
+    """
+    Reconstruit les TotauxSession à partir des transactions (une requête
+    groupée par table). Comme recalculer_soldes_membres, sert à
+    l'initialisation et à la réparation; les totaux sont maintenus par deltas.
+    """
+    from django.db import transaction
+    from core.models import Session, TotauxSession
+    from transactions.models import (
+        PaiementInscription, PaiementSolidarite, EpargneTransaction, Emprunt,
+        Remboursement, AssistanceAccordee, Renflouement, PaiementRenflouement
+    )
+    
+    if sessions is None:
+        sessions = Session.objects.all()
+    
+    totaux = {
+        session_id: {champ: Decimal('0') for champ in TotauxSession.CHAMPS_MONTANTS}
+        for session_id in sessions.values_list('id', flat=True)
+    }
+    
+    sources = (
+        (PaiementInscription.objects.all(), 'session_id', {'inscriptions': 'montant'}),
+        (PaiementSolidarite.objects.all(), 'session_id', {'solidarites': 'montant'}),
+        (Emprunt.objects.all(), 'session_emprunt_id', {'emprunts_decaisses': 'montant_emprunte'}),
+        (Remboursement.objects.all(), 'session_id', {
+            'remboursements': 'montant', 'interets_rembourses': 'montant_interet'
+        }),
+        (AssistanceAccordee.objects.filter(statut='PAYEE'), 'session_id', {'assistances_payees': 'montant'}),
+        (Renflouement.objects.all(), 'session_id', {'renflouements_generes': 'montant_du'}),
+        (PaiementRenflouement.objects.all(), 'session_id', {'renflouements_payes': 'montant'}),
+    )
+    for queryset, cle, champs in sources:
+        lignes = queryset.filter(**{f'{cle}__in': sessions.values('id')}).order_by().values(cle).annotate(
+            **{champ: Sum(montant) for champ, montant in champs.items()}
+        )
+        for ligne in lignes:
+            totaux[ligne[cle]].update({champ: ligne[champ] for champ in champs})
+    
+    for ligne in EpargneTransaction.objects.filter(session__in=sessions).order_by().values(
+        'session_id', 'type_transaction'
+    ).annotate(total=Sum('montant')):
+        totaux[ligne['session_id']][EpargneTransaction.CHAMPS_SESSION[ligne['type_transaction']]] = ligne['total']
+    
+    with transaction.atomic():
+        TotauxSession.objects.filter(session_id__in=totaux.keys()).delete()
+        TotauxSession.objects.bulk_create(
+            [TotauxSession(session_id=session_id, **valeurs) for session_id, valeurs in totaux.items()],
+            batch_size=500
+        )
+    
+    return len(totaux)
+
+
+def recalculer_statuts_membres(membres=None, taille_lot=500, retrograder=True):
+    """
+    Recalcule le statut EN_REGLE / NON_EN_REGLE des membres donnés
+    (tous par défaut) avec le moteur de calcul par lot, puis applique
+    les changements par deux UPDATE. Les membres suspendus ne sont pas modifiés.
+    Avec retrograder=False, les membres ne peuvent qu'être promus EN_REGLE
+    (règle des paiements: un paiement ne fait jamais perdre le statut).
+    Retourne le nombre de membres dont le statut a changé
+    """
+    from core.models import Membre
+    
+    if membres is None:
+        membres = Membre.objects.all()
+    membres = membres.exclude(statut='SUSPENDU').select_related('utilisateur').order_by('pk')
+    
+    from core.signals import statuts_membres_modifies
+    
+    modifies = 0
+    dernier_id = None
+    while True:
+        lot = membres.filter(pk__gt=dernier_id) if dernier_id else membres
+        lot = list(lot[:taille_lot])
+        if not lot:
+            break
+        dernier_id = lot[-1].pk
+        
+        donnees = calculer_donnees_membres(lot)
+        en_regle = [m.id for m in lot if donnees[m.id]['membre_info']['en_regle']]
+        non_en_regle = [m.id for m in lot if not donnees[m.id]['membre_info']['en_regle']]
+        maintenant = timezone.now()
+        
+        modifies += Membre.objects.filter(id__in=en_regle).exclude(
+            statut__in=['EN_REGLE', 'SUSPENDU']
+        ).update(statut='EN_REGLE', date_modification=maintenant)
+        if retrograder:
+            modifies += Membre.objects.filter(id__in=non_en_regle).exclude(
+                statut__in=['NON_EN_REGLE', 'SUSPENDU']
+            ).update(statut='NON_EN_REGLE', date_modification=maintenant)
+    
+    if modifies:
+        statuts_membres_modifies.send(sender=Membre, membre_ids=None)
+    return modifies
+
+def _recalculer_statuts_ids(membres):
+    """membres: {membre_id: retrograder}"""
+    from core.models import Membre
+    
+    for retrograder in (True, False):
+        membre_ids = [membre_id for membre_id, valeur in membres.items() if valeur is retrograder]
+        if membre_ids:
+            recalculer_statuts_membres(Membre.objects.filter(id__in=membre_ids), retrograder=retrograder)
+
+def _fusionner(en_attente, membres):
+    """Une demande avec rétrogradation l'emporte sur une promotion seule"""
+    for membre_id, retrograder in membres.items():
+        en_attente[membre_id] = en_attente.get(membre_id, False) or retrograder
+
+def marquer_statut_a_recalculer(*membre_ids, retrograder=False):
+    """
+    Signale que le statut "en règle" de ces membres doit être recalculé, au
+    commit de la transaction courante (immédiatement hors transaction): une
+    écriture annulée ne déclenche aucun recalcul, et la réponse construite
+    après l'écriture porte le nouveau statut.
+    Dans une collecte (requête HTTP, differer_recalcul_statuts), les demandes
+    d'une même transaction sont regroupées: un seul calcul par membre.
+    retrograder=False (paiements): le membre peut seulement être promu EN_REGLE;
+    True (emprunts, retards): il peut aussi passer NON_EN_REGLE.
+    """
+    membres = {membre_id: retrograder for membre_id in membre_ids if membre_id}
+    if not membres:
+        return
+    en_attente = _statuts_a_recalculer.get()
+    if en_attente is None:
+        transaction.on_commit(lambda: _recalculer_statuts_ids(membres))
+        return
+    _fusionner(en_attente, membres)
+    # Un callback par demande: le premier exécuté vide la collecte, les
+    # suivants n'ont plus rien à faire
+    transaction.on_commit(vider_statuts_en_attente)
+
+def vider_statuts_en_attente():
+    """
+    Recalcule tout de suite les statuts en attente de la collecte courante
+    (utile quand la réponse doit refléter le nouveau statut)
+    """
+    en_attente = _statuts_a_recalculer.get()
+    if en_attente:
+        membres = dict(en_attente)
+        en_attente.clear()
+        _recalculer_statuts_ids(membres)
+
+@contextmanager
+def differer_recalcul_statuts():
+    """
+    Regroupe les recalculs de statut demandés dans le bloc (voir
+    marquer_statut_a_recalculer). À la sortie normale, les demandes encore en
+    attente remontent à la collecte englobante, ou sont exécutées au commit;
+    si le bloc lève une exception, elles sont abandonnées
+    """
+    en_attente = {}
+    jeton = _statuts_a_recalculer.set(en_attente)
+    try:
+        yield en_attente
+    except BaseException:
+        _statuts_a_recalculer.reset(jeton)
+        raise
+    _statuts_a_recalculer.reset(jeton)
+    for retrograder in (True, False):
+        membre_ids = [membre_id for membre_id, valeur in en_attente.items() if valeur is retrograder]
+        marquer_statut_a_recalculer(*membre_ids, retrograder=retrograder)
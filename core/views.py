@@ -4,17 +4,22 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django_filters import rest_framework as filters
 from django.db import models
+from django.db.models import Prefetch
 from .models import (
     ConfigurationMutuelle, Exercice, Session, TypeAssistance, 
-    Membre, FondsSocial
+    Membre, FondsSocial, MouvementFondsSocial
 )
 from .serializers import (
     ConfigurationMutuelleSerializer, ExerciceSerializer, SessionSerializer,
     TypeAssistanceSerializer, MembreSerializer, FondsSocialSerializer,
     DonneesAdministrateurSerializer
 )
-from .utils import calculer_donnees_administrateur
+from .utils import calculer_donnees_administrateur, calculer_donnees_membres
+from .exports import ExportMixin
 from authentication.permissions import IsAdministrateur, IsAdminOrReadOnly
+import logging
+
+logger = logging.getLogger(f'mutuelle.{__name__}')
 
 class ConfigurationMutuelleFilter(filters.FilterSet):
     """
@@ -108,7 +113,7 @@ class ExerciceViewSet(viewsets.ModelViewSet):
     """
     ViewSet pour les exercices avec filtres complets
     """
-    queryset = Exercice.objects.all()
+    queryset = Exercice.objects.avec_totaux()
     serializer_class = ExerciceSerializer
     filterset_class = ExerciceFilter
     search_fields = ['nom', 'description']
@@ -121,7 +126,7 @@ class ExerciceViewSet(viewsets.ModelViewSet):
         """
         Retourne l'exercice en cours
         """
-        print("RECHERCHE DE L'EXO EN COURS ...")
+        logger.debug("RECHERCHE DE L'EXO EN COURS ...")
         exercice = Exercice.get_exercice_en_cours()
         if exercice:
             serializer = self.get_serializer(exercice)
@@ -192,7 +197,7 @@ class SessionViewSet(viewsets.ModelViewSet):
     """
     ViewSet pour les sessions avec filtres complets
     """
-    queryset = Session.objects.all()
+    queryset = Session.objects.avec_totaux()
     serializer_class = SessionSerializer
     filterset_class = SessionFilter
     search_fields = ['nom', 'description', 'exercice__nom']
@@ -315,11 +320,11 @@ class MembreFilter(filters.FilterSet):
             return queryset.filter(date_inscription__year=timezone.now().year)
         return queryset
 
-class MembreViewSet(viewsets.ModelViewSet):
+class MembreViewSet(ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les membres avec TOUS LES CALCULS et filtres complets
     """
-    queryset = Membre.objects.select_related('utilisateur', 'exercice_inscription', 'session_inscription').all()
+    queryset = Membre.objects.select_related('utilisateur', 'exercice_inscription', 'session_inscription', 'solde').all()
     serializer_class = MembreSerializer
     filterset_class = MembreFilter
     search_fields = [
@@ -332,6 +337,36 @@ class MembreViewSet(viewsets.ModelViewSet):
     ]
     ordering = ['-date_inscription']
     permission_classes = [AllowAny]  # Les données membre sont publiques selon vos specs
+    champs_export = [
+        ('id', 'id'), ('numero_membre', 'numero_membre'),
+        ('nom', 'utilisateur__last_name'), ('prenom', 'utilisateur__first_name'),
+        ('email', 'utilisateur__email'), ('telephone', 'utilisateur__telephone'),
+        ('statut', 'statut'), ('date_inscription', 'date_inscription'),
+        ('exercice_inscription', 'exercice_inscription__nom'),
+        ('inscription_payee', 'solde__inscription_payee'),
+        ('solidarite_payee', 'solde__solidarite_payee'),
+        ('epargne_totale', 'solde__epargne_totale'),
+        ('renflouement_du', 'solde__renflouement_du'),
+        ('renflouement_paye', 'solde__renflouement_paye'),
+        ('emprunt_restant', 'solde__emprunt_restant'),
+    ]
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Liste des membres: les données financières de la page sont calculées
+        en lot (nombre de requêtes constant) puis transmises au serializer
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        membres = page if page is not None else list(queryset)
+        
+        context = self.get_serializer_context()
+        context['donnees_financieres'] = calculer_donnees_membres(membres)
+        serializer = self.get_serializer(membres, many=True, context=context)
+        
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
     
     @action(detail=True, methods=['get'], permission_classes=[AllowAny])
     def donnees_completes(self, request, pk=None):
@@ -366,7 +401,7 @@ class TypeAssistanceViewSet(viewsets.ModelViewSet):
     """
     ViewSet pour les types d'assistance
     """
-    queryset = TypeAssistance.objects.all()
+    queryset = TypeAssistance.objects.avec_totaux()
     serializer_class = TypeAssistanceSerializer
     filterset_fields = ['actif', 'montant']
     search_fields = ['nom', 'description']
@@ -378,7 +413,9 @@ class FondsSocialViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet pour le fonds social (lecture seule)
     """
-    queryset = FondsSocial.objects.select_related('exercice').all()
+    queryset = FondsSocial.objects.select_related('exercice').prefetch_related(
+        Prefetch('mouvements', queryset=MouvementFondsSocial.objects.all()[:10], to_attr='mouvements_recents')
+    )
     serializer_class = FondsSocialSerializer
     filterset_fields = ['exercice']
     ordering = ['-date_modification']
@@ -163,6 +163,7 @@ class EmpruntAdmin(admin.ModelAdmin):
     )
     date_hierarchy = 'date_emprunt'
     readonly_fields = ('date_emprunt', 'montant_total_a_rembourser', 'pourcentage_rembourse')
+    actions = ['verifier_retards']
     
     fieldsets = (
         ('Informations de base', {
@@ -226,6 +227,11 @@ class EmpruntAdmin(admin.ModelAdmin):
             min(pourcentage, 100), color, pourcentage
         )
     progression.short_description = 'Progression'
+    
+    def verifier_retards(self, request, queryset):
+        modifies = Emprunt.verifier_retards_globaux(queryset=queryset)
+        self.message_user(request, f"{modifies} emprunt(s) mis à jour.")
+    verifier_retards.short_description = "Vérifier les retards des emprunts sélectionnés"
 
 @admin.register(Remboursement)
 class RemboursementAdmin(admin.ModelAdmin):
@@ -1,2 +1,37 @@
-# Calculateurs pour intrts, renflouement, etc.
+# Calculateurs pour intérêts, renflouement, etc.
+from decimal import Decimal
 
+
+def repartir_plus_forts_restes(montant_total, poids, precision=Decimal('0.01')):
+    """
+    Répartit montant_total proportionnellement aux poids {cle: poids}
+    par la méthode des plus forts restes: chaque part est arrondie à
+    l'unité inférieure (precision), puis les unités restantes sont
+    attribuées aux plus grands restes. La somme des parts est exactement
+    égale à montant_total.
+    Retourne {cle: part}
+    """
+    poids = {cle: valeur for cle, valeur in poids.items() if valeur > 0}
+    if not poids or montant_total <= 0:
+        return {}
+
+    # Calcul en entiers (nombre d'unités de précision) pour rester exact
+    unites_totales = int(montant_total / precision)
+    poids_entiers = {cle: int(valeur / precision) for cle, valeur in poids.items()}
+    total_poids = sum(poids_entiers.values())
+    if total_poids == 0:
+        return {}
+
+    parts = {}
+    restes = []
+    for ordre, (cle, valeur) in enumerate(poids_entiers.items()):
+        quotient, reste = divmod(unites_totales * valeur, total_poids)
+        parts[cle] = quotient
+        # Égalité de reste: le plus gros poids d'abord, puis l'ordre d'entrée
+        restes.append((-reste, -valeur, ordre, cle))
+
+    unites_restantes = unites_totales - sum(parts.values())
+    for _, _, _, cle in sorted(restes)[:unites_restantes]:
+        parts[cle] += 1
+
+    return {cle: unites * precision for cle, unites in parts.items()}
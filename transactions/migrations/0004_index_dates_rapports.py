@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_index_dates_rapports'),
+        ('transactions', '0003_emprunt_date_creation_emprunt_date_modification_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assistanceaccordee',
+            index=models.Index(fields=['statut', 'date_paiement'], name='transaction_statut_3c620e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emprunt',
+            index=models.Index(fields=['date_emprunt'], name='transaction_date_em_2e0e2c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='epargnetransaction',
+            index=models.Index(fields=['type_transaction', 'date_transaction'], name='transaction_type_tr_4d46db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiementinscription',
+            index=models.Index(fields=['date_paiement'], name='transaction_date_pa_98ce33_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiementrenflouement',
+            index=models.Index(fields=['date_paiement'], name='transaction_date_pa_02262d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiementsolidarite',
+            index=models.Index(fields=['date_paiement'], name='transaction_date_pa_959ee2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remboursement',
+            index=models.Index(fields=['date_remboursement'], name='transaction_date_re_75025e_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_index_requetes'),
+        ('transactions', '0004_index_dates_rapports'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='epargnetransaction',
+            index=models.Index(fields=['date_transaction'], name='transaction_date_tr_ab973e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='epargnetransaction',
+            index=models.Index(fields=['membre', 'type_transaction'], name='transaction_membre__73dd2e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='renflouement',
+            index=models.Index(condition=models.Q(('montant_paye__lt', models.F('montant_du'))), fields=['membre'], name='renflouement_non_solde_idx'),
+        ),
+    ]
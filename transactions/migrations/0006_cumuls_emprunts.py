@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:09
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def initialiser_cumuls(apps, schema_editor):
+    """Capital déjà remboursé de chaque emprunt, depuis l'historique existant"""
+    Emprunt = apps.get_model('transactions', 'Emprunt')
+    Remboursement = apps.get_model('transactions', 'Remboursement')
+
+    capital = Remboursement.objects.filter(emprunt=OuterRef('pk')).order_by().values('emprunt').annotate(
+        total=Sum('montant_capital')
+    ).values('total')
+    Emprunt.objects.update(montant_capital_rembourse=Coalesce(
+        Subquery(capital), Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=2)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_index_requetes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emprunt',
+            name='montant_capital_rembourse',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Capital déjà remboursé (FCFA)'),
+        ),
+        migrations.RunPython(initialiser_cumuls, migrations.RunPython.noop),
+    ]
@@ -3,17 +3,76 @@ from django.core.validators import MinValueValidator
 from django.conf import settings
 from decimal import Decimal, ROUND_HALF_UP
 import uuid
-from core.models import Membre, Session, Exercice, TypeAssistance
+from core.models import Membre, Session, Exercice, TypeAssistance, SoldeMembre, TotauxSession
+from core.signals import creations_en_masse, statuts_membres_modifies
+from core.taches import planifier, tache
+from core.utils import marquer_statut_a_recalculer
 from decimal import Decimal, ROUND_HALF_UP
-from django.db.models import Sum, Q
+from django.db.models import Sum, Q, F
 from django.utils import timezone
 import uuid
 from datetime import date, timedelta
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+import logging
+
+logger = logging.getLogger(f'mutuelle.{__name__}')
+
 
-class PaiementInscription(models.Model):
+def repercuter_variation_solde(avant, apres, creer=True, modele=SoldeMembre):
+    """
+    Répercute sur l'agrégat (SoldeMembre par défaut, TotauxSession) le
+    passage d'un état de mouvement à un autre.
+    avant/apres: (clé, {champ: montant}) tels que retournés par
+    deltas_solde() / deltas_session(), ou None pour une création / une suppression
+    """
+    variations = {}
+    for etat, signe in ((avant, -1), (apres, 1)):
+        if not etat:
+            continue
+        membre_id, deltas = etat
+        cible = variations.setdefault(membre_id, {})
+        for champ, montant in deltas.items():
+            cible[champ] = cible.get(champ, Decimal('0')) + signe * Decimal(montant or 0)
+
+    for cle, deltas in variations.items():
+        modele.appliquer_deltas(cle, deltas, creer=creer)
+
+
+class MouvementSoldeMixin:
+    """
+    Maintient à chaque sauvegarde le SoldeMembre du membre et les
+    TotauxSession de la session. Les modèles fournissent
+    deltas_solde() -> (membre_id, {champ: montant}) et/ou
+    deltas_session() -> (session_id, {champ: montant})
+    """
+
+    def deltas_solde(self):
+        return None
+
+    def deltas_session(self):
+        return None
+
+    def _version_en_base(self):
+        """Version actuellement en base (None si nouvelle instance)"""
+        if self._state.adding:
+            return None
+        return type(self).objects.filter(pk=self.pk).first()
+
+    def _sauvegarder_avec_solde(self, *args, ancien=None, **kwargs):
+        """ancien: version en base déjà lue par l'appelant (évite une requête)"""
+        if ancien is None:
+            ancien = self._version_en_base()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            repercuter_variation_solde(ancien and ancien.deltas_solde(), self.deltas_solde())
+            repercuter_variation_solde(
+                ancien and ancien.deltas_session(), self.deltas_session(), modele=TotauxSession
+            )
+
+
+class PaiementInscription(MouvementSoldeMixin, models.Model):
     """
     Paiements d'inscription par tranche
     """
@@ -32,10 +91,20 @@ class PaiementInscription(models.Model):
         verbose_name = "Paiement d'inscription"
         verbose_name_plural = "Paiements d'inscription"
         ordering = ['-date_paiement']
+        # Rapports par période
+        indexes = [
+            models.Index(fields=['date_paiement']),
+        ]
         
+    def deltas_solde(self):
+        return self.membre_id, {'inscription_payee': self.montant}
+    
+    def deltas_session(self):
+        return self.session_id, {'inscriptions': self.montant}
+    
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
+        is_new = self._state.adding
+        self._sauvegarder_avec_solde(*args, **kwargs)
         
         # Alimenter le fonds social à chaque paiement d'inscription
         if is_new:
@@ -50,7 +119,7 @@ class PaiementInscription(models.Model):
     def __str__(self):
         return f"{self.membre.numero_membre} - {self.montant:,.0f} FCFA ({self.date_paiement.date()})"
 
-class PaiementSolidarite(models.Model):
+class PaiementSolidarite(MouvementSoldeMixin, models.Model):
     """
     Paiements de solidarité (fonds social) par session
     """
@@ -70,18 +139,22 @@ class PaiementSolidarite(models.Model):
         verbose_name_plural = "Paiements de solidarité"
         ordering = ['-date_paiement']
         unique_together = [['membre', 'session']]
+        # Rapports par période
+        indexes = [
+            models.Index(fields=['date_paiement']),
+        ]
         
+    def deltas_solde(self):
+        return self.membre_id, {'solidarite_payee': self.montant}
+    
+    def deltas_session(self):
+        return self.session_id, {'solidarites': self.montant}
+    
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
+        is_new = self._state.adding
+        self._sauvegarder_avec_solde(*args, **kwargs)
         
-        try:
-            if self.membre.calculer_statut_en_regle() :
-                self.membre.statut = 'EN_REGLE'
-                self.membre.save()
-        except :
-            print(f"Erreur de calcul de sttus en regle  ")
-            pass
+        marquer_statut_a_recalculer(self.membre_id)
         
         # Alimenter le fonds social à chaque paiement de solidarité
         if is_new:
@@ -96,7 +169,7 @@ class PaiementSolidarite(models.Model):
     def __str__(self):
         return f"{self.membre.numero_membre} - Session {self.session.nom} - {self.montant:,.0f} FCFA"
 
-class EpargneTransaction(models.Model):
+class EpargneTransaction(MouvementSoldeMixin, models.Model):
     """
     Transactions d'épargne (dépôts et retraits pour prêts)
     """
@@ -107,6 +180,22 @@ class EpargneTransaction(models.Model):
         ('RETOUR_REMBOURSEMENT', 'Retour de remboursement'),
     ]
     
+    # Champ du SoldeMembre alimenté et signe dans l'épargne totale, par type
+    # (épargne = dépôts - retraits + intérêts + retours)
+    CHAMPS_SOLDE = {
+        'DEPOT': ('epargne_depots', 1),
+        'RETRAIT_PRET': ('epargne_retraits', -1),
+        'AJOUT_INTERET': ('interets_recus', 1),
+        'RETOUR_REMBOURSEMENT': ('retours_remboursements', 1),
+    }
+    # Champ des TotauxSession alimenté, par type
+    CHAMPS_SESSION = {
+        'DEPOT': 'epargnes_deposees',
+        'RETRAIT_PRET': 'retraits_prets',
+        'AJOUT_INTERET': 'interets_redistribues',
+        'RETOUR_REMBOURSEMENT': 'retours_remboursements',
+    }
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     membre = models.ForeignKey(Membre, on_delete=models.CASCADE, related_name='transactions_epargne')
     type_transaction = models.CharField(max_length=20, choices=TYPE_CHOICES, verbose_name="Type de transaction")
@@ -122,6 +211,24 @@ class EpargneTransaction(models.Model):
         verbose_name = "Transaction d'épargne"
         verbose_name_plural = "Transactions d'épargne"
         ordering = ['-date_transaction']
+        indexes = [
+            # Rapports par période
+            models.Index(fields=['type_transaction', 'date_transaction']),
+            # Tri par défaut des listes
+            models.Index(fields=['date_transaction']),
+            # Épargne d'un membre par type (données membre, soldes)
+            models.Index(fields=['membre', 'type_transaction']),
+        ]
+    
+    def deltas_solde(self):
+        champ, signe = self.CHAMPS_SOLDE[self.type_transaction]
+        return self.membre_id, {champ: self.montant, 'epargne_totale': signe * self.montant}
+    
+    def deltas_session(self):
+        return self.session_id, {self.CHAMPS_SESSION[self.type_transaction]: self.montant}
+    
+    def save(self, *args, **kwargs):
+        self._sauvegarder_avec_solde(*args, **kwargs)
     
     def __str__(self):
         signe = "+" if self.montant >= 0 else ""
@@ -130,7 +237,7 @@ class EpargneTransaction(models.Model):
 
 
 
-class Emprunt(models.Model):
+class Emprunt(MouvementSoldeMixin, models.Model):
     """
     Emprunts effectués par les membres
     """
@@ -159,6 +266,11 @@ class Emprunt(models.Model):
         max_digits=12, decimal_places=2, default=0,
         verbose_name="Montant déjà remboursé (FCFA)"
     )
+    # Cumul des parts capital des remboursements (répartition capital/intérêt)
+    montant_capital_rembourse = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        verbose_name="Capital déjà remboursé (FCFA)"
+    )
     session_emprunt = models.ForeignKey(Session, on_delete=models.CASCADE, related_name='emprunts')
     date_emprunt = models.DateTimeField(auto_now_add=True, verbose_name="Date d'emprunt")
     date_remboursement_max = models.DateField(
@@ -180,6 +292,7 @@ class Emprunt(models.Model):
         indexes = [
             models.Index(fields=['statut', 'date_remboursement_max']),
             models.Index(fields=['membre', 'statut']),
+            models.Index(fields=['date_emprunt']),
         ]
     
     def __str__(self):
@@ -233,6 +346,12 @@ class Emprunt(models.Model):
         diff = (self.date_remboursement_max - today).days
         return max(0, diff)
     
+    def deltas_solde(self):
+        return self.membre_id, {'emprunt_restant': self.montant_restant_a_rembourser}
+    
+    def deltas_session(self):
+        return self.session_emprunt_id, {'emprunts_decaisses': self.montant_emprunte}
+    
     def _calculer_date_remboursement_max_auto(self):
         """Calcule automatiquement la date max de remboursement (2 mois après emprunt)"""
         if self.date_emprunt:
@@ -249,58 +368,59 @@ class Emprunt(models.Model):
     
     def _determiner_statut_auto(self):
         """Détermine automatiquement le statut basé sur les remboursements et dates"""
-        print(f"🔍 Détermination statut pour emprunt {self.id}")
-        print(f"   - Montant remboursé: {self.montant_rembourse}")
-        print(f"   - Montant total: {self.montant_total_a_rembourser}")
-        print(f"   - Date max: {self.date_remboursement_max}")
-        print(f"   - Statut actuel: {self.statut}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Détermination statut pour emprunt %s", self.id)
+            logger.debug("   - Montant remboursé: %s", self.montant_rembourse)
+            logger.debug("   - Montant total: %s", self.montant_total_a_rembourser)
+            logger.debug("   - Date max: %s", self.date_remboursement_max)
+            logger.debug("   - Statut actuel: %s", self.statut)
         
         # Priorité 1: Vérifier si complètement remboursé
         if self.montant_rembourse >= self.montant_total_a_rembourser:
             nouveau_statut = 'REMBOURSE'
-            print(f"   ✅ Emprunt complètement remboursé -> {nouveau_statut}")
+            logger.debug("   ✅ Emprunt complètement remboursé -> %s", nouveau_statut)
             return nouveau_statut
         
         # Priorité 2: Vérifier si en retard
         if self.is_en_retard:
             nouveau_statut = 'EN_RETARD'
-            print(f"   ⚠️ Emprunt en retard de {self.jours_de_retard} jours -> {nouveau_statut}")
+            logger.info("   ⚠️ Emprunt en retard de %s jours -> %s", self.jours_de_retard, nouveau_statut)
             return nouveau_statut
         
         # Priorité 3: En cours par défaut
         nouveau_statut = 'EN_COURS'
-        print(f"   🔄 Emprunt en cours normal -> {nouveau_statut}")
+        logger.debug("   🔄 Emprunt en cours normal -> %s", nouveau_statut)
         return nouveau_statut
     
     def save(self, *args, **kwargs):
         """Sauvegarde avec calculs automatiques et vérifications de sécurité"""
-        print(f"🔍 SAVE EMPRUNT - Début pour {getattr(self, 'id', 'NOUVEAU')}")
+        logger.debug("🔍 SAVE EMPRUNT - Début pour %s", getattr(self, 'id', 'NOUVEAU'))
         
         try:
             # 🔧 ÉTAPE 1: Calcul automatique du montant total si manquant
             if not self.montant_total_a_rembourser:
                 ancien_montant = self.montant_total_a_rembourser
                 self.montant_total_a_rembourser = self._calculer_montant_total_auto()
-                print(f"   ✅ Montant total calculé: {ancien_montant} -> {self.montant_total_a_rembourser}")
+                logger.debug("   ✅ Montant total calculé: %s -> %s", ancien_montant, self.montant_total_a_rembourser)
             
             # 🔧 ÉTAPE 2: Sécurité - S'assurer que date_emprunt existe avant calculs
             if not self.date_emprunt:
                 self.date_emprunt = timezone.now()
-                print(f"   ✅ Date emprunt auto-assignée: {self.date_emprunt}")
+                logger.debug("   ✅ Date emprunt auto-assignée: %s", self.date_emprunt)
             
             # 🔧 ÉTAPE 3: Calcul automatique de la date max de remboursement si manquante
             if not self.date_remboursement_max:
                 ancienne_date = self.date_remboursement_max
                 self.date_remboursement_max = self._calculer_date_remboursement_max_auto()
-                print(f"   ✅ Date max remboursement calculée: {ancienne_date} -> {self.date_remboursement_max}")
+                logger.debug("   ✅ Date max remboursement calculée: %s -> %s", ancienne_date, self.date_remboursement_max)
             
             # 🔧 ÉTAPE 4: Vérification de sécurité des montants
             if self.montant_rembourse < 0:
-                print(f"   ⚠️ Correction montant remboursé négatif: {self.montant_rembourse} -> 0")
+                logger.warning("   ⚠️ Correction montant remboursé négatif: %s -> 0", self.montant_rembourse)
                 self.montant_rembourse = 0
             
             if self.montant_rembourse > self.montant_total_a_rembourser:
-                print(f"   ⚠️ Montant remboursé supérieur au total: {self.montant_rembourse} > {self.montant_total_a_rembourser}")
+                logger.warning("   ⚠️ Montant remboursé supérieur au total: %s > %s", self.montant_rembourse, self.montant_total_a_rembourser)
                 # On peut soit le plafonner, soit laisser (surpaiement)
                 # self.montant_rembourse = self.montant_total_a_rembourser
             
@@ -309,7 +429,7 @@ class Emprunt(models.Model):
             nouveau_statut = self._determiner_statut_auto()
             
             if ancien_statut != nouveau_statut:
-                print(f"   🔄 Changement de statut: {ancien_statut} -> {nouveau_statut}")
+                logger.debug("   🔄 Changement de statut: %s -> %s", ancien_statut, nouveau_statut)
                 self.statut = nouveau_statut
             
             # 🔧 ÉTAPE 6: Validation finale avant sauvegarde
@@ -320,57 +440,88 @@ class Emprunt(models.Model):
                 raise ValueError(f"Taux d'intérêt invalide: {self.taux_interet}")
             
             # 🔧 ÉTAPE 7: Sauvegarde effective
-            print(f"   💾 Sauvegarde en cours...")
-            super().save(*args, **kwargs)
+            logger.debug("   💾 Sauvegarde en cours...")
+            self._sauvegarder_avec_solde(*args, **kwargs)
             
-            print(f"   ✅ EMPRUNT SAUVÉ AVEC SUCCÈS:")
-            print(f"      - ID: {self.id}")
-            print(f"      - Membre: {self.membre.numero_membre if self.membre else 'N/A'}")
-            print(f"      - Montant emprunté: {self.montant_emprunte}")
-            print(f"      - Montant total: {self.montant_total_a_rembourser}")
-            print(f"      - Montant remboursé: {self.montant_rembourse}")
-            print(f"      - Date emprunt: {self.date_emprunt}")
-            print(f"      - Date max remboursement: {self.date_remboursement_max}")
-            print(f"      - Statut: {self.statut}")
-            print(f"      - En retard: {self.is_en_retard}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("   ✅ EMPRUNT SAUVÉ AVEC SUCCÈS:")
+                logger.debug("      - ID: %s", self.id)
+                logger.debug("      - Membre: %s", self.membre.numero_membre if self.membre else 'N/A')
+                logger.debug("      - Montant emprunté: %s", self.montant_emprunte)
+                logger.debug("      - Montant total: %s", self.montant_total_a_rembourser)
+                logger.debug("      - Montant remboursé: %s", self.montant_rembourse)
+                logger.debug("      - Date emprunt: %s", self.date_emprunt)
+                logger.debug("      - Date max remboursement: %s", self.date_remboursement_max)
+                logger.debug("      - Statut: %s", self.statut)
+                logger.debug("      - En retard: %s", self.is_en_retard)
             
-            try:
-                if self.membre.calculer_statut_en_regle() :
-                    print("SAUVEGARDE DE L'EMPRUNT ON VA VOIR SI IL EST EN REGLE ET IL L'EST ")
-                    self.membre.statut = 'EN_REGLE'
-                    self.membre.save()
-                else:
-                    print("SAUVEGARDE DE L'EMPRUNT ON VA VOIR SI IL EST EN REGLE ET NE L'EST PAS DU TOUT ! ")
-                    self.membre.statut = 'NON_EN_REGLE'
-                    self.membre.save()
-            except :
-                print(f"Erreur de calcul de sttus en regle  ")
-                pass
+            marquer_statut_a_recalculer(self.membre_id, retrograder=True)
         except Exception as e:
-            print(f"   ❌ ERREUR LORS DE LA SAUVEGARDE: {e}")
-            print(f"   ❌ Type d'erreur: {type(e)}")
-            import traceback
-            print(f"   ❌ Traceback: {traceback.format_exc()}")
+            logger.exception("   ❌ ERREUR LORS DE LA SAUVEGARDE: %s", e)
             raise
     
+    def cumuler_remboursement(self, montant, capital):
+        """
+        Ajoute un remboursement aux cumuls (montants négatifs pour le retirer).
+        L'emprunt doit avoir été lu par select_for_update dans la transaction
+        courante: les cumuls sont incrémentés par F() en base, le statut et
+        l'emprunt restant du membre sont recalculés sur les valeurs verrouillées
+        """
+        avant = self.deltas_solde()
+        self.montant_rembourse += montant
+        self.montant_capital_rembourse += capital
+        self.statut = self._determiner_statut_auto()
+        self.date_modification = timezone.now()
+        Emprunt.objects.filter(pk=self.pk).update(
+            montant_rembourse=F('montant_rembourse') + montant,
+            montant_capital_rembourse=F('montant_capital_rembourse') + capital,
+            statut=self.statut,
+            date_modification=self.date_modification,
+        )
+        repercuter_variation_solde(avant, self.deltas_solde())
+        marquer_statut_a_recalculer(self.membre_id, retrograder=True)
+    
     @classmethod
-    def verifier_retards_globaux(cls):
-        """Méthode utilitaire pour vérifier tous les emprunts en retard"""
-        print("🔍 VÉRIFICATION GLOBALE DES RETARDS")
-        
-        emprunts_actifs = cls.objects.filter(statut__in=['EN_COURS', 'EN_RETARD'])
+    def verifier_retards_globaux(cls, queryset=None, aujourd_hui=None):
+        """
+        Met à jour en masse le statut des emprunts actifs, avec les mêmes
+        règles que _determiner_statut_auto (remboursé > en retard > en cours):
+        un UPDATE par transition, filtré sur (statut, date_remboursement_max)
+        pour profiter de l'index. La condition est évaluée par l'UPDATE
+        lui-même: un remboursement commité entre-temps ne peut pas être
+        écrasé. Seuls les membres concernés voient leur statut recalculé.
+        Retourne le nombre d'emprunts modifiés
+        """
+        aujourd_hui = aujourd_hui or timezone.now().date()
+        emprunts = cls.objects.all() if queryset is None else queryset
+        non_solde = Q(montant_rembourse__lt=F('montant_total_a_rembourser'))
+        transitions = (
+            ('REMBOURSE', Q(statut__in=['EN_COURS', 'EN_RETARD']) & ~non_solde),
+            ('EN_RETARD', Q(statut='EN_COURS', date_remboursement_max__lt=aujourd_hui) & non_solde),
+            ('EN_COURS', Q(statut='EN_RETARD') & non_solde & (
+                Q(date_remboursement_max__gte=aujourd_hui) | Q(date_remboursement_max__isnull=True)
+            )),
+        )
+
         emprunts_modifies = 0
-        
-        for emprunt in emprunts_actifs:
-            ancien_statut = emprunt.statut
-            # Re-déclencher la logique de save sans modifier les données
-            emprunt.save()
-            
-            if ancien_statut != emprunt.statut:
-                emprunts_modifies += 1
-                print(f"   🔄 Emprunt {emprunt.id}: {ancien_statut} -> {emprunt.statut}")
-        
-        print(f"   ✅ Vérification terminée: {emprunts_modifies} emprunts mis à jour")
+        membre_ids = set()
+        with transaction.atomic():
+            for nouveau_statut, condition in transitions:
+                # Membres à recalculer lus sur le même filtre (un membre de trop
+                # n'a pour effet qu'un recalcul sans changement)
+                concernes = set(emprunts.filter(condition).order_by().values_list('membre_id', flat=True))
+                if not concernes:
+                    continue
+                nombre = emprunts.filter(condition).update(
+                    statut=nouveau_statut, date_modification=timezone.now()
+                )
+                emprunts_modifies += nombre
+                membre_ids.update(concernes)
+                logger.info("Vérification des retards: %s emprunt(s) -> %s", nombre, nouveau_statut)
+            marquer_statut_a_recalculer(*membre_ids, retrograder=True)
+
+        if emprunts_modifies:
+            creations_en_masse.send(sender=cls)
         return emprunts_modifies
     
     def clean(self):
@@ -396,7 +547,7 @@ class Emprunt(models.Model):
 
 
 
-class Remboursement(models.Model):
+class Remboursement(MouvementSoldeMixin, models.Model):
     """
     Remboursements par tranche des emprunts
     """
@@ -425,41 +576,63 @@ class Remboursement(models.Model):
         verbose_name = "Remboursement"
         verbose_name_plural = "Remboursements"
         ordering = ['-date_remboursement']
+        # Rapports par période
+        indexes = [
+            models.Index(fields=['date_remboursement']),
+        ]
     
     def __str__(self):
         return f"{self.emprunt.membre.numero_membre} - {self.montant:,.0f} FCFA ({self.date_remboursement.date()})"
     
+    def deltas_session(self):
+        return self.session_id, {'remboursements': self.montant, 'interets_rembourses': self.montant_interet}
+    
     def save(self, *args, **kwargs):
+        # Remboursement, mise à jour de l'emprunt et redistribution dans une même transaction
+        with transaction.atomic():
+            self._sauvegarder(*args, **kwargs)
+    
+    def _sauvegarder(self, *args, **kwargs):
+        # Verrou sur l'emprunt: deux remboursements simultanés se sérialisent
+        # et lisent chacun le capital déjà remboursé par l'autre
+        self.emprunt = Emprunt.objects.select_for_update().get(pk=self.emprunt_id)
+        ancien = self._version_en_base()
+        meme_emprunt = ancien is not None and ancien.emprunt_id == self.emprunt_id
+        
         # Calcul automatique de la répartition capital/intérêt
         if not self.montant_capital and not self.montant_interet:
-            self._calculer_repartition_capital_interet()
-        
-        super().save(*args, **kwargs)
+            self._calculer_repartition_capital_interet(
+                capital_exclu=ancien.montant_capital if meme_emprunt else Decimal('0')
+            )
         
+        self._sauvegarder_avec_solde(*args, ancien=ancien, **kwargs)
         
+        # Mise à jour incrémentale des cumuls de l'emprunt
+        if meme_emprunt:
+            self.emprunt.cumuler_remboursement(
+                self.montant - ancien.montant, self.montant_capital - ancien.montant_capital
+            )
+        else:
+            if ancien:
+                ancien.retirer_des_cumuls()
+            self.emprunt.cumuler_remboursement(self.montant, self.montant_capital)
         
-        # Mise à jour du montant remboursé de l'emprunt
-        self.emprunt.montant_rembourse = sum(
-            r.montant for r in self.emprunt.remboursements.all()
-        )
-        self.emprunt.save()
-        try:
-            if self.emprunt.membre.calculer_statut_en_regle() :
-                self.emprunt.membre.statut = 'EN_REGLE'
-                self.emprunt.membre.save()
-        except :
-            print(f"Erreur de calcul de sttus en regle  ")
-            pass
-        
-        # Redistribution des intérêts aux membres
+        # Redistribution des intérêts aux membres (tâche différée, après commit)
         if self.montant_interet > 0:
-            self._redistribuer_interets()
+            planifier(
+                'redistribuer_interets', cle=f"interets:{self.id}",
+                remboursement_id=str(self.id)
+            )
     
-    def _calculer_repartition_capital_interet(self):
-        """Calcule la répartition entre capital et intérêt du remboursement"""
+    def _calculer_repartition_capital_interet(self, capital_exclu=Decimal('0')):
+        """
+        Calcule la répartition entre capital et intérêt du remboursement, à
+        partir du capital déjà remboursé cumulé sur l'emprunt (verrouillé).
+        capital_exclu: part capital de la version précédente de ce remboursement
+        """
         emprunt = self.emprunt
-        capital_restant = emprunt.montant_emprunte - sum(
-            r.montant_capital for r in emprunt.remboursements.exclude(id=self.id)
+        capital_restant = max(
+            Decimal('0'), emprunt.montant_emprunte - (emprunt.montant_capital_rembourse - capital_exclu)
         )
         
         if self.montant <= capital_restant:
@@ -469,43 +642,54 @@ class Remboursement(models.Model):
             self.montant_capital = capital_restant
             self.montant_interet = self.montant - capital_restant
     
+    def retirer_des_cumuls(self):
+        """Retire ce remboursement (supprimé ou déplacé) des cumuls de son emprunt"""
+        emprunt = Emprunt.objects.select_for_update().filter(pk=self.emprunt_id).first()
+        if emprunt:
+            emprunt.cumuler_remboursement(-self.montant, -self.montant_capital)
+    
     def _redistribuer_interets(self):
-        """Redistribue les intérêts proportionnellement aux épargnes"""
+        """
+        Redistribue les intérêts proportionnellement aux épargnes.
+        Les parts sont calculées en une passe (plus forts restes, total exact)
+        et écrites avec un seul bulk_create
+        """
+        from core.utils import calculer_epargnes_membres
+        from .calculators import repartir_plus_forts_restes
+        
         if self.montant_interet <= 0:
             return
         
-        # Calculer le total des épargnes de tous les membres
-        total_epargnes = Decimal('0')
-        membres_epargnes = {}
-        
-        for membre in Membre.objects.filter(statut='EN_REGLE'):
-            epargne_membre = membre.calculer_epargne_totale()
-            if epargne_membre > 0:
-                membres_epargnes[membre] = epargne_membre
-                total_epargnes += epargne_membre
-        
-        if total_epargnes == 0:
+        # Épargnes des membres en règle (une seule requête)
+        epargnes = calculer_epargnes_membres(Membre.objects.filter(statut='EN_REGLE'))
+        parts = repartir_plus_forts_restes(self.montant_interet, epargnes)
+        parts = {membre_id: part for membre_id, part in parts.items() if part > 0}
+        if not parts:
             return
         
-        # Redistribuer proportionnellement
-        for membre, epargne_membre in membres_epargnes.items():
-            pourcentage = epargne_membre / total_epargnes
-            interet_membre = (self.montant_interet * pourcentage).quantize(
-                Decimal('0.01'), rounding=ROUND_HALF_UP
-            )
-            
-            # Créer la transaction d'épargne pour l'intérêt
-            EpargneTransaction.objects.create(
-                membre=membre,
+        notes = f"Intérêt redistributed from emprunt {self.emprunt_id}"
+        EpargneTransaction.objects.bulk_create([
+            EpargneTransaction(
+                membre_id=membre_id,
                 type_transaction='AJOUT_INTERET',
-                montant=interet_membre,
+                montant=part,
                 session=self.session,
-                notes=f"Intérêt redistributed from emprunt {self.emprunt.id}"
+                notes=notes
             )
-            
-            print(f"Intérêt redistributed: {membre.numero_membre} - {interet_membre} FCFA")
+            for membre_id, part in parts.items()
+        ], batch_size=500)
+        
+        # bulk_create ne passe pas par save(): mise à jour groupée des soldes
+        SoldeMembre.appliquer_deltas_en_masse({
+            membre_id: {'interets_recus': part, 'epargne_totale': part}
+            for membre_id, part in parts.items()
+        })
+        TotauxSession.appliquer_deltas(self.session_id, {'interets_redistribues': sum(parts.values())})
+        creations_en_masse.send(sender=EpargneTransaction)
+        
+        logger.debug("Intérêts redistribués: %s FCFA entre %s membres", self.montant_interet, len(parts))
 
-class AssistanceAccordee(models.Model):
+class AssistanceAccordee(MouvementSoldeMixin, models.Model):
     """
     Assistances accordées aux membres
     """
@@ -534,10 +718,17 @@ class AssistanceAccordee(models.Model):
         verbose_name = "Assistance accordée"
         verbose_name_plural = "Assistances accordées"
         ordering = ['-date_demande']
+        # Rapports par période
+        indexes = [
+            models.Index(fields=['statut', 'date_paiement']),
+        ]
     
     def __str__(self):
         return f"{self.membre.numero_membre} - {self.type_assistance.nom} - {self.montant:,.0f} FCFA"
     
+    def deltas_session(self):
+        return self.session_id, {'assistances_payees': self.montant if self.statut == 'PAYEE' else 0}
+    
     def save(self, *args, **kwargs):
         old_statut = None
         is_new = self.pk is None
@@ -556,7 +747,7 @@ class AssistanceAccordee(models.Model):
             self.montant = self.type_assistance.montant
         
         # Sauvegarder
-        super().save(*args, **kwargs)
+        self._sauvegarder_avec_solde(*args, **kwargs)
         
         # Traiter le paiement si nécessaire
         should_process = (
@@ -566,7 +757,11 @@ class AssistanceAccordee(models.Model):
         )
         
         if should_process:
-            self._traiter_paiement_assistance()
+            # Prélèvement et renflouements en tâche différée, après commit
+            planifier(
+                'payer_assistance', cle=f"assistance:{self.id}",
+                assistance_id=str(self.id)
+            )
             self._assistance_payee_traitee = True
         
     def _traiter_paiement_assistance(self):
@@ -581,7 +776,7 @@ class AssistanceAccordee(models.Model):
         # 1. PRÉLEVER DU FONDS SOCIAL
         fonds = FondsSocial.get_fonds_actuel()
         if not fonds:
-            print("ERREUR: Aucun fonds social actuel trouvé")
+            logger.error("ERREUR: Aucun fonds social actuel trouvé")
             return
         
         # Vérifier si le fonds a assez d'argent
@@ -589,7 +784,7 @@ class AssistanceAccordee(models.Model):
             self.montant,
             f"Assistance {self.type_assistance.nom} pour {self.membre.numero_membre}"
         ):
-            print(f"ERREUR: Fonds social insuffisant pour l'assistance de {self.montant:,.0f} FCFA")
+            logger.error("ERREUR: Fonds social insuffisant pour l'assistance de %s FCFA", self.montant)
             return
         
         # Mettre à jour la date de paiement
@@ -600,7 +795,7 @@ class AssistanceAccordee(models.Model):
         # 2. CRÉER LES RENFLOUEMENTS
         self._creer_renflouement()
         
-        print(f"Assistance payée: {self.montant:,.0f} FCFA prélevés du fonds social")
+        logger.debug("Assistance payée: %s FCFA prélevés du fonds social", self.montant)
     
     def _creer_renflouement(self):
         """Crée les renflouements pour tous les membres en règle"""
@@ -612,35 +807,24 @@ class AssistanceAccordee(models.Model):
         
         nombre_membres = membres_en_regle.count()
         if nombre_membres == 0:
-            print("ATTENTION: Aucun membre en règle pour le renflouement")
+            logger.warning("ATTENTION: Aucun membre en règle pour le renflouement")
             return
         
         montant_par_membre = (self.montant / nombre_membres).quantize(
             Decimal('0.01'), rounding=ROUND_HALF_UP
         )
         
-        renflouements_crees = 0
-        for membre in membres_en_regle:
-            Renflouement.objects.create(
-                membre=membre,
-                session=self.session,
-                montant_du=montant_par_membre,
-                cause=f"Assistance {self.type_assistance.nom} pour {self.membre.numero_membre}",
-                type_cause='ASSISTANCE'
-            )
-            
-            renflouements_crees += 1
-            try:
-                membre.statut='NON_EN_REGLE'
-                membre.save()
-            except Exception as e:
-                print(f"Echec de la MAJ du statut du membre : {e}")
-                
-                pass
+        renflouements_crees = Renflouement.creer_en_masse(
+            membres_en_regle,
+            session=self.session,
+            montant_du=montant_par_membre,
+            cause=f"Assistance {self.type_assistance.nom} pour {self.membre.numero_membre}",
+            type_cause='ASSISTANCE'
+        )
         
-        print(f"Renflouement créé: {renflouements_crees} membres - {montant_par_membre:,.0f} FCFA chacun")
+        logger.debug("Renflouement créé: %s membres - %s FCFA chacun", renflouements_crees, montant_par_membre)
 
-class Renflouement(models.Model):
+class Renflouement(MouvementSoldeMixin, models.Model):
     """
     Renflouements dus par les membres suite aux sorties d'argent
     """
@@ -672,10 +856,87 @@ class Renflouement(models.Model):
         verbose_name = "Renflouement"
         verbose_name_plural = "Renflouements"
         ordering = ['-date_creation']
+        indexes = [
+            # Renflouements non soldés d'un membre (alertes, statut en règle):
+            # l'index ne contient que les lignes encore dues
+            models.Index(
+                fields=['membre'], condition=models.Q(montant_paye__lt=models.F('montant_du')),
+                name='renflouement_non_solde_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.membre.numero_membre} - {self.montant_du:,.0f} FCFA ({self.type_cause})"
     
+    def deltas_solde(self):
+        return self.membre_id, {
+            'renflouement_du': self.montant_du,
+            'renflouement_paye': self.montant_paye,
+        }
+    
+    def deltas_session(self):
+        return self.session_id, {'renflouements_generes': self.montant_du}
+    
+    def save(self, *args, **kwargs):
+        self._sauvegarder_avec_solde(*args, **kwargs)
+    
+    def cumuler_paiement(self, montant):
+        """
+        Ajoute un paiement au montant payé (négatif pour le retirer). Le
+        renflouement doit avoir été lu par select_for_update dans la
+        transaction courante; le montant payé est incrémenté par F() en base
+        """
+        avant = self.deltas_solde()
+        self.montant_paye += montant
+        self.date_derniere_modification = timezone.now()
+        Renflouement.objects.filter(pk=self.pk).update(
+            montant_paye=F('montant_paye') + montant,
+            date_derniere_modification=self.date_derniere_modification,
+        )
+        repercuter_variation_solde(avant, self.deltas_solde())
+        marquer_statut_a_recalculer(self.membre_id)
+    
+    @classmethod
+    def creer_en_masse(cls, membres, session, montant_du, cause, type_cause, ignorer_existants=False):
+        """
+        Crée un renflouement par membre du queryset avec un seul bulk_create,
+        met à jour les soldes et passe les membres concernés NON_EN_REGLE
+        par un UPDATE ensembliste. Avec ignorer_existants, les membres ayant
+        déjà un renflouement de ce type pour la session sont ignorés.
+        Retourne le nombre de renflouements créés
+        """
+        membre_ids = set(membres.values_list('id', flat=True))
+        if ignorer_existants:
+            membre_ids -= set(cls.objects.filter(
+                session=session, type_cause=type_cause, membre_id__in=membre_ids
+            ).values_list('membre_id', flat=True))
+        if not membre_ids:
+            return 0
+        
+        with transaction.atomic():
+            cls.objects.bulk_create([
+                cls(
+                    membre_id=membre_id,
+                    session=session,
+                    montant_du=montant_du,
+                    cause=cause,
+                    type_cause=type_cause
+                )
+                for membre_id in membre_ids
+            ], batch_size=500)
+            
+            # bulk_create ne passe pas par save(): mise à jour groupée des soldes
+            SoldeMembre.appliquer_deltas_en_masse({
+                membre_id: {'renflouement_du': montant_du} for membre_id in membre_ids
+            })
+            TotauxSession.appliquer_deltas(session.id, {'renflouements_generes': montant_du * len(membre_ids)})
+            Membre.objects.filter(id__in=membre_ids).update(
+                statut='NON_EN_REGLE', date_modification=timezone.now()
+            )
+        statuts_membres_modifies.send(sender=Membre, membre_ids=membre_ids)
+        
+        return len(membre_ids)
+    
     @property
     def montant_restant(self):
         """Calcule le montant restant à payer"""
@@ -693,7 +954,7 @@ class Renflouement(models.Model):
             return 100
         return (self.montant_paye / self.montant_du) * 100
 
-class PaiementRenflouement(models.Model):
+class PaiementRenflouement(MouvementSoldeMixin, models.Model):
     """
     Paiements de renflouement par tranche
     """
@@ -712,27 +973,37 @@ class PaiementRenflouement(models.Model):
         verbose_name = "Paiement de renflouement"
         verbose_name_plural = "Paiements de renflouement"
         ordering = ['-date_paiement']
+        # Rapports par période
+        indexes = [
+            models.Index(fields=['date_paiement']),
+        ]
     
     def __str__(self):
         return f"{self.renflouement.membre.numero_membre} - {self.montant:,.0f} FCFA ({self.date_paiement.date()})"
     
+    def deltas_session(self):
+        return self.session_id, {'renflouements_payes': self.montant}
+    
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        # Mise à jour du montant payé du renflouement
-        self.renflouement.montant_paye = sum(
-            p.montant for p in self.renflouement.paiements.all()
-        )
-        self.renflouement.save()
-        try:
-            if self.renflouement.membre.calculer_statut_en_regle() :
-                self.renflouement.membre.statut = 'EN_REGLE'
-                self.renflouement.membre.save()
-        except :
-            print(f"Erreur de calcul de sttus en regle  ")
-            pass
+        with transaction.atomic():
+            self._sauvegarder(*args, **kwargs)
+    
+    def _sauvegarder(self, *args, **kwargs):
+        is_new = self._state.adding
+        ancien = self._version_en_base()
+        # Verrou sur le renflouement: les paiements simultanés se sérialisent
+        self.renflouement = Renflouement.objects.select_for_update(of=('self',)).select_related(
+            'membre'
+        ).get(pk=self.renflouement_id)
+        self._sauvegarder_avec_solde(*args, ancien=ancien, **kwargs)
         
+        # Mise à jour incrémentale du montant payé
+        if ancien and ancien.renflouement_id == self.renflouement_id:
+            self.renflouement.cumuler_paiement(self.montant - ancien.montant)
+        else:
+            if ancien:
+                ancien.retirer_des_cumuls()
+            self.renflouement.cumuler_paiement(self.montant)
         
         # CRUCIAL: Alimenter le fonds social avec le paiement de renflouement
         if is_new:
@@ -742,4 +1013,29 @@ class PaiementRenflouement(models.Model):
                 fonds.ajouter_montant(
                     self.montant,
                     f"Renflouement {self.renflouement.membre.numero_membre} - {self.renflouement.cause}"
-                )
\ No newline at end of file
+                )
+
+
+    def retirer_des_cumuls(self):
+        """Retire ce paiement (supprimé ou déplacé) du montant payé de son renflouement"""
+        renflouement = Renflouement.objects.select_for_update().filter(pk=self.renflouement_id).first()
+        if renflouement:
+            renflouement.cumuler_paiement(-self.montant)
+
+
+@tache('redistribuer_interets')
+def redistribuer_interets(remboursement_id):
+    # Remboursement supprimé avant le passage du worker: rien à redistribuer
+    remboursement = Remboursement.objects.select_related('session').filter(pk=remboursement_id).first()
+    if remboursement:
+        remboursement._redistribuer_interets()
+
+
+@tache('payer_assistance')
+def payer_assistance(assistance_id):
+    assistance = AssistanceAccordee.objects.select_related(
+        'membre', 'type_assistance', 'session'
+    ).filter(pk=assistance_id).first()
+    if assistance:
+        assistance._traiter_paiement_assistance()
+
@@ -0,0 +1,214 @@
+"""
+Saisie groupée des paiements d'une journée de session.
+
+Le trésorier envoie en une fois la feuille de la séance: inscriptions,
+solidarités, épargnes et renflouements de nombreux membres. Toutes les
+lignes sont validées avant écriture (tout ou rien), puis écrites par
+bulk_create avec mise à jour groupée des soldes, du fonds social et des
+renflouements; les statuts des membres concernés sont recalculés une fois.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from core.models import FondsSocial, Membre, SoldeMembre, TotauxSession
+from core.signals import creations_en_masse
+from core.utils import marquer_statut_a_recalculer
+from .models import (
+    PaiementInscription, PaiementSolidarite, EpargneTransaction,
+    Renflouement, PaiementRenflouement
+)
+
+
+TYPES_LIGNE = [
+    ('INSCRIPTION', 'Paiement inscription'),
+    ('SOLIDARITE', 'Paiement solidarité'),
+    ('EPARGNE', 'Dépôt épargne'),
+    ('RENFLOUEMENT', 'Paiement renflouement'),
+]
+
+
+def _incrementer_en_masse(modele, champ, increments, **valeurs):
+    """
+    UPDATE unique: champ = champ + increment pour {pk: increment},
+    avec d'éventuelles valeurs communes (ex: date de modification)
+    """
+    if not increments:
+        return
+    modele.objects.filter(pk__in=list(increments)).update(**{
+        champ: Case(
+            *[When(pk=pk, then=F(champ) + Value(montant)) for pk, montant in increments.items()],
+            default=F(champ),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        )
+    }, **valeurs)
+
+
+def valider_saisie(lignes):
+    """
+    Contrôle métier de toutes les lignes (existence des membres et des
+    renflouements, reste dû). À appeler dans une transaction: les
+    renflouements sont verrouillés (select_for_update) jusqu'à l'écriture,
+    le reste dû contrôlé ne peut donc plus changer entre-temps.
+    Retourne (erreurs, membres, renflouements) où erreurs est une liste
+    [{'index', 'erreurs'}] vide si tout est valide
+    """
+    membre_ids = {ligne['membre_id'] for ligne in lignes if ligne.get('membre_id')}
+    renflouement_ids = {ligne['renflouement_id'] for ligne in lignes if ligne.get('renflouement_id')}
+    membres = Membre.objects.in_bulk(membre_ids)
+    renflouements = Renflouement.objects.select_for_update(of=('self',)).select_related(
+        'membre'
+    ).in_bulk(renflouement_ids)
+
+    erreurs = []
+    cumul_renflouements = defaultdict(Decimal)
+    for index, ligne in enumerate(lignes):
+        erreurs_ligne = []
+        if ligne['type'] == 'RENFLOUEMENT':
+            renflouement = renflouements.get(ligne['renflouement_id'])
+            if renflouement is None:
+                erreurs_ligne.append("Renflouement introuvable")
+            else:
+                if ligne.get('membre_id') and ligne['membre_id'] != renflouement.membre_id:
+                    erreurs_ligne.append("Ce renflouement n'appartient pas à ce membre")
+                cumul_renflouements[renflouement.id] += ligne['montant']
+                if cumul_renflouements[renflouement.id] > renflouement.montant_restant:
+                    erreurs_ligne.append(
+                        f"Montant supérieur au reste dû ({renflouement.montant_restant:,.0f} FCFA)"
+                    )
+        elif ligne['membre_id'] not in membres:
+            erreurs_ligne.append("Membre introuvable")
+        if erreurs_ligne:
+            erreurs.append({'index': index, 'erreurs': erreurs_ligne})
+    return erreurs, membres, renflouements
+
+
+def enregistrer_saisie_session(session, lignes):
+    """
+    Valide puis enregistre les lignes de paiement d'une session, dans une
+    même transaction (validation sur les renflouements verrouillés: deux
+    saisies ou un paiement concurrent ne peuvent pas dépasser le reste dû).
+    lignes: [{'type', 'membre_id', 'renflouement_id', 'montant', 'notes'}]
+    Retourne (resultats, erreurs): si erreurs n'est pas vide, rien n'est écrit
+    """
+    with transaction.atomic():
+        return _enregistrer_saisie(session, lignes)
+
+
+def _enregistrer_saisie(session, lignes):
+    erreurs, membres, renflouements = valider_saisie(lignes)
+    if erreurs:
+        return [], erreurs
+
+    inscriptions, epargnes, paiements_renflouement = [], [], []
+    objets_par_ligne = {}
+    deltas_soldes = defaultdict(lambda: defaultdict(Decimal))
+    increments_renflouements = defaultdict(Decimal)
+    solidarites_par_membre = defaultdict(Decimal)
+    totaux_session = defaultdict(Decimal)
+    mouvements_fonds = []
+
+    for index, ligne in enumerate(lignes):
+        montant = ligne['montant']
+        notes = ligne.get('notes', '')
+        type_ligne = ligne['type']
+
+        if type_ligne == 'RENFLOUEMENT':
+            renflouement = renflouements[ligne['renflouement_id']]
+            membre = renflouement.membre
+            objet = PaiementRenflouement(
+                renflouement=renflouement, montant=montant, session=session, notes=notes
+            )
+            paiements_renflouement.append(objet)
+            increments_renflouements[renflouement.id] += montant
+            deltas_soldes[membre.id]['renflouement_paye'] += montant
+            totaux_session['renflouements_payes'] += montant
+            mouvements_fonds.append((montant, f"Renflouement {membre.numero_membre} - {renflouement.cause}"))
+        else:
+            membre = membres[ligne['membre_id']]
+            if type_ligne == 'INSCRIPTION':
+                objet = PaiementInscription(membre=membre, montant=montant, session=session, notes=notes)
+                inscriptions.append(objet)
+                deltas_soldes[membre.id]['inscription_payee'] += montant
+                totaux_session['inscriptions'] += montant
+                mouvements_fonds.append((montant, f"Inscription {membre.numero_membre} - Session {session.nom}"))
+            elif type_ligne == 'EPARGNE':
+                objet = EpargneTransaction(
+                    membre=membre, type_transaction='DEPOT', montant=montant,
+                    session=session, notes=notes
+                )
+                epargnes.append(objet)
+                deltas_soldes[membre.id]['epargne_depots'] += montant
+                deltas_soldes[membre.id]['epargne_totale'] += montant
+                totaux_session['epargnes_deposees'] += montant
+            else:
+                # Un seul paiement de solidarité par membre et par session:
+                # les lignes d'un même membre sont cumulées (voir plus bas)
+                objet = None
+                solidarites_par_membre[membre.id] += montant
+                deltas_soldes[membre.id]['solidarite_payee'] += montant
+                totaux_session['solidarites'] += montant
+                mouvements_fonds.append((montant, f"Solidarité {membre.numero_membre} - Session {session.nom}"))
+        objets_par_ligne[index] = (objet, membre)
+
+    with transaction.atomic():
+        # Solidarités: complète le paiement existant de la session, sinon le crée
+        existantes = {
+            paiement.membre_id: paiement
+            for paiement in PaiementSolidarite.objects.filter(
+                session=session, membre_id__in=list(solidarites_par_membre)
+            )
+        }
+        _incrementer_en_masse(PaiementSolidarite, 'montant', {
+            existantes[membre_id].pk: montant
+            for membre_id, montant in solidarites_par_membre.items() if membre_id in existantes
+        })
+        nouvelles = [
+            PaiementSolidarite(membre_id=membre_id, session=session, montant=montant)
+            for membre_id, montant in solidarites_par_membre.items() if membre_id not in existantes
+        ]
+        solidarites = {**existantes, **{paiement.membre_id: paiement for paiement in nouvelles}}
+
+        PaiementInscription.objects.bulk_create(inscriptions)
+        PaiementSolidarite.objects.bulk_create(nouvelles)
+        EpargneTransaction.objects.bulk_create(epargnes)
+        PaiementRenflouement.objects.bulk_create(paiements_renflouement)
+        _incrementer_en_masse(
+            Renflouement, 'montant_paye', increments_renflouements,
+            date_derniere_modification=timezone.now()
+        )
+
+        # bulk_create ne passe pas par save(): soldes, totaux et fonds social en lot
+        SoldeMembre.appliquer_deltas_en_masse(deltas_soldes)
+        TotauxSession.appliquer_deltas(session.id, totaux_session)
+        fonds = FondsSocial.get_fonds_actuel()
+        if fonds:
+            fonds.ajouter_montants(mouvements_fonds)
+        marquer_statut_a_recalculer(*deltas_soldes)
+
+    for modele, objets in (
+        (PaiementInscription, inscriptions), (PaiementSolidarite, solidarites),
+        (EpargneTransaction, epargnes), (PaiementRenflouement, paiements_renflouement),
+    ):
+        if objets:
+            creations_en_masse.send(sender=modele)
+    if increments_renflouements:
+        creations_en_masse.send(sender=Renflouement)
+
+    resultats = []
+    for index, ligne in enumerate(lignes):
+        objet, membre = objets_par_ligne[index]
+        if objet is None:
+            objet = solidarites[membre.id]
+        resultats.append({
+            'index': index,
+            'type': ligne['type'],
+            'id': str(objet.pk),
+            'membre_id': str(membre.id),
+            'numero_membre': membre.numero_membre,
+            'montant': ligne['montant'],
+        })
+    return resultats, []
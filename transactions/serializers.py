@@ -7,14 +7,33 @@ from .models import (
     PaiementRenflouement
 )
 
+from core.cloture import MESSAGE_EXERCICE_TERMINE, exercice_termine
 from core.serializers import MembreSimpleSerializer, SessionSerializer, TypeAssistanceSerializer
 import logging
 from rest_framework.response import Response
 from rest_framework import status
 
-logger = logging.getLogger(__name__)
+logger = logging.getLogger(f'mutuelle.{__name__}')
 
-class PaiementInscriptionSerializer(serializers.ModelSerializer):
+
+class ExerciceOuvertMixin:
+    """
+    Refuse la création ou la modification d'une transaction dont la session
+    (nouvelle ou actuelle) appartient à un exercice terminé
+    """
+    champ_session = 'session'
+
+    def validate(self, data):
+        data = super().validate(data)
+        sessions = [data.get(self.champ_session)]
+        if self.instance is not None:
+            sessions.append(getattr(self.instance, self.champ_session))
+        if any(exercice_termine(session) for session in sessions):
+            raise serializers.ValidationError({self.champ_session: MESSAGE_EXERCICE_TERMINE})
+        return data
+
+
+class PaiementInscriptionSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les paiements d'inscription
     """
@@ -28,7 +47,7 @@ class PaiementInscriptionSerializer(serializers.ModelSerializer):
             'session', 'session_nom', 'notes'
         ]
 
-class PaiementSolidariteSerializer(serializers.ModelSerializer):
+class PaiementSolidariteSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les paiements de solidarité
     """
@@ -42,7 +61,7 @@ class PaiementSolidariteSerializer(serializers.ModelSerializer):
             'montant', 'date_paiement', 'notes'
         ]
 
-class EpargneTransactionSerializer(serializers.ModelSerializer):
+class EpargneTransactionSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les transactions d'épargne
     """
@@ -57,10 +76,11 @@ class EpargneTransactionSerializer(serializers.ModelSerializer):
             'montant', 'session', 'session_nom', 'date_transaction', 'notes'
         ]
 
-class EmpruntSerializer(serializers.ModelSerializer):
+class EmpruntSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les emprunts AVEC TOUS LES CALCULS et validations
     """
+    champ_session = 'session_emprunt'
     membre_info = MembreSimpleSerializer(source='membre', read_only=True)
     session_nom = serializers.CharField(source='session_emprunt.nom', read_only=True)
     statut_display = serializers.CharField(source='get_statut_display', read_only=True)
@@ -98,7 +118,7 @@ class EmpruntSerializer(serializers.ModelSerializer):
     
     def validate_montant_emprunte(self, value):
         """Validation du montant d'emprunt"""
-        print(f"🔍 VALIDATION MONTANT: {value}")
+        logger.debug("🔍 VALIDATION MONTANT: %s", value)
         
         if value <= 0:
             raise serializers.ValidationError("Le montant doit être positif")
@@ -107,12 +127,12 @@ class EmpruntSerializer(serializers.ModelSerializer):
         if value > Decimal('10000000'):  # 10 millions
             raise serializers.ValidationError("Montant trop élevé")
         
-        print(f"✅ Montant validé: {value}")
+        logger.debug("✅ Montant validé: %s", value)
         return value
     
     def validate_membre(self, value):
         """Validation du membre"""
-        print(f"🔍 VALIDATION MEMBRE: {value}")
+        logger.debug("🔍 VALIDATION MEMBRE: %s", value)
         
         if not value:
             raise serializers.ValidationError("Membre requis")
@@ -121,17 +141,17 @@ class EmpruntSerializer(serializers.ModelSerializer):
         if value.statut != 'EN_REGLE':
             raise serializers.ValidationError(f"Le membre {value.numero_membre} n'est pas en règle")
         
-        print(f"✅ Membre validé: {value.numero_membre}")
+        logger.debug("✅ Membre validé: %s", value.numero_membre)
         return value
     
     def validate(self, data):
         """Validation croisée"""
-        print(f"🔍 VALIDATION CROISÉE: {data}")
+        logger.debug("🔍 VALIDATION CROISÉE: %s", data)
         
         membre = data.get('membre')
         montant = data.get('montant_emprunte')
         
-        return data
+        return super().validate(data)
     
     def get_remboursements_details(self, obj):
         """Détails des remboursements avec gestion d'erreurs"""
@@ -139,12 +159,12 @@ class EmpruntSerializer(serializers.ModelSerializer):
             remboursements = obj.remboursements.all()
             return RemboursementSerializer(remboursements, many=True).data
         except Exception as e:
-            print(f"❌ Erreur remboursements_details: {e}")
+            logger.error("❌ Erreur remboursements_details: %s", e)
             return []
 
 
 
-class RemboursementSerializer(serializers.ModelSerializer):
+class RemboursementSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les remboursements
     """
@@ -167,7 +187,7 @@ class RemboursementSerializer(serializers.ModelSerializer):
             'montant_total_a_rembourser': obj.emprunt.montant_total_a_rembourser
         }
 
-class AssistanceAccordeeSerializer(serializers.ModelSerializer):
+class AssistanceAccordeeSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les assistances accordées
     """
@@ -184,7 +204,7 @@ class AssistanceAccordeeSerializer(serializers.ModelSerializer):
             'statut', 'statut_display', 'justification', 'notes'
         ]
 
-class RenflouementSerializer(serializers.ModelSerializer):
+class RenflouementSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les renflouements AVEC TOUS LES CALCULS
     """
@@ -213,7 +233,7 @@ class RenflouementSerializer(serializers.ModelSerializer):
         paiements = obj.paiements.all()
         return PaiementRenflouementSerializer(paiements, many=True).data
 
-class PaiementRenflouementSerializer(serializers.ModelSerializer):
+class PaiementRenflouementSerializer(ExerciceOuvertMixin, serializers.ModelSerializer):
     """
     Serializer pour les paiements de renflouement
     """
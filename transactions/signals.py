@@ -0,0 +1,43 @@
+# Signaux Django pour les transactions
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from core.models import TotauxSession
+from .models import (
+    PaiementInscription, PaiementSolidarite, EpargneTransaction,
+    Emprunt, Remboursement, AssistanceAccordee, Renflouement,
+    PaiementRenflouement, repercuter_variation_solde
+)
+
+
+@receiver(post_delete, sender=PaiementInscription)
+@receiver(post_delete, sender=PaiementSolidarite)
+@receiver(post_delete, sender=EpargneTransaction)
+@receiver(post_delete, sender=Emprunt)
+@receiver(post_delete, sender=Remboursement)
+@receiver(post_delete, sender=AssistanceAccordee)
+@receiver(post_delete, sender=Renflouement)
+@receiver(post_delete, sender=PaiementRenflouement)
+def annuler_mouvement_solde(sender, instance, **kwargs):
+    """
+    Retire du SoldeMembre et des TotauxSession la contribution d'un
+    mouvement supprimé. Les lignes ne sont jamais recréées ici: lors de la
+    suppression d'un membre ou d'une session, elles peuvent déjà avoir été
+    supprimées en cascade.
+    """
+    repercuter_variation_solde(instance.deltas_solde(), None, creer=False)
+    repercuter_variation_solde(instance.deltas_session(), None, creer=False, modele=TotauxSession)
+
+
+@receiver(post_delete, sender=Remboursement)
+@receiver(post_delete, sender=PaiementRenflouement)
+def retirer_des_cumuls(sender, instance, origin=None, **kwargs):
+    """
+    Retire un remboursement / paiement de renflouement supprimé des cumuls de
+    son emprunt / renflouement. Seulement pour une suppression directe: dans
+    une cascade (suppression de l'emprunt, du renflouement, du membre), le
+    parent est supprimé avec lui
+    """
+    if isinstance(origin, sender) or getattr(origin, 'model', None) is sender:
+        instance.retirer_des_cumuls()
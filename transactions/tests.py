@@ -1,3 +1,485 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.benchmark import generer_mutuelle, creer_administrateur_benchmark
+from decimal import Decimal
+
+from core.models import Membre, Session, SoldeMembre, TotauxSession, TypeAssistance
+from core.testing import BudgetRequetesMixin, PlanRequetesMixin
+from core.utils import recalculer_soldes_membres, recalculer_totaux_sessions
+from transactions.calculators import repartir_plus_forts_restes
+from transactions.models import (
+    Emprunt, Renflouement, AssistanceAccordee, PaiementSolidarite, PaiementInscription,
+    EpargneTransaction, Remboursement, PaiementRenflouement
+)
+
+
+class BudgetRequetesTransactionsTests(BudgetRequetesMixin, TestCase):
+    """
+    Nombre maximal de requêtes par endpoint, quel que soit le nombre
+    d'objets renvoyés (voir core.testing)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(15, nombre_sessions=6, nombre_exercices=2, nombre_assistances=4, graine=4)
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_budgets_listes(self):
+        self.verifier_budgets({
+            '/api/transactions/paiements-inscription/': 4,
+            '/api/transactions/paiements-solidarite/': 4,
+            '/api/transactions/epargne-transactions/': 4,
+            '/api/transactions/emprunts/': 5,
+            '/api/transactions/remboursements/': 4,
+            '/api/transactions/assistances/': 5,
+            '/api/transactions/renflouements/': 5,
+            '/api/transactions/paiements-renflouement/': 4,
+        })
+
+    def test_budgets_details(self):
+        emprunt = Emprunt.objects.filter(remboursements__isnull=False).first()
+        renflouement = Renflouement.objects.filter(paiements__isnull=False).first()
+        self.verifier_budgets({
+            f'/api/transactions/emprunts/{emprunt.id}/': 4,
+            f'/api/transactions/renflouements/{renflouement.id}/': 4,
+            f'/api/transactions/assistances/{AssistanceAccordee.objects.first().id}/': 4,
+        })
+
+
+class PaginationTransactionsTests(BudgetRequetesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=4, graine=6)
+        # Dates identiques pour une partie des lignes: le départage par UUID doit suffire
+        premiers = list(PaiementSolidarite.objects.values_list('id', flat=True)[:12])
+        PaiementSolidarite.objects.filter(id__in=premiers).update(
+            date_paiement=PaiementSolidarite.objects.latest('date_paiement').date_paiement
+        )
+
+    def _parcourir(self, url):
+        ids = []
+        while url:
+            with self.assertBudgetRequetes(1, libelle=url) as requetes:
+                reponse = self.client.get(url)
+            self.assertEqual(reponse.status_code, 200)
+            self.assertFalse(any('COUNT(' in requete['sql'] for requete in requetes.captured_queries))
+            ids.extend(ligne['id'] for ligne in reponse.json()['results'])
+            url = reponse.json()['next']
+        return ids
+
+    def test_curseur_parcourt_tout_sans_doublon(self):
+        ids = self._parcourir('/api/transactions/paiements-solidarite/?curseur=&taille_page=7')
+        attendus = [
+            str(identifiant) for identifiant in
+            PaiementSolidarite.objects.order_by('-date_paiement', '-id').values_list('id', flat=True)
+        ]
+        self.assertEqual(ids, attendus)
+
+    def test_sans_total(self):
+        ids = self._parcourir('/api/transactions/paiements-solidarite/?sans_total=1&taille_page=9')
+        self.assertEqual(len(ids), PaiementSolidarite.objects.count())
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_pagination_par_defaut_inchangee(self):
+        reponse = self.client.get('/api/transactions/paiements-solidarite/')
+        self.assertEqual(reponse.json()['count'], PaiementSolidarite.objects.count())
+
+    def test_curseur_invalide(self):
+        reponse = self.client.get('/api/transactions/epargne-transactions/?curseur=pas-un-curseur')
+        self.assertEqual(reponse.status_code, 404)
+
+
+class ExportTransactionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=4, graine=7)
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def _contenu(self, url):
+        reponse = self.client.get(url)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTrue(reponse.streaming)
+        return b''.join(reponse.streaming_content).decode('utf-8-sig')
+
+    def test_export_csv_respecte_les_filtres(self):
+        session = Session.objects.order_by('date_session').first()
+        lignes = self._contenu(
+            f'/api/transactions/paiements-solidarite/export/?format=csv&session={session.id}'
+        ).splitlines()
+        self.assertTrue(lignes[0].startswith('id,numero_membre,nom,prenom,session'))
+        self.assertEqual(len(lignes) - 1, PaiementSolidarite.objects.filter(session=session).count())
+
+    def test_export_ndjson(self):
+        lignes = self._contenu('/api/transactions/emprunts/export/?format=ndjson').splitlines()
+        self.assertEqual(len(lignes), Emprunt.objects.count())
+        self.assertIn('montant_total_a_rembourser', json.loads(lignes[0]))
+
+    def test_export_reserve_aux_administrateurs(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/transactions/emprunts/export/').status_code, 401)
+
+    def test_erreurs_dans_le_format_demande(self):
+        self.client.logout()
+        reponse = self.client.get('/api/transactions/emprunts/export/?format=ndjson')
+        self.assertEqual(reponse.status_code, 401)
+        self.assertIn('detail', json.loads(reponse.content.decode().splitlines()[0]))
+        reponse = self.client.get('/api/transactions/emprunts/export/?format=csv')
+        self.assertEqual(reponse.content.decode('utf-8-sig').splitlines()[0], 'detail')
+
+
+class VerificationRetardsTests(BudgetRequetesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(30, nombre_sessions=4, graine=5)
+
+    def test_transitions_ensemblistes(self):
+        aujourd_hui = timezone.now().date()
+        emprunts = list(Emprunt.objects.filter(statut='EN_COURS').order_by('id'))
+        self.assertGreaterEqual(len(emprunts), 3)
+        en_retard, rembourse, ramene = emprunts[:3]
+        Emprunt.objects.filter(id__in=[en_retard.id, rembourse.id]).update(
+            date_remboursement_max=aujourd_hui - timedelta(days=1)
+        )
+        Emprunt.objects.filter(id=rembourse.id).update(montant_rembourse=F('montant_total_a_rembourser'))
+        Emprunt.objects.filter(id=ramene.id).update(statut='EN_RETARD')
+
+        with self.assertBudgetRequetes(12, libelle='Vérification des retards'):
+            modifies = Emprunt.verifier_retards_globaux()
+
+        self.assertEqual(modifies, 3)
+        statuts = dict(Emprunt.objects.filter(id__in=[emprunt.id for emprunt in emprunts[:3]]).values_list('id', 'statut'))
+        self.assertEqual(statuts[en_retard.id], 'EN_RETARD')
+        self.assertEqual(statuts[rembourse.id], 'REMBOURSE')
+        self.assertEqual(statuts[ramene.id], 'EN_COURS')
+        self.assertEqual(Emprunt.verifier_retards_globaux(), 0)
+
+    def test_condition_reverifiee_par_l_update(self):
+        # Aucun UPDATE sur une liste d'identifiants lue plus tôt: chaque
+        # transition filtre sur (statut, date_remboursement_max) au moment d'écrire
+        Emprunt.objects.filter(statut='EN_COURS').update(date_remboursement_max=timezone.now().date() - timedelta(days=1))
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertGreater(Emprunt.verifier_retards_globaux(), 0)
+        updates = [
+            requete['sql'] for requete in requetes.captured_queries
+            if requete['sql'].startswith('UPDATE "transactions_emprunt"')
+        ]
+        self.assertTrue(updates)
+        for sql in updates:
+            self.assertIn('"statut"', sql.split('WHERE', 1)[1])
+            self.assertNotIn('"id" IN', sql)
+
+    def test_commande_et_statut_des_membres_concernes(self):
+        emprunt = Emprunt.objects.filter(statut='EN_COURS').select_related('membre').first()
+        Membre.objects.filter(id=emprunt.membre_id).update(statut='EN_REGLE')
+        sortie = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                'verifier_retards', date=str(emprunt.date_remboursement_max + timedelta(days=1)), stdout=sortie
+            )
+
+        self.assertIn("emprunt(s) mis à jour", sortie.getvalue())
+        emprunt.refresh_from_db()
+        self.assertEqual(emprunt.statut, 'EN_RETARD')
+        self.assertEqual(
+            Membre.objects.get(id=emprunt.membre_id).statut,
+            'EN_REGLE' if emprunt.membre.calculer_statut_en_regle() else 'NON_EN_REGLE'
+        )
+
+
+class TotauxSessionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, nombre_assistances=1, graine=11)
+
+    def _totaux(self):
+        return {
+            totaux.session_id: {champ: getattr(totaux, champ) for champ in TotauxSession.CHAMPS_MONTANTS}
+            for totaux in TotauxSession.objects.all()
+        }
+
+    def test_maintenus_par_les_sauvegardes(self):
+        session = Session.get_session_en_cours()
+        membre = Membre.objects.order_by('numero_membre').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription = PaiementInscription.objects.create(membre=membre, montant=Decimal('1000'), session=session)
+            epargne = EpargneTransaction.objects.create(
+                membre=membre, type_transaction='DEPOT', montant=Decimal('5000'), session=session
+            )
+            epargne.montant = Decimal('7000')
+            epargne.save()
+            # Solde complet: la part intérêt est redistribuée
+            emprunt = Emprunt.objects.filter(statut='EN_COURS').first()
+            Remboursement.objects.create(
+                emprunt=emprunt, montant=emprunt.montant_restant_a_rembourser, session=session
+            )
+            AssistanceAccordee.objects.create(
+                membre=membre, type_assistance=TypeAssistance.objects.first(), montant=Decimal('30000'),
+                session=session, justification="Test", statut='PAYEE'
+            )
+            PaiementRenflouement.objects.create(
+                renflouement=Renflouement.objects.filter(montant_paye=0).first(),
+                montant=Decimal('500'), session=session
+            )
+        inscription.delete()
+
+        maintenus = self._totaux()
+        self.assertGreaterEqual(maintenus[session.id]['assistances_payees'], Decimal('30000'))
+        self.assertGreater(maintenus[session.id]['interets_redistribues'], 0)
+        recalculer_totaux_sessions()
+        self.assertEqual(maintenus, self._totaux())
+
+
+class RenflouementsEnMasseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, nombre_assistances=1, graine=13)
+
+    def _etat(self):
+        soldes = dict(SoldeMembre.objects.values_list('membre_id', 'renflouement_du'))
+        totaux = dict(TotauxSession.objects.values_list('session_id', 'renflouements_generes'))
+        return soldes, totaux
+
+    def test_creation_groupee(self):
+        session = Session.get_session_en_cours()
+        membres = Membre.objects.order_by('numero_membre')[:4]
+        membre_ids = {membre.id for membre in membres}
+        generes_avant = TotauxSession.objects.get(session=session).renflouements_generes
+
+        with self.captureOnCommitCallbacks(execute=True):
+            crees = Renflouement.creer_en_masse(
+                Membre.objects.filter(id__in=membre_ids), session, Decimal('2500'), "Collation", 'COLLATION'
+            )
+
+        self.assertEqual(crees, 4)
+        self.assertEqual(
+            set(Renflouement.objects.filter(session=session, type_cause='COLLATION').values_list('membre_id', flat=True)),
+            membre_ids
+        )
+        self.assertEqual(
+            set(Membre.objects.filter(id__in=membre_ids).values_list('statut', flat=True)), {'NON_EN_REGLE'}
+        )
+        self.assertEqual(
+            TotauxSession.objects.get(session=session).renflouements_generes, generes_avant + Decimal('10000')
+        )
+        maintenus = self._etat()
+        recalculer_soldes_membres()
+        recalculer_totaux_sessions()
+        self.assertEqual(maintenus, self._etat())
+
+    def test_ignorer_existants(self):
+        session = Session.get_session_en_cours()
+        premiers = Membre.objects.order_by('numero_membre')[:2]
+        Renflouement.creer_en_masse(
+            Membre.objects.filter(id__in=[membre.id for membre in premiers]), session,
+            Decimal('1000'), "Collation", 'COLLATION'
+        )
+        tous = Membre.objects.order_by('numero_membre')[:5]
+        membres = Membre.objects.filter(id__in=[membre.id for membre in tous])
+
+        self.assertEqual(
+            Renflouement.creer_en_masse(membres, session, Decimal('1000'), "Collation", 'COLLATION', ignorer_existants=True),
+            3
+        )
+        self.assertEqual(
+            Renflouement.creer_en_masse(membres, session, Decimal('1000'), "Collation", 'COLLATION', ignorer_existants=True),
+            0
+        )
+        self.assertEqual(Renflouement.objects.filter(session=session, type_cause='COLLATION').count(), 5)
+
+
+class CumulsEmpruntsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, nombre_assistances=1, graine=12)
+
+    def setUp(self):
+        self.session = Session.get_session_en_cours()
+        self.emprunt = Emprunt.objects.create(
+            membre=Membre.objects.order_by('numero_membre').first(), montant_emprunte=Decimal('100000'),
+            taux_interet=Decimal('10'), session_emprunt=self.session
+        )
+
+    def _rembourser(self, emprunt, montant):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Remboursement.objects.create(emprunt=emprunt, montant=Decimal(montant), session=self.session)
+
+    def _verifier_emprunt(self):
+        self.emprunt.refresh_from_db()
+        remboursements = self.emprunt.remboursements.all()
+        self.assertEqual(self.emprunt.montant_rembourse, sum(r.montant for r in remboursements))
+        self.assertEqual(self.emprunt.montant_capital_rembourse, sum(r.montant_capital for r in remboursements))
+        self.assertEqual(
+            self.emprunt.membre.solde.emprunt_restant,
+            sum(emprunt.montant_restant_a_rembourser for emprunt in self.emprunt.membre.emprunts.all())
+        )
+
+    def test_instance_perimee_ne_double_pas_les_interets(self):
+        # Deux requêtes ayant lu l'emprunt avant le remboursement de l'autre
+        self._rembourser(self.emprunt, '60000')
+        second = self._rembourser(self.emprunt, '50000')
+        self.assertEqual((second.montant_capital, second.montant_interet), (Decimal('40000'), Decimal('10000')))
+        self._verifier_emprunt()
+        self.assertEqual(self.emprunt.statut, 'REMBOURSE')
+
+    def test_cout_independant_de_l_historique(self):
+        with CaptureQueriesContext(connection) as premier:
+            self._rembourser(self.emprunt, '1000')
+        for _ in range(5):
+            self._rembourser(self.emprunt, '1000')
+        with CaptureQueriesContext(connection) as dernier:
+            self._rembourser(self.emprunt, '1000')
+        self.assertEqual(len(premier), len(dernier))
+        self._verifier_emprunt()
+
+    def test_modification_et_suppression(self):
+        remboursement = self._rembourser(self.emprunt, '30000')
+        self._rembourser(self.emprunt, '20000')
+        remboursement.montant = Decimal('10000')
+        remboursement.save()
+        self._verifier_emprunt()
+        remboursement.delete()
+        self._verifier_emprunt()
+        self.assertEqual(self.emprunt.montant_rembourse, Decimal('20000'))
+
+    def test_paiements_de_renflouement(self):
+        renflouement = Renflouement.objects.filter(montant_paye=0).first()
+        premier = PaiementRenflouement.objects.create(renflouement=renflouement, montant=Decimal('300'), session=self.session)
+        PaiementRenflouement.objects.create(renflouement=renflouement, montant=Decimal('200'), session=self.session)
+        renflouement.refresh_from_db()
+        self.assertEqual(renflouement.montant_paye, Decimal('500'))
+        premier.delete()
+        renflouement.refresh_from_db()
+        self.assertEqual(renflouement.montant_paye, Decimal('200'))
+        self.assertEqual(
+            renflouement.membre.solde.renflouement_paye,
+            sum(r.montant_paye for r in renflouement.membre.renflouements.all())
+        )
+
+
+class ExerciceTermineTests(TestCase):
+    """Les transactions d'un exercice terminé (photographié) sont figées"""
+
+    URL = '/api/transactions/epargne-transactions/'
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(6, nombre_sessions=4, nombre_exercices=2, graine=21)
+        cls.session_close = Session.objects.filter(exercice__statut='TERMINE').first()
+        cls.depot = EpargneTransaction.objects.filter(session=cls.session_close).first()
+
+    def setUp(self):
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_creation_refusee(self):
+        nombre_avant = EpargneTransaction.objects.count()
+        reponse = self.client.post(self.URL, {
+            'membre': str(self.depot.membre_id), 'type_transaction': 'DEPOT',
+            'montant': '1000', 'session': str(self.session_close.id),
+        }, content_type='application/json')
+
+        self.assertEqual(reponse.status_code, 400)
+        self.assertIn('session', reponse.json())
+        self.assertEqual(EpargneTransaction.objects.count(), nombre_avant)
+
+    def test_modification_et_suppression_refusees(self):
+        session_ouverte = Session.objects.get(statut='EN_COURS')
+        url = f'{self.URL}{self.depot.id}/'
+        # Ni sur place, ni en déplaçant la transaction vers une session ouverte
+        for donnees in ({'montant': '1'}, {'session': str(session_ouverte.id)}):
+            reponse = self.client.patch(url, donnees, content_type='application/json')
+            self.assertEqual(reponse.status_code, 400)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+
+        depot = EpargneTransaction.objects.get(pk=self.depot.pk)
+        self.assertEqual((depot.montant, depot.session_id), (self.depot.montant, self.session_close.id))
+
+    def test_session_ouverte_acceptee(self):
+        session_ouverte = Session.objects.get(statut='EN_COURS')
+        reponse = self.client.post(self.URL, {
+            'membre': str(self.depot.membre_id), 'type_transaction': 'DEPOT',
+            'montant': '1000', 'session': str(session_ouverte.id),
+        }, content_type='application/json')
+        self.assertEqual(reponse.status_code, 201, reponse.content)
+
+
+class PlanRequetesTransactionsTests(PlanRequetesMixin, TestCase):
+    """Filtres des listes de transactions servis par un index (SQL capturé)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_mutuelle(10, nombre_sessions=3, graine=5)
+        cls.membre = Membre.objects.first()
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(creer_administrateur_benchmark())
+
+    def test_epargnes_du_membre_par_type(self):
+        with self.assertRequetesIndexees('transactions_epargnetransaction'):
+            reponse = self.client.get('/api/transactions/epargne-transactions/', {
+                'membre': str(self.membre.id), 'type_transaction': 'DEPOT'
+            })
+        self.assertEqual(reponse.status_code, 200)
+
+    def test_solidarites_du_membre_pour_la_session(self):
+        session = Session.objects.get(statut='EN_COURS')
+        with self.assertRequetesIndexees('transactions_paiementsolidarite'):
+            reponse = self.client.get('/api/transactions/paiements-solidarite/', {
+                'membre': str(self.membre.id), 'session': str(session.id)
+            })
+        self.assertEqual(reponse.status_code, 200)
+
+
+class RepartitionPlusFortsRestesTests(SimpleTestCase):
+    def test_somme_exacte(self):
+        poids = {'a': Decimal('150000'), 'b': Decimal('33333.33'), 'c': Decimal('7'), 'd': Decimal('0.01')}
+        for montant_total in (Decimal('0.01'), Decimal('1'), Decimal('100'), Decimal('12345.67'), Decimal('999999.99')):
+            parts = repartir_plus_forts_restes(montant_total, poids)
+            self.assertEqual(sum(parts.values()), montant_total)
+            self.assertTrue(all(part >= 0 for part in parts.values()))
+
+    def test_proportionnel_sans_reste(self):
+        parts = repartir_plus_forts_restes(Decimal('100'), {'a': Decimal('1'), 'b': Decimal('3')})
+        self.assertEqual(parts, {'a': Decimal('25.00'), 'b': Decimal('75.00')})
+
+    def test_egalite_de_reste_ordre_d_entree(self):
+        parts = repartir_plus_forts_restes(Decimal('0.10'), {'a': 1, 'b': 1, 'c': 1})
+        self.assertEqual(parts, {'a': Decimal('0.04'), 'b': Decimal('0.03'), 'c': Decimal('0.03')})
+
+    def test_egalite_de_reste_plus_gros_poids_d_abord(self):
+        # Restes égaux (2 x 1/4 et 2 x 3/4 -> 1 + 1/2): le plus gros poids l'emporte
+        parts = repartir_plus_forts_restes(Decimal('0.02'), {'a': 1, 'b': 3})
+        self.assertEqual(parts, {'a': Decimal('0.00'), 'b': Decimal('0.02')})
+
+    def test_poids_nuls_ou_negatifs_ignores(self):
+        parts = repartir_plus_forts_restes(Decimal('10'), {'a': 0, 'b': Decimal('-5'), 'c': Decimal('2')})
+        self.assertEqual(parts, {'c': Decimal('10.00')})
+        self.assertEqual(repartir_plus_forts_restes(Decimal('10'), {'a': 0, 'b': -1}), {})
+        self.assertEqual(repartir_plus_forts_restes(Decimal('10'), {}), {})
+
+    def test_montant_nul_ou_negatif(self):
+        self.assertEqual(repartir_plus_forts_restes(Decimal('0'), {'a': 1}), {})
+        self.assertEqual(repartir_plus_forts_restes(Decimal('-1'), {'a': 1}), {})
+
+    def test_montant_inferieur_au_nombre_de_membres(self):
+        poids = {f"m{indice}": 1 for indice in range(5)}
+        parts = repartir_plus_forts_restes(Decimal('0.03'), poids)
+        self.assertEqual(sum(parts.values()), Decimal('0.03'))
+        self.assertEqual(
+            [part for _, part in sorted(parts.items())],
+            [Decimal('0.01')] * 3 + [Decimal('0.00')] * 2
+        )
@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django_filters import rest_framework as filters
 from django.db import models
-from django.db.models import Sum, Q, F
+from django.db.models import Sum, Q, F, Prefetch
 from decimal import Decimal
 import logging
 from rest_framework.response import Response
@@ -20,9 +20,8 @@ from django.utils import timezone
 from rest_framework.response import Response
 from rest_framework import status
 
-logger = logging.getLogger(__name__)
+logger = logging.getLogger(f'mutuelle.{__name__}')
 
-logger = logging.getLogger(__name__)
 
 
 
@@ -39,6 +38,26 @@ from .serializers import (
     PaiementRenflouementSerializer, StatistiquesTransactionsSerializer
 )
 from authentication.permissions import IsAdministrateur, IsAdminOrReadOnly
+from core.cloture import MESSAGE_EXERCICE_TERMINE, exercice_termine
+from core.exports import ExportMixin
+from core.journalisation import donnees_masquees
+from core.pagination import PaginationTransactions
+from rest_framework.exceptions import ValidationError
+
+
+class SuppressionExerciceOuvertMixin:
+    """
+    Refuse (400) la suppression d'une transaction d'un exercice terminé.
+    Création et modification sont refusées par les serializers
+    (ExerciceOuvertMixin)
+    """
+
+    def perform_destroy(self, instance):
+        champ_session = self.get_serializer_class().champ_session
+        if exercice_termine(getattr(instance, champ_session)):
+            raise ValidationError({champ_session: MESSAGE_EXERCICE_TERMINE})
+        super().perform_destroy(instance)
+
 
 class PaiementInscriptionFilter(filters.FilterSet):
     """
@@ -128,7 +147,7 @@ class PaiementInscriptionFilter(filters.FilterSet):
             return queryset.exclude(notes='')
         return queryset.filter(notes='')
 
-class PaiementInscriptionViewSet(viewsets.ModelViewSet):
+class PaiementInscriptionViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les paiements d'inscription
     """
@@ -144,6 +163,12 @@ class PaiementInscriptionViewSet(viewsets.ModelViewSet):
     ordering_fields = ['date_paiement', 'montant', 'membre__numero_membre']
     ordering = ['-date_paiement']
     permission_classes = [AllowAny]
+    champs_export = [
+        ('id', 'id'), ('numero_membre', 'membre__numero_membre'),
+        ('nom', 'membre__utilisateur__last_name'), ('prenom', 'membre__utilisateur__first_name'),
+        ('montant', 'montant'), ('date_paiement', 'date_paiement'),
+        ('session', 'session__nom'), ('notes', 'notes'),
+    ]
 
 
 
@@ -200,7 +225,7 @@ class PaiementSolidariteFilter(filters.FilterSet):
             return queryset.filter(date_paiement__year=timezone.now().year)
         return queryset
 
-class PaiementSolidariteViewSet(viewsets.ModelViewSet):
+class PaiementSolidariteViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les paiements de solidarité
     """
@@ -216,6 +241,13 @@ class PaiementSolidariteViewSet(viewsets.ModelViewSet):
     ordering_fields = ['date_paiement', 'montant', 'session__date_session']
     ordering = ['-date_paiement']
     permission_classes = [AllowAny]
+    pagination_class = PaginationTransactions
+    champs_export = [
+        ('id', 'id'), ('numero_membre', 'membre__numero_membre'),
+        ('nom', 'membre__utilisateur__last_name'), ('prenom', 'membre__utilisateur__first_name'),
+        ('session', 'session__nom'), ('date_session', 'session__date_session'),
+        ('montant', 'montant'), ('date_paiement', 'date_paiement'), ('notes', 'notes'),
+    ]
 
 class EpargneTransactionFilter(filters.FilterSet):
     """
@@ -297,7 +329,7 @@ class EpargneTransactionFilter(filters.FilterSet):
             return queryset.filter(date_transaction__year=timezone.now().year)
         return queryset
 
-class EpargneTransactionViewSet(viewsets.ModelViewSet):
+class EpargneTransactionViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les transactions d'épargne
     """
@@ -313,6 +345,13 @@ class EpargneTransactionViewSet(viewsets.ModelViewSet):
     ordering_fields = ['date_transaction', 'montant', 'type_transaction']
     ordering = ['-date_transaction']
     permission_classes = [AllowAny]
+    pagination_class = PaginationTransactions
+    champs_export = [
+        ('id', 'id'), ('numero_membre', 'membre__numero_membre'),
+        ('nom', 'membre__utilisateur__last_name'), ('prenom', 'membre__utilisateur__first_name'),
+        ('type_transaction', 'type_transaction'), ('montant', 'montant'),
+        ('session', 'session__nom'), ('date_transaction', 'date_transaction'), ('notes', 'notes'),
+    ]
 
 class EmpruntFilter(filters.FilterSet):
     """
@@ -428,13 +467,15 @@ class EmpruntFilter(filters.FilterSet):
 
 
 
-class EmpruntViewSet(viewsets.ModelViewSet):
+class EmpruntViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les emprunts avec TOUS LES CALCULS
     """
     queryset = Emprunt.objects.select_related(
         'membre__utilisateur', 'session_emprunt'
-    ).prefetch_related('remboursements').all()
+    ).prefetch_related(
+        Prefetch('remboursements', queryset=Remboursement.objects.select_related('session'))
+    ).all()
     serializer_class = EmpruntSerializer
     filterset_class = EmpruntFilter
     search_fields = [
@@ -447,14 +488,22 @@ class EmpruntViewSet(viewsets.ModelViewSet):
     ]
     ordering = ['-date_emprunt']
     permission_classes = [AllowAny]
+    champs_export = [
+        ('id', 'id'), ('numero_membre', 'membre__numero_membre'),
+        ('nom', 'membre__utilisateur__last_name'), ('prenom', 'membre__utilisateur__first_name'),
+        ('montant_emprunte', 'montant_emprunte'), ('taux_interet', 'taux_interet'),
+        ('montant_total_a_rembourser', 'montant_total_a_rembourser'),
+        ('montant_rembourse', 'montant_rembourse'), ('statut', 'statut'),
+        ('session_emprunt', 'session_emprunt__nom'), ('date_emprunt', 'date_emprunt'),
+        ('date_remboursement_max', 'date_remboursement_max'),
+    ]
 
     def create(self, request, *args, **kwargs):
-        print("=" * 80)
-        print("🔍 CRÉATION EMPRUNT - DÉBUT")
-        print(f"📡 User: {request.user}")
-        print(f"📡 Data reçue: {request.data}")
-        print(f"📡 Headers: {dict(request.headers)}")
-        print(f"📡 Method: {request.method}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 CRÉATION EMPRUNT - DÉBUT")
+            logger.debug("📡 User: %s", request.user)
+            logger.debug("📡 Data reçue: %s", donnees_masquees(request.data))
+            logger.debug("📡 Method: %s", request.method)
         
         try:
             # 🔧 VALIDATION DES DONNÉES D'ENTRÉE
@@ -470,7 +519,7 @@ class EmpruntViewSet(viewsets.ModelViewSet):
             
             if missing_fields:
                 error_msg = f"Champs obligatoires manquants: {', '.join(missing_fields)}"
-                print(f"❌ ERREUR VALIDATION: {error_msg}")
+                logger.warning("❌ ERREUR VALIDATION: %s", error_msg)
                 return Response({
                     'error': 'Données manquantes',
                     'details': error_msg,
@@ -480,19 +529,20 @@ class EmpruntViewSet(viewsets.ModelViewSet):
             
             # 🔧 VALIDATION DU MEMBRE
             membre_id = data.get('membre')
-            print(f"🔍 Vérification membre ID: {membre_id}")
+            logger.debug("🔍 Vérification membre ID: %s", membre_id)
             
             try:
                 from core.models import Membre
                 membre = Membre.objects.select_related('utilisateur').get(id=membre_id)
-                print(f"✅ Membre trouvé: {membre.numero_membre} - {membre.utilisateur.nom_complet}")
-                print(f"   - Statut: {membre.statut}")
-                print(f"   - En règle: {membre.is_en_regle}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("✅ Membre trouvé: %s - %s", membre.numero_membre, membre.utilisateur.nom_complet)
+                    logger.debug("   - Statut: %s", membre.statut)
+                    logger.debug("   - En règle: %s", membre.is_en_regle)
                 
                 # Vérifier si le membre peut emprunter
                 if membre.statut != 'EN_REGLE':
                     error_msg = f"Le membre {membre.numero_membre} n'est pas en règle (statut: {membre.statut})"
-                    print(f"❌ ERREUR MEMBRE: {error_msg}")
+                    logger.warning("❌ ERREUR MEMBRE: %s", error_msg)
                     return Response({
                         'error': 'Membre non éligible',
                         'details': error_msg,
@@ -507,7 +557,7 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 
                 if emprunt_en_cours:
                     error_msg = f"Le membre {membre.numero_membre} a déjà un emprunt en cours"
-                    print(f"❌ ERREUR EMPRUNT EN COURS: {error_msg}")
+                    logger.warning("❌ ERREUR EMPRUNT EN COURS: %s", error_msg)
                     return Response({
                         'error': 'Emprunt déjà en cours',
                         'details': error_msg
@@ -515,14 +565,14 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 
             except Membre.DoesNotExist:
                 error_msg = f"Membre avec ID {membre_id} introuvable"
-                print(f"❌ ERREUR MEMBRE: {error_msg}")
+                logger.warning("❌ ERREUR MEMBRE: %s", error_msg)
                 return Response({
                     'error': 'Membre non trouvé',
                     'details': error_msg,
                     'membre_id': membre_id
                 }, status=status.HTTP_404_NOT_FOUND)
             except Exception as e:
-                print(f"❌ ERREUR RÉCUPÉRATION MEMBRE: {str(e)}")
+                logger.error("❌ ERREUR RÉCUPÉRATION MEMBRE: %s", str(e))
                 return Response({
                     'error': 'Erreur lors de la vérification du membre',
                     'details': str(e)
@@ -530,15 +580,15 @@ class EmpruntViewSet(viewsets.ModelViewSet):
             
             # 🔧 VALIDATION DU MONTANT
             montant_str = data.get('montant_emprunte')
-            print(f"🔍 Validation montant: {montant_str} (type: {type(montant_str)})")
+            logger.debug("🔍 Validation montant: %s (type: %s)", montant_str, type(montant_str))
             
             try:
                 montant_emprunte = Decimal(str(montant_str))
-                print(f"✅ Montant converti: {montant_emprunte}")
+                logger.debug("✅ Montant converti: %s", montant_emprunte)
                 
                 if montant_emprunte <= 0:
                     error_msg = "Le montant doit être positif"
-                    print(f"❌ ERREUR MONTANT: {error_msg}")
+                    logger.warning("❌ ERREUR MONTANT: %s", error_msg)
                     return Response({
                         'error': 'Montant invalide',
                         'details': error_msg,
@@ -549,7 +599,7 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 
             except (InvalidOperation, TypeError, ValueError) as e:
                 error_msg = f"Montant invalide: {e}"
-                print(f"❌ ERREUR CONVERSION MONTANT: {error_msg}")
+                logger.warning("❌ ERREUR CONVERSION MONTANT: %s", error_msg)
                 return Response({
                     'error': 'Montant invalide',
                     'details': error_msg,
@@ -564,10 +614,10 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 current_session = Session.objects.filter(statut='EN_COURS').first()
                 if current_session:
                     data['session'] = current_session.id
-                    print(f"✅ Session auto-assignée: {current_session.nom}")
+                    logger.debug("✅ Session auto-assignée: %s", current_session.nom)
                 else:
                     error_msg = "Aucune session active disponible"
-                    print(f"❌ ERREUR SESSION: {error_msg}")
+                    logger.warning("❌ ERREUR SESSION: %s", error_msg)
                     return Response({
                         'error': 'Session manquante',
                         'details': error_msg
@@ -576,10 +626,10 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 try:
                     from core.models import Session
                     session = Session.objects.get(id=session_id)
-                    print(f"✅ Session trouvée: {session.nom}")
+                    logger.debug("✅ Session trouvée: %s", session.nom)
                 except Session.DoesNotExist:
                     error_msg = f"Session avec ID {session_id} introuvable"
-                    print(f"❌ ERREUR SESSION: {error_msg}")
+                    logger.warning("❌ ERREUR SESSION: %s", error_msg)
                     return Response({
                         'error': 'Session non trouvée',
                         'details': error_msg,
@@ -592,27 +642,27 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 fonds = FondsSocial.get_fonds_actuel()
                 if fonds:
                     liquidites_disponibles = fonds.montant_total
-                    print(f"🔍 Liquidités disponibles: {liquidites_disponibles}")
+                    logger.debug("🔍 Liquidités disponibles: %s", liquidites_disponibles)
                     
                     if montant_emprunte > liquidites_disponibles:
                         error_msg = f"Liquidités insuffisantes ({liquidites_disponibles}) pour ce prêt ({montant_emprunte})"
-                        print(f"⚠️ ATTENTION LIQUIDITÉS: {error_msg}")
+                        logger.warning("⚠️ ATTENTION LIQUIDITÉS: %s", error_msg)
                         # Note: On peut continuer mais alerter l'admin
                 else:
-                    print("⚠️ Aucun fonds social trouvé")
+                    logger.warning("⚠️ Aucun fonds social trouvé")
             except Exception as e:
-                print(f"⚠️ Erreur vérification liquidités: {e}")
+                logger.warning("⚠️ Erreur vérification liquidités: %s", e)
             
             # 🔧 VALIDATION AVEC SERIALIZER
-            print(f"🔍 Data finale pour serializer: {data}")
+            logger.debug("🔍 Data finale pour serializer: %s", data)
             serializer = self.get_serializer(data=data)
             
-            print(f"🔍 Validation du serializer...")
+            logger.debug("🔍 Validation du serializer...")
             if not serializer.is_valid():
-                print(f"❌ ERREURS SERIALIZER: {serializer.errors}")
-                print(f"❌ ERREURS DÉTAILLÉES:")
+                logger.warning("❌ ERREURS SERIALIZER: %s", serializer.errors)
+                logger.warning("❌ ERREURS DÉTAILLÉES:")
                 for field, errors in serializer.errors.items():
-                    print(f"   - {field}: {errors}")
+                    logger.debug("   - %s: %s", field, errors)
                 
                 return Response({
                     'error': 'Données invalides',
@@ -620,39 +670,34 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                     'data_received': data
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            print(f"✅ Serializer valide, validated_data: {serializer.validated_data}")
+            logger.debug("✅ Serializer valide, validated_data: %s", serializer.validated_data)
             
             # 🔧 CRÉATION AVEC TRANSACTION
             try:
-                print("🔍 Début de la création...")
+                logger.debug("🔍 Début de la création...")
                 
                 with transaction.atomic():
-                    print("🔍 Appel perform_create...")
+                    logger.debug("🔍 Appel perform_create...")
                     self.perform_create(serializer)
                     
                     emprunt = serializer.instance
-                    print(f"✅ Emprunt créé avec succès:")
-                    print(f"   - ID: {emprunt.id}")
-                    print(f"   - Membre: {emprunt.membre.numero_membre}")
-                    print(f"   - Montant: {emprunt.montant_emprunte}")
-                    print(f"   - Total à rembourser: {emprunt.montant_total_a_rembourser}")
-                    print(f"   - Taux intérêt: {emprunt.taux_interet}%")
-                    print(f"   - Session: {emprunt.session_emprunt.nom}")
-                    print(f"   - Date: {emprunt.date_emprunt}")
-                    print(f"   - Statut: {emprunt.statut}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("✅ Emprunt créé avec succès:")
+                        logger.debug("   - ID: %s", emprunt.id)
+                        logger.debug("   - Membre: %s", emprunt.membre.numero_membre)
+                        logger.debug("   - Montant: %s", emprunt.montant_emprunte)
+                        logger.debug("   - Total à rembourser: %s", emprunt.montant_total_a_rembourser)
+                        logger.debug("   - Taux intérêt: %s%%", emprunt.taux_interet)
+                        logger.debug("   - Session: %s", emprunt.session_emprunt.nom)
+                        logger.debug("   - Date: %s", emprunt.date_emprunt)
+                        logger.debug("   - Statut: %s", emprunt.statut)
                 
-                print("✅ EMPRUNT CRÉÉ AVEC SUCCÈS")
-                print("=" * 80)
+                logger.debug("✅ EMPRUNT CRÉÉ AVEC SUCCÈS")
                 
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
                 
             except Exception as e:
-                print(f"❌ EXCEPTION CRÉATION: {str(e)}")
-                print(f"❌ EXCEPTION TYPE: {type(e)}")
-                import traceback
-                print(f"❌ TRACEBACK COMPLET:")
-                print(traceback.format_exc())
-                print("=" * 80)
+                logger.exception("❌ EXCEPTION CRÉATION: %s", str(e))
                 
                 return Response({
                     'error': 'Erreur lors de la création de l\'emprunt',
@@ -661,12 +706,7 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
                 
         except Exception as e:
-            print(f"❌ EXCEPTION GÉNÉRALE: {str(e)}")
-            print(f"❌ EXCEPTION TYPE: {type(e)}")
-            import traceback
-            print(f"❌ TRACEBACK COMPLET:")
-            print(traceback.format_exc())
-            print("=" * 80)
+            logger.exception("❌ EXCEPTION GÉNÉRALE: %s", str(e))
             
             return Response({
                 'error': 'Erreur interne du serveur',
@@ -676,21 +716,21 @@ class EmpruntViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Création personnalisée avec calculs automatiques"""
-        print("🔍 PERFORM_CREATE - Début")
+        logger.debug("🔍 PERFORM_CREATE - Début")
         try:
             validated_data = serializer.validated_data
             
             # Auto-assigner la date si manquante
             if 'date_emprunt' not in validated_data:
                 validated_data['date_emprunt'] = timezone.now().date()
-                print(f"✅ Date auto-assignée: {validated_data['date_emprunt']}")
+                logger.debug("✅ Date auto-assignée: %s", validated_data['date_emprunt'])
             
             # 🔧 AUTO-CALCUL DU TAUX D'INTÉRÊT
             if 'taux_interet' not in validated_data or not validated_data.get('taux_interet'):
                 from core.models import ConfigurationMutuelle
                 config = ConfigurationMutuelle.get_configuration()
                 validated_data['taux_interet'] = config.taux_interet
-                print(f"✅ Taux d'intérêt auto-assigné: {config.taux_interet}%")
+                logger.debug("✅ Taux d'intérêt auto-assigné: %s%%", config.taux_interet)
             
             # 🔧 AUTO-CALCUL DU MONTANT TOTAL À REMBOURSER
             if 'montant_total_a_rembourser' not in validated_data or not validated_data.get('montant_total_a_rembourser'):
@@ -702,7 +742,7 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 montant_total = montant_emprunte + montant_interets
                 
                 validated_data['montant_total_a_rembourser'] = montant_total
-                print(f"✅ Montant total calculé: {montant_emprunte} + {montant_interets} = {montant_total}")
+                logger.debug("✅ Montant total calculé: %s + %s = %s", montant_emprunte, montant_interets, montant_total)
             
             # 🔧 AUTO-ASSIGNATION DE LA SESSION
             if 'session_emprunt' not in validated_data or not validated_data.get('session_emprunt'):
@@ -710,21 +750,19 @@ class EmpruntViewSet(viewsets.ModelViewSet):
                 current_session = Session.objects.filter(statut='EN_COURS').first()
                 if current_session:
                     validated_data['session_emprunt'] = current_session
-                    print(f"✅ Session auto-assignée: {current_session.nom}")
+                    logger.debug("✅ Session auto-assignée: %s", current_session.nom)
                 else:
                     raise ValueError("Aucune session en cours disponible")
             
-            print(f"🔍 Données finales pour création: {validated_data}")
+            logger.debug("🔍 Données finales pour création: %s", validated_data)
             
             # Sauvegarder avec les données calculées
             instance = serializer.save(**validated_data)
-            print(f"✅ PERFORM_CREATE - Instance sauvée: {instance}")
+            logger.debug("✅ PERFORM_CREATE - Instance sauvée: %s", instance)
             return instance
             
         except Exception as e:
-            print(f"❌ PERFORM_CREATE - Erreur: {e}")
-            import traceback
-            print(f"❌ PERFORM_CREATE - Traceback: {traceback.format_exc()}")
+            logger.exception("❌ PERFORM_CREATE - Erreur: %s", e)
             raise
 
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
@@ -732,7 +770,7 @@ class EmpruntViewSet(viewsets.ModelViewSet):
         """
         Statistiques des emprunts avec gestion d'erreurs
         """
-        print("🔍 STATISTIQUES EMPRUNTS - Début")
+        logger.debug("🔍 STATISTIQUES EMPRUNTS - Début")
         try:
             queryset = self.get_queryset()
             
@@ -748,11 +786,12 @@ class EmpruntViewSet(viewsets.ModelViewSet):
             montant_total_rembourse = queryset.aggregate(
                 total=Sum('montant_rembourse'))['total'] or Decimal('0')
             
-            print(f"✅ Statistiques calculées:")
-            print(f"   - Total emprunts: {total_emprunts}")
-            print(f"   - En cours: {emprunts_en_cours}")
-            print(f"   - Remboursés: {emprunts_rembourses}")
-            print(f"   - En retard: {emprunts_en_retard}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("✅ Statistiques calculées:")
+                logger.debug("   - Total emprunts: %s", total_emprunts)
+                logger.debug("   - En cours: %s", emprunts_en_cours)
+                logger.debug("   - Remboursés: %s", emprunts_rembourses)
+                logger.debug("   - En retard: %s", emprunts_en_retard)
             
             return Response({
                 'nombre_emprunts': {
@@ -773,7 +812,7 @@ class EmpruntViewSet(viewsets.ModelViewSet):
             })
             
         except Exception as e:
-            print(f"❌ ERREUR STATISTIQUES: {e}")
+            logger.error("❌ ERREUR STATISTIQUES: %s", e)
             return Response({
                 'error': 'Erreur lors du calcul des statistiques',
                 'details': str(e)
@@ -871,13 +910,15 @@ class RenflouementFilter(filters.FilterSet):
             return queryset.filter(date_creation__year=timezone.now().year)
         return queryset
 
-class RenflouementViewSet(viewsets.ModelViewSet):
+class RenflouementViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet pour les renflouements avec TOUS LES CALCULS
     """
     queryset = Renflouement.objects.select_related(
         'membre__utilisateur', 'session'
-    ).prefetch_related('paiements').all()
+    ).prefetch_related(
+        Prefetch('paiements', queryset=PaiementRenflouement.objects.select_related('session'))
+    ).all()
     serializer_class = RenflouementSerializer
     filterset_class = RenflouementFilter
     search_fields = [
@@ -889,6 +930,13 @@ class RenflouementViewSet(viewsets.ModelViewSet):
     ]
     ordering = ['-date_creation']
     permission_classes = [AllowAny]
+    champs_export = [
+        ('id', 'id'), ('numero_membre', 'membre__numero_membre'),
+        ('nom', 'membre__utilisateur__last_name'), ('prenom', 'membre__utilisateur__first_name'),
+        ('montant_du', 'montant_du'), ('montant_paye', 'montant_paye'),
+        ('type_cause', 'type_cause'), ('cause', 'cause'),
+        ('session', 'session__nom'), ('date_creation', 'date_creation'),
+    ]
     
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
     def statistiques(self, request):
@@ -925,28 +973,44 @@ class RenflouementViewSet(viewsets.ModelViewSet):
         })
 
 # ViewSets similaires pour les autres modèles...
-class RemboursementViewSet(viewsets.ModelViewSet):
+class RemboursementViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Remboursement.objects.select_related('emprunt__membre__utilisateur', 'session').all()
     serializer_class = RemboursementSerializer
     filterset_fields = ['emprunt', 'session', 'montant']
     search_fields = ['emprunt__membre__numero_membre', 'notes']
     ordering = ['-date_remboursement']
     permission_classes = [AllowAny]
+    pagination_class = PaginationTransactions
+    champs_export = [
+        ('id', 'id'), ('emprunt', 'emprunt_id'), ('numero_membre', 'emprunt__membre__numero_membre'),
+        ('montant', 'montant'), ('montant_capital', 'montant_capital'),
+        ('montant_interet', 'montant_interet'), ('session', 'session__nom'),
+        ('date_remboursement', 'date_remboursement'), ('notes', 'notes'),
+    ]
 
-logger = logging.getLogger(__name__)
 
-class AssistanceAccordeeViewSet(viewsets.ModelViewSet):
+class AssistanceAccordeeViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = AssistanceAccordee.objects.select_related(
-        'membre__utilisateur', 'type_assistance', 'session'
+        'membre__utilisateur', 'session'
+    ).prefetch_related(
+        Prefetch('type_assistance', queryset=TypeAssistance.objects.avec_totaux())
     ).all()
     serializer_class = AssistanceAccordeeSerializer
     filterset_fields = ['membre', 'type_assistance', 'statut', 'session']
     search_fields = ['membre__numero_membre', 'justification', 'notes']
     ordering = ['-date_demande']
     permission_classes = [AllowAny]
+    champs_export = [
+        ('id', 'id'), ('numero_membre', 'membre__numero_membre'),
+        ('nom', 'membre__utilisateur__last_name'), ('prenom', 'membre__utilisateur__first_name'),
+        ('type_assistance', 'type_assistance__nom'), ('montant', 'montant'), ('statut', 'statut'),
+        ('session', 'session__nom'), ('date_demande', 'date_demande'),
+        ('date_paiement', 'date_paiement'), ('justification', 'justification'),
+    ]
 
     def create(self, request, *args, **kwargs):
-        print("ASSISTANCE CREATE - Data reçue:", request.data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("ASSISTANCE CREATE - Data reçue: %s", donnees_masquees(request.data))
         
         # 🔧 AUTO-AJOUTER LA SESSION COURANTE SI MANQUANTE
         data = request.data.copy()
@@ -956,71 +1020,68 @@ class AssistanceAccordeeViewSet(viewsets.ModelViewSet):
                 current_session = Session.objects.filter(statut='EN_COURS').first()
                 if current_session:
                     data['session'] = current_session.id
-                    print(f"Session courante ajoutée automatiquement: {current_session.id}")
+                    logger.debug("Session courante ajoutée automatiquement: %s", current_session.id)
                 else:
-                    print("ERREUR: Aucune session active trouvée")
+                    logger.error("ERREUR: Aucune session active trouvée")
                     return Response({
                         'error': 'Aucune session active disponible'
                     }, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
-                print(f"ERREUR lors de la récupération de session: {e}")
+                logger.error("ERREUR lors de la récupération de session: %s", e)
         
         # 🔍 VÉRIFICATION DES FOREIGN KEYS AVANT CRÉATION
         try:
-            print(f"🔍 Vérification membre ID: {data.get('membre')}")
+            logger.debug("🔍 Vérification membre ID: %s", data.get('membre'))
             membre = Membre.objects.get(id=data.get('membre'))
-            print(f"✅ Membre trouvé: {membre}")
+            logger.debug("✅ Membre trouvé: %s", membre)
             
-            print(f"🔍 Vérification type_assistance ID: {data.get('type_assistance')}")
+            logger.debug("🔍 Vérification type_assistance ID: %s", data.get('type_assistance'))
             type_assistance = TypeAssistance.objects.get(id=data.get('type_assistance'))
-            print(f"✅ Type assistance trouvé: {type_assistance}")
+            logger.debug("✅ Type assistance trouvé: %s", type_assistance)
             
-            print(f"🔍 Vérification session ID: {data.get('session')}")
+            logger.debug("🔍 Vérification session ID: %s", data.get('session'))
             session = Session.objects.get(id=data.get('session'))
-            print(f"✅ Session trouvée: {session}")
+            logger.debug("✅ Session trouvée: %s", session)
             
         except Exception as e:
-            print(f"❌ ERREUR Foreign Key: {e}")
+            logger.error("❌ ERREUR Foreign Key: %s", e)
             return Response({
                 'error': f'Objet non trouvé: {str(e)}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         serializer = self.get_serializer(data=data)
         if not serializer.is_valid():
-            print("ASSISTANCE ERRORS:", serializer.errors)
+            logger.warning("ASSISTANCE ERRORS: %s", serializer.errors)
             return Response({
                 'error': 'Données invalides',
                 'details': serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            print("🔍 Début de la création...")
+            logger.debug("🔍 Début de la création...")
             
             # 🔧 UTILISE UNE TRANSACTION POUR ISOLER L'ERREUR
             with transaction.atomic():
-                print("🔍 Appel perform_create...")
+                logger.debug("🔍 Appel perform_create...")
                 assistance = serializer.save()
-                print(f"✅ AssistanceAccordee créée avec ID: {assistance.id}")
+                logger.debug("✅ AssistanceAccordee créée avec ID: %s", assistance.id)
                 
                 # 🔍 VÉRIFICATION POST-CRÉATION
-                print("🔍 Vérification post-création...")
+                logger.debug("🔍 Vérification post-création...")
                 created_assistance = AssistanceAccordee.objects.get(id=assistance.id)
-                print(f"✅ Assistance vérifiée: {created_assistance}")
+                logger.debug("✅ Assistance vérifiée: %s", created_assistance)
                 
-            print("✅ ASSISTANCE CREATED:", serializer.data)
+            logger.debug("✅ ASSISTANCE CREATED: %s", serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            print(f"❌ ASSISTANCE EXCEPTION: {str(e)}")
-            print(f"❌ EXCEPTION TYPE: {type(e)}")
-            import traceback
-            print(f"❌ TRACEBACK: {traceback.format_exc()}")
+            logger.exception("❌ ASSISTANCE EXCEPTION: %s", str(e))
             
             return Response({
                 'error': 'Erreur lors de la création',
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-class PaiementRenflouementViewSet(viewsets.ModelViewSet):
+class PaiementRenflouementViewSet(SuppressionExerciceOuvertMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = PaiementRenflouement.objects.select_related(
         'renflouement__membre__utilisateur', 'session'
     ).all()
@@ -1029,13 +1090,19 @@ class PaiementRenflouementViewSet(viewsets.ModelViewSet):
     search_fields = ['renflouement__membre__numero_membre', 'notes']
     ordering = ['-date_paiement']
     permission_classes = [AllowAny]
+    pagination_class = PaginationTransactions
+    champs_export = [
+        ('id', 'id'), ('renflouement', 'renflouement_id'),
+        ('numero_membre', 'renflouement__membre__numero_membre'),
+        ('montant', 'montant'), ('session', 'session__nom'),
+        ('date_paiement', 'date_paiement'), ('notes', 'notes'),
+    ]
 
     def create(self, request, *args, **kwargs):
-        print("=" * 60)
-        print("🔍 PAIEMENT RENFLOUEMENT CREATE")
-        print(f"📡 Data reçue: {request.data}")
-        print(f"👤 User: {request.user}")
-        print(f"🔗 Headers: {dict(request.headers)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 PAIEMENT RENFLOUEMENT CREATE")
+            logger.debug("📡 Data reçue: %s", donnees_masquees(request.data))
+            logger.debug("👤 User: %s", request.user)
         
         # 🔍 VÉRIFICATION DES FOREIGN KEYS AVANT CRÉATION
         data = request.data.copy()
@@ -1043,62 +1110,60 @@ class PaiementRenflouementViewSet(viewsets.ModelViewSet):
         try:
             # Vérifier le renflouement
             if 'renflouement' in data:
-                print(f"🔍 Vérification renflouement ID: {data.get('renflouement')}")
+                logger.debug("🔍 Vérification renflouement ID: %s", data.get('renflouement'))
                 renflouement = Renflouement.objects.get(id=data.get('renflouement'))
-                print(f"✅ Renflouement trouvé: {renflouement}")
-                print(f"   - Membre: {renflouement.membre.numero_membre}")
-                print(f"   - Montant dû: {renflouement.montant_du}")
-                print(f"   - Cause: {renflouement.cause}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("✅ Renflouement trouvé: %s", renflouement)
+                    logger.debug("   - Membre: %s", renflouement.membre.numero_membre)
+                    logger.debug("   - Montant dû: %s", renflouement.montant_du)
+                    logger.debug("   - Cause: %s", renflouement.cause)
             
             # Vérifier la session
             if 'session' in data:
-                print(f"🔍 Vérification session ID: {data.get('session')}")
+                logger.debug("🔍 Vérification session ID: %s", data.get('session'))
                 session = Session.objects.get(id=data.get('session'))
-                print(f"✅ Session trouvée: {session}")
+                logger.debug("✅ Session trouvée: %s", session)
             elif not data.get('session'):
                 # Auto-assigner la session courante si manquante
                 current_session = Session.objects.filter(statut="EN_COURS").first()
                 if current_session:
                     data['session'] = current_session.id
-                    print(f"✅ Session auto-assignée: {current_session.nom}")
+                    logger.debug("✅ Session auto-assignée: %s", current_session.nom)
                 else:
-                    print("❌ Aucune session active trouvée")
+                    logger.error("❌ Aucune session active trouvée")
                     return Response({
                         'error': 'Aucune session active disponible'
                     }, status=status.HTTP_400_BAD_REQUEST)
             
             # Vérifier le montant
             montant = data.get('montant')
-            print(f"🔍 Montant: {montant} (type: {type(montant)})")
+            logger.debug("🔍 Montant: %s (type: %s)", montant, type(montant))
             if montant:
                 try:
                     montant_decimal = Decimal(str(montant))
-                    print(f"✅ Montant converti: {montant_decimal}")
+                    logger.debug("✅ Montant converti: %s", montant_decimal)
                 except Exception as e:
-                    print(f"❌ Erreur conversion montant: {e}")
+                    logger.error("❌ Erreur conversion montant: %s", e)
                     return Response({
                         'error': f'Montant invalide: {e}'
                     }, status=status.HTTP_400_BAD_REQUEST)
             
         except Exception as e:
-            print(f"❌ ERREUR Foreign Key: {e}")
-            print(f"❌ Type erreur: {type(e)}")
-            import traceback
-            print(f"❌ Traceback: {traceback.format_exc()}")
+            logger.exception("❌ ERREUR Foreign Key: %s", e)
             return Response({
                 'error': f'Objet non trouvé: {str(e)}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # 🔍 VALIDATION AVEC SERIALIZER
-        print(f"🔍 Data finale envoyée au serializer: {data}")
+        logger.debug("🔍 Data finale envoyée au serializer: %s", data)
         serializer = self.get_serializer(data=data)
         
-        print(f"🔍 Validation du serializer...")
+        logger.debug("🔍 Validation du serializer...")
         if not serializer.is_valid():
-            print(f"❌ ERREURS SERIALIZER: {serializer.errors}")
-            print(f"❌ ERREURS DÉTAILLÉES:")
+            logger.warning("❌ ERREURS SERIALIZER: %s", serializer.errors)
+            logger.warning("❌ ERREURS DÉTAILLÉES:")
             for field, errors in serializer.errors.items():
-                print(f"   - {field}: {errors}")
+                logger.debug("   - %s: %s", field, errors)
             
             return Response({
                 'error': 'Données invalides',
@@ -1106,32 +1171,26 @@ class PaiementRenflouementViewSet(viewsets.ModelViewSet):
                 'data_received': data
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        print(f"✅ Serializer valide, validated_data: {serializer.validated_data}")
+        logger.debug("✅ Serializer valide, validated_data: %s", serializer.validated_data)
         
         # 🔍 CRÉATION
         try:
-            print("🔍 Début de la création...")
+            logger.debug("🔍 Début de la création...")
             
             # Utiliser une transaction pour isoler l'erreur
             from django.db import transaction
             with transaction.atomic():
-                print("🔍 Appel perform_create...")
+                logger.debug("🔍 Appel perform_create...")
                 self.perform_create(serializer)
-                print(f"✅ PaiementRenflouement créé avec succès")
+                logger.debug("✅ PaiementRenflouement créé avec succès")
                 
-            print("✅ PAIEMENT RENFLOUEMENT CREATED:")
-            print(f"   Data: {serializer.data}")
-            print("=" * 60)
+            logger.debug("✅ PAIEMENT RENFLOUEMENT CREATED:")
+            logger.debug("   Data: %s", serializer.data)
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
-            print(f"❌ EXCEPTION CRÉATION: {str(e)}")
-            print(f"❌ EXCEPTION TYPE: {type(e)}")
-            import traceback
-            print(f"❌ TRACEBACK COMPLET:")
-            print(traceback.format_exc())
-            print("=" * 60)
+            logger.exception("❌ EXCEPTION CRÉATION: %s", str(e))
             
             return Response({
                 'error': 'Erreur lors de la création',